@@ -4,6 +4,7 @@ from types import SimpleNamespace
 from typing import List
 
 import typer
+from bfcl._llm_response_generation import ExecutionMode
 from bfcl._llm_response_generation import main as generation_main
 from bfcl.constant import (
     DOTENV_PATH,
@@ -111,6 +112,23 @@ def generate(
     ),
     num_gpus: int = typer.Option(1, help="The number of GPUs to use."),
     num_threads: int = typer.Option(1, help="The number of threads to use."),
+    execution_mode: ExecutionMode = typer.Option(
+        ExecutionMode.THREAD,
+        help="How API model requests are issued: `thread` (one OS thread per in-flight request) or `async` (asyncio event loop).",
+    ),
+    max_concurrency: int = typer.Option(
+        None,
+        help="The maximum number of in-flight requests in `async` execution mode. Defaults to the value of `--num-threads`.",
+    ),
+    response_cache: bool = typer.Option(
+        False,
+        "--response-cache",
+        help="Cache the model responses on disk and reuse them when the same request is sent again, eg, when re-running after a crash or into a different result folder.",
+    ),
+    response_cache_max_size: int = typer.Option(
+        2048,
+        help="The maximum size of the response cache, in MB. The least recently used responses are evicted beyond that.",
+    ),
     gpu_memory_utilization: float = typer.Option(0.9, help="The GPU memory utilization."),
     backend: str = typer.Option("vllm", help="The backend to use for the model."),
     skip_server_setup: bool = typer.Option(
@@ -147,6 +165,10 @@ def generate(
         exclude_state_log=exclude_state_log,
         num_gpus=num_gpus,
         num_threads=num_threads,
+        execution_mode=execution_mode.value,
+        max_concurrency=max_concurrency,
+        response_cache=response_cache,
+        response_cache_max_size=response_cache_max_size,
         gpu_memory_utilization=gpu_memory_utilization,
         backend=backend,
         skip_server_setup=skip_server_setup,
@@ -242,13 +264,29 @@ def evaluate(
         "--score-dir",
         help="Relative path to the evaluation score folder, if different from the default; Path should be relative to the `berkeley-function-call-leaderboard` root folder",
     ),
+    num_workers: int = typer.Option(
+        1,
+        help="The number of worker processes to check the model results with. The default (1) evaluates everything in the main process.",
+    ),
+    verdict_cache: bool = typer.Option(
+        True,
+        help="Reuse the cached verdicts of the entries whose model result, prompt, possible answer and checker code are unchanged since the last evaluation; only the other entries are checked again.",
+    ),
 ):
     """
     Evaluate results from run of one or more models on a test-category (same as eval_runner.py).
     """
 
     load_dotenv(dotenv_path=DOTENV_PATH, verbose=True, override=True)  # Load the .env file
-    evaluation_main(model, test_category, api_sanity_check, result_dir, score_dir)
+    evaluation_main(
+        model,
+        test_category,
+        api_sanity_check,
+        result_dir,
+        score_dir,
+        num_workers,
+        verdict_cache,
+    )
 
 
 @cli.command()
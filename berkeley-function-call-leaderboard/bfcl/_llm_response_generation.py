@@ -1,9 +1,11 @@
 import argparse
+import asyncio
 import json
 import os
 import time
-from concurrent.futures import ThreadPoolExecutor
-from copy import deepcopy
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from enum import Enum
+from functools import lru_cache
 
 from bfcl._apply_function_credential_config import apply_function_credential_config
 from bfcl.constant import (
@@ -11,6 +13,7 @@ from bfcl.constant import (
     MULTI_TURN_FUNC_DOC_PATH,
     PROJECT_ROOT,
     PROMPT_PATH,
+    RESPONSE_CACHE_PATH,
     RESULT_PATH,
     TEST_FILE_MAPPING,
     TEST_IDS_TO_GENERATE_PATH,
@@ -18,8 +21,10 @@ from bfcl.constant import (
 from bfcl.eval_checker.eval_runner_helper import load_file
 from bfcl.model_handler.handler_map import HANDLER_MAP
 from bfcl.model_handler.model_style import ModelStyle
+from bfcl.model_handler.response_cache import ResponseCache
 from bfcl.utils import (
     check_api_key_supplied,
+    copy_test_entry_for_inference,
     is_executable,
     is_multi_turn,
     parse_test_category_argument,
@@ -28,8 +33,16 @@ from bfcl.utils import (
 from tqdm import tqdm
 
 RETRY_LIMIT = 3
-# 60s for the timer to complete. But often we find that even with 60 there is a conflict. So 65 is a safe no.
-RETRY_DELAY = 65  # Delay in seconds
+
+
+class ExecutionMode(str, Enum):
+    # One OS thread per in-flight request
+    THREAD = "thread"
+    # All the in-flight requests issued from one asyncio event loop
+    ASYNC = "async"
+
+
+EXECUTION_MODES = [execution_mode.value for execution_mode in ExecutionMode]
 
 
 def get_args():
@@ -44,6 +57,13 @@ def get_args():
     parser.add_argument("--include-input-log", action="store_true", default=False)
     parser.add_argument("--exclude-state-log", action="store_true", default=False)
     parser.add_argument("--num-threads", default=1, type=int)
+    parser.add_argument(
+        "--execution-mode", default="thread", type=str, choices=EXECUTION_MODES
+    )
+    parser.add_argument("--max-concurrency", default=None, type=int)
+    parser.add_argument("--response-cache", action="store_true", default=False)
+    # In MB
+    parser.add_argument("--response-cache-max-size", default=2048, type=int)
     parser.add_argument("--num-gpus", default=1, type=int)
     parser.add_argument("--backend", default="vllm", type=str, choices=["vllm", "sglang"])
     parser.add_argument("--gpu-memory-utilization", default=0.9, type=float)
@@ -145,35 +165,55 @@ def collect_test_cases(
     return sorted(test_cases_to_generate, key=sort_key)
 
 
+@lru_cache(maxsize=None)  # cache the result, effectively parsing each func doc file once per process
+def load_multi_turn_func_doc(func_collection: str) -> tuple[dict, ...]:
+    """
+    Load the function docs of a multi-turn API class.
+    The returned docs are shared by every multi-turn entry involving that class, so they must never be modified in place.
+    """
+    # func_doc is a list of dict
+    return tuple(
+        load_file(
+            MULTI_TURN_FUNC_DOC_PATH / MULTI_TURN_FUNC_DOC_FILE_MAPPING[func_collection]
+        )
+    )
+
+
 def process_multi_turn_test_case(test_cases):
     """
     Multi-turn test cases don't have the function doc in the prompt. We need to add them here.
+    The function docs are shared across entries (see `load_multi_turn_func_doc`); each entry only gets its own list of references to them.
     """
     for entry in test_cases:
         if not is_multi_turn(entry["id"]):
             continue
-        involved_classes = entry["involved_classes"]
-        entry["function"] = []
-        for func_collection in involved_classes:
-            # func_doc is a list of dict
-            func_doc = load_file(
-                MULTI_TURN_FUNC_DOC_PATH / MULTI_TURN_FUNC_DOC_FILE_MAPPING[func_collection]
-            )
-            entry["function"].extend(func_doc)
+        all_func_docs = []
+        for func_collection in entry["involved_classes"]:
+            all_func_docs.extend(load_multi_turn_func_doc(func_collection))
 
         # Handle Miss Func category; we need to remove the holdout function doc
+        holdout_indices = set()
         if "missed_function" in entry:
+            func_doc_indices = {}
+            for i, func_doc in enumerate(all_func_docs):
+                func_doc_indices.setdefault(func_doc["name"], []).append(i)
+
             for turn_index, missed_func_names in entry["missed_function"].items():
                 entry["missed_function"][turn_index] = []
                 for missed_func_name in missed_func_names:
-                    for i, func_doc in enumerate(entry["function"]):
-                        if func_doc["name"] == missed_func_name:
-                            # Add the missed function doc to the missed_function list
-                            entry["missed_function"][turn_index].append(func_doc)
-                            # Remove it from the function list
-                            entry["function"].pop(i)
+                    for i in func_doc_indices.get(missed_func_name, []):
+                        if i not in holdout_indices:
+                            # Add the missed function doc to the missed_function list, and remove it from the function list below
+                            holdout_indices.add(i)
+                            entry["missed_function"][turn_index].append(all_func_docs[i])
                             break
 
+        entry["function"] = [
+            func_doc
+            for i, func_doc in enumerate(all_func_docs)
+            if i not in holdout_indices
+        ]
+
     return test_cases
 
 
@@ -186,7 +226,7 @@ def multi_threaded_inference(handler, test_case, include_input_log, exclude_stat
     while True:
         try:
             result, metadata = handler.inference(
-                deepcopy(test_case), include_input_log, exclude_state_log
+                copy_test_entry_for_inference(test_case), include_input_log, exclude_state_log
             )
             break  # Success, exit the loop
         except Exception as e:
@@ -196,10 +236,13 @@ def multi_threaded_inference(handler, test_case, include_input_log, exclude_stat
                 "rate limit reached" in str(e).lower()
                 or (hasattr(e, "status_code") and (e.status_code in {429, 503, 500}))
             ):
+                # The wait comes from the rate limiter shared by all workers of this model, which honours the `Retry-After` header and slows down the other workers too
+                # The retry goes through `BaseHandler._query` again, which reserves its own slot in the rate limiter
+                retry_delay = handler.rate_limiter.on_throttle(e, reserve=False)
                 print(
-                    f"Rate limit reached. Sleeping for 65 seconds. Retry {retry_count + 1}/{RETRY_LIMIT}"
+                    f"Rate limit reached. Sleeping for {retry_delay:.1f} seconds. Retry {retry_count + 1}/{RETRY_LIMIT}"
                 )
-                time.sleep(RETRY_DELAY)
+                time.sleep(retry_delay)
                 retry_count += 1
             else:
                 # This is usually the case when the model getting stuck on one particular test case.
@@ -228,52 +271,153 @@ def multi_threaded_inference(handler, test_case, include_input_log, exclude_stat
     return result_to_write
 
 
+async def async_inference(
+    handler, test_case, include_input_log, exclude_state_log, semaphore
+):
+    """
+    The asyncio counterpart of `multi_threaded_inference`.
+    The semaphore bounds how many entries are in flight at the same time.
+    """
+
+    assert type(test_case["function"]) is list
+
+    retry_count = 0
+
+    async with semaphore:
+        while True:
+            try:
+                result, metadata = await handler.inference_async(
+                    copy_test_entry_for_inference(test_case), include_input_log, exclude_state_log
+                )
+                break  # Success, exit the loop
+            except Exception as e:
+                if retry_count < RETRY_LIMIT and (
+                    "rate limit reached" in str(e).lower()
+                    or (hasattr(e, "status_code") and (e.status_code in {429, 503, 500}))
+                ):
+                    retry_delay = handler.rate_limiter.on_throttle(e, reserve=False)
+                    print(
+                        f"Rate limit reached. Sleeping for {retry_delay:.1f} seconds. Retry {retry_count + 1}/{RETRY_LIMIT}"
+                    )
+                    await asyncio.sleep(retry_delay)
+                    retry_count += 1
+                else:
+                    print("-" * 100)
+                    print(
+                        "❗️❗️ Error occurred during inference. Maximum reties reached for rate limit or other error. Continuing to next test case."
+                    )
+                    print(f"❗️❗️ Test case ID: {test_case['id']}, Error: {str(e)}")
+                    print("-" * 100)
+
+                    return {
+                        "id": test_case["id"],
+                        "result": f"Error during inference: {str(e)}",
+                    }
+
+    result_to_write = {
+        "id": test_case["id"],
+        "result": result,
+    }
+
+    result_to_write.update(metadata)
+
+    return result_to_write
+
+
+async def generate_results_async(args, handler, model_name, test_cases_total):
+    # Without an explicit limit, fall back to the thread count so that switching modes doesn't change the load on the provider
+    semaphore = asyncio.Semaphore(args.max_concurrency or args.num_threads)
+
+    with tqdm(
+        total=len(test_cases_total), desc=f"Generating results for {model_name}"
+    ) as pbar:
+
+        tasks = [
+            asyncio.create_task(
+                async_inference(
+                    handler,
+                    test_case,
+                    args.include_input_log,
+                    args.exclude_state_log,
+                    semaphore,
+                )
+            )
+            for test_case in test_cases_total
+        ]
+
+        # Write the results as they complete; the result files are sorted once the generation is done
+        for task in asyncio.as_completed(tasks):
+            result = await task
+            handler.write(result, result_dir=args.result_dir)
+            pbar.update()
+
+
 def generate_results(args, model_name, test_cases_total):
-    update_mode = args.allow_overwrite
     handler = build_handler(model_name, args.temperature)
-
-    if handler.model_style == ModelStyle.OSSMODEL:
-        # batch_inference will handle the writing of results
-        handler.batch_inference(
-            test_entries=test_cases_total,
-            num_gpus=args.num_gpus,
-            gpu_memory_utilization=args.gpu_memory_utilization,
-            backend=args.backend,
-            skip_server_setup=args.skip_server_setup,
-            include_input_log=args.include_input_log,
-            exclude_state_log=args.exclude_state_log,
-            result_dir=args.result_dir,
-            update_mode=update_mode,
+    if args.response_cache:
+        handler.response_cache = ResponseCache(
+            RESPONSE_CACHE_PATH, args.response_cache_max_size * 1024 * 1024
         )
 
-    else:
-        futures = []
-        with ThreadPoolExecutor(max_workers=args.num_threads) as executor:
-            with tqdm(
-                total=len(test_cases_total), desc=f"Generating results for {model_name}"
-            ) as pbar:
-
-                for test_case in test_cases_total:
-                    future = executor.submit(
-                        multi_threaded_inference,
-                        handler,
-                        test_case,
-                        args.include_input_log,
-                        args.exclude_state_log,
-                    )
-                    futures.append(future)
+    try:
+        if handler.model_style == ModelStyle.OSSMODEL:
+            # batch_inference will handle the writing of results
+            handler.batch_inference(
+                test_entries=test_cases_total,
+                num_gpus=args.num_gpus,
+                gpu_memory_utilization=args.gpu_memory_utilization,
+                backend=args.backend,
+                skip_server_setup=args.skip_server_setup,
+                include_input_log=args.include_input_log,
+                exclude_state_log=args.exclude_state_log,
+                result_dir=args.result_dir,
+            )
+
+        elif args.execution_mode == "async":
+            asyncio.run(generate_results_async(args, handler, model_name, test_cases_total))
 
-                for future in futures:
-                    # This will wait for the task to complete, so that we are always writing in order
-                    result = future.result()
-                    handler.write(
-                        result, result_dir=args.result_dir, update_mode=args.run_ids
-                    )  # Only when we run specific test ids, we will need update_mode=True to keep entries in the same order
-                    pbar.update()
+        else:
+            futures = []
+            with ThreadPoolExecutor(max_workers=args.num_threads) as executor:
+                with tqdm(
+                    total=len(test_cases_total), desc=f"Generating results for {model_name}"
+                ) as pbar:
+
+                    for test_case in test_cases_total:
+                        future = executor.submit(
+                            multi_threaded_inference,
+                            handler,
+                            test_case,
+                            args.include_input_log,
+                            args.exclude_state_log,
+                        )
+                        futures.append(future)
+
+                    # Write the results as they complete, so that a slow entry does not hold back the writing of every entry after it
+                    for future in as_completed(futures):
+                        result = future.result()
+                        # Re-generated entries (eg, with `--run-ids`) are appended after the ones they replace; `compact_result_files` keeps only the latest entry for each id
+                        handler.write(result, result_dir=args.result_dir)
+                        pbar.update()
+
+    finally:
+        # Results were appended in completion order (and re-generated entries appended after the ones they replace), so compact the result files back into sorted order
+        # This also runs when the generation is interrupted, so that the partial result files are usable right away
+        handler.compact_result_files(args.result_dir)
+
+    if handler.response_cache is not None:
+        handler.response_cache.print_stats()
+    if handler.execution_session.created_instances > 0:
+        handler.execution_session.print_stats()
 
 
 def main(args):
 
+    if args.execution_mode not in EXECUTION_MODES:
+        raise ValueError(
+            f"Invalid execution mode: {args.execution_mode}. Must be one of {EXECUTION_MODES}."
+        )
+
     if type(args.model) is not list:
         args.model = [args.model]
     if type(args.test_category) is not list:
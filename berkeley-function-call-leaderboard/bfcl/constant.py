@@ -10,6 +10,12 @@ DOTENV_PATH = "../.env"
 UTILS_PATH = "../utils/"
 PROJECT_ROOT = "../"
 TEST_IDS_TO_GENERATE_PATH = "../test_case_ids_to_generate.json"
+RESPONSE_CACHE_PATH = "../.cache/response/"
+MULTI_TURN_GROUND_TRUTH_CACHE_PATH = "../.cache/multi_turn_ground_truth/"
+VERDICT_CACHE_PATH = "../.cache/verdict/"
+DATASET_MANIFEST_PATH = "../.cache/dataset_manifest.json"
+EXECUTABLE_EXPECTED_OUTPUT_CACHE_PATH = "../.cache/executable_expected_output.json"
+HTTP_CASSETTE_PATH = "../.cache/http_cassette/"
 
 VERSION_PREFIX = "BFCL_v3"
 
@@ -200,6 +206,12 @@ DOTENV_PATH = (script_dir / DOTENV_PATH).resolve()
 UTILS_PATH = (script_dir / UTILS_PATH).resolve()
 PROJECT_ROOT = (script_dir / PROJECT_ROOT).resolve()
 TEST_IDS_TO_GENERATE_PATH = (script_dir / TEST_IDS_TO_GENERATE_PATH).resolve()
+RESPONSE_CACHE_PATH = (script_dir / RESPONSE_CACHE_PATH).resolve()
+MULTI_TURN_GROUND_TRUTH_CACHE_PATH = (script_dir / MULTI_TURN_GROUND_TRUTH_CACHE_PATH).resolve()
+VERDICT_CACHE_PATH = (script_dir / VERDICT_CACHE_PATH).resolve()
+DATASET_MANIFEST_PATH = (script_dir / DATASET_MANIFEST_PATH).resolve()
+EXECUTABLE_EXPECTED_OUTPUT_CACHE_PATH = (script_dir / EXECUTABLE_EXPECTED_OUTPUT_CACHE_PATH).resolve()
+HTTP_CASSETTE_PATH = (script_dir / HTTP_CASSETTE_PATH).resolve()
 
 RESULT_PATH.mkdir(parents=True, exist_ok=True)
 SCORE_PATH.mkdir(parents=True, exist_ok=True)
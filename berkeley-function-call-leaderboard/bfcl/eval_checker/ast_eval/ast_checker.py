@@ -6,6 +6,7 @@ from bfcl.model_handler.constant import (
 from bfcl.eval_checker.ast_eval.type_convertor.java_type_converter import java_type_converter
 from bfcl.eval_checker.ast_eval.type_convertor.js_type_converter import js_type_converter
 import re
+from collections import deque
 
 #### Constants ####
 PYTHON_TYPE_MAPPING = {
@@ -25,19 +26,43 @@ PYTHON_NESTED_TYPE_CHECK_LIST = ["array", "tuple"]
 
 NESTED_CONVERSION_TYPE_LIST = ["Array", "ArrayList", "array"]
 
+# Removes the characters ignored by `standardize_string`: spaces and ",./-_*^"; `str.translate` is several times faster than the equivalent regex substitution
+STANDARDIZE_STRING_DELETION_TABLE = str.maketrans("", "", " ,./-_*^")
+
 
 #### Main function ####
 def ast_checker(
-    func_description, model_output, possible_answer, language, test_category, model_name
+    func_description,
+    model_output,
+    possible_answer,
+    language,
+    test_category,
+    model_name,
+    test_entry_id=None,
 ):
+    # The possible answer is compiled once per test entry, and reused by all the checks against it
+    compiled_possible_answer = get_compiled_entry_answer(
+        possible_answer, test_category, test_entry_id
+    )
+
     if "parallel" in test_category:
         return parallel_function_checker_no_order(
-            func_description, model_output, possible_answer, language, model_name
+            func_description,
+            model_output,
+            possible_answer,
+            language,
+            model_name,
+            compiled_possible_answer,
         )
         
     elif "multiple" in test_category:
         return multiple_function_checker(
-            func_description, model_output, possible_answer, language, model_name
+            func_description,
+            model_output,
+            possible_answer,
+            language,
+            model_name,
+            compiled_possible_answer,
         )
         
     else:
@@ -49,7 +74,12 @@ def ast_checker(
             }
 
         return simple_function_checker(
-            func_description[0], model_output[0], possible_answer[0], language, model_name
+            func_description[0],
+            model_output[0],
+            possible_answer[0],
+            language,
+            model_name,
+            compiled_possible_answer[0],
         )
 
 
@@ -72,6 +102,161 @@ def get_possible_answer_type(possible_answer: list):
     return None
 
 
+class CandidateSet:
+    """
+    The candidate values of a parameter, for membership tests that give the same result as `value in candidates` on the list, in O(1) for hashable values.
+    """
+
+    __slots__ = ("hashable", "unhashable")
+
+    def __init__(self, candidates):
+        hashable = set()
+        self.unhashable = []
+        for candidate in candidates:
+            try:
+                hashable.add(candidate)
+            except TypeError:
+                self.unhashable.append(candidate)
+        self.hashable = frozenset(hashable)
+
+    def __contains__(self, value):
+        try:
+            if value in self.hashable:
+                return True
+        except TypeError:
+            # An unhashable value (eg, a list or a dict) is compared against every candidate, like the list would
+            return any(value == candidate for candidate in self.hashable) or (
+                value in self.unhashable
+            )
+        return value in self.unhashable
+
+
+class CompiledPossibleAnswer:
+    """
+    The candidate values of a parameter, with everything the checkers derive from them computed once: the type of the non-optional candidates, and the candidates as given and standardized, for the value, string and list checks.
+    The standardized forms are computed on first use, as each parameter only goes through the check of its own type.
+    """
+
+    __slots__ = (
+        "answer_type",
+        "_candidates",
+        "_values",
+        "_strings",
+        "_lists",
+        "_dicts",
+        "_list_dicts",
+    )
+
+    def __init__(self, candidates: list):
+        self.answer_type = get_possible_answer_type(candidates)
+        self._candidates = candidates
+        self._values = None
+        self._strings = None
+        self._lists = None
+        self._dicts = None
+        self._list_dicts = None
+
+    @property
+    def values(self) -> CandidateSet:
+        if self._values is None:
+            self._values = CandidateSet(self._candidates)
+        return self._values
+
+    @property
+    def strings(self) -> frozenset:
+        if self._strings is None:
+            self._strings = frozenset(
+                standardize_string(candidate)
+                for candidate in self._candidates
+                if type(candidate) == str
+            )
+        return self._strings
+
+    @property
+    def lists(self) -> CandidateSet:
+        # Each candidate is standardized as a tuple, so that the standardized model output (as a tuple too) can be looked up in O(1)
+        if self._lists is None:
+            self._lists = CandidateSet(
+                tuple(standardize_value(item) for item in candidate)
+                for candidate in self._candidates
+            )
+        return self._lists
+
+    @property
+    def dicts(self) -> list:
+        # One `CompiledDictAnswer` per candidate, for the dict check
+        if self._dicts is None:
+            self._dicts = [CompiledDictAnswer(candidate) for candidate in self._candidates]
+        return self._dicts
+
+    @property
+    def list_dicts(self) -> list[list]:
+        # One `CompiledDictAnswer` per dict of each candidate, for the list of dicts check
+        if self._list_dicts is None:
+            self._list_dicts = [
+                [CompiledDictAnswer(item) for item in candidate]
+                for candidate in self._candidates
+            ]
+        return self._list_dicts
+
+
+class CompiledDictAnswer:
+    """
+    A dict candidate of a parameter, with the candidates of each of its keys standardized once: as a list (for the error message) and as a `CandidateSet`.
+    """
+
+    __slots__ = ("_possible_answer", "_standardized")
+
+    def __init__(self, possible_answer: dict):
+        self._possible_answer = possible_answer
+        self._standardized = {}
+
+    def get_standardized(self, key) -> tuple[list, CandidateSet]:
+        if key not in self._standardized:
+            standardized_candidates = [
+                standardize_value(candidate) for candidate in self._possible_answer[key]
+            ]
+            self._standardized[key] = (
+                standardized_candidates,
+                CandidateSet(standardized_candidates),
+            )
+        return self._standardized[key]
+
+
+# The compiled possible answers of the test category being checked, keyed by test entry id; only one test category is kept, so the cache never outgrows the largest category
+_compiled_entry_answers = {"test_category": None, "entries": {}}
+
+
+def get_compiled_entry_answer(
+    possible_answer: list, test_category: str, test_entry_id=None
+) -> list[dict[str, CompiledPossibleAnswer]]:
+    """
+    Compile the possible answer of a test entry, `[{func1: {param1: [candidate1, candidate2, ...], ...}}, ...]`, into one `CompiledPossibleAnswer` per parameter of each function call.
+    With a test entry id, the compiled form is kept until another test category is checked, so the other checks against the same entry (eg, of the other models evaluated in this process) reuse it; the possible answer of an entry must be the same for all of them.
+    """
+    if test_entry_id is None:
+        return _compile_entry_answer(possible_answer)
+
+    if _compiled_entry_answers["test_category"] != test_category:
+        _compiled_entry_answers["test_category"] = test_category
+        _compiled_entry_answers["entries"] = {}
+    entries = _compiled_entry_answers["entries"]
+    if test_entry_id not in entries:
+        entries[test_entry_id] = _compile_entry_answer(possible_answer)
+    return entries[test_entry_id]
+
+
+def _compile_entry_answer(possible_answer: list) -> list[dict[str, CompiledPossibleAnswer]]:
+    return [
+        {
+            param: CompiledPossibleAnswer(candidates)
+            # Each function call is a dictionary with only one key
+            for param, candidates in list(function_call.values())[0].items()
+        }
+        for function_call in possible_answer
+    ]
+
+
 def convert_func_name(function_name, model_name: str):
     model_name_escaped = model_name.replace("_", "/")
     if "." in function_name:
@@ -89,6 +274,7 @@ def type_checker(
     expected_type_description: str,
     expected_type_converted,
     nested_type_converted,
+    compiled_possible_answer=None,
 ):
     # NOTE: This type checker only supports nested type checking for one level deep.
     # We didn't implement recursive type checking for nested types, as it's not needed for the current use case and it's very complex.
@@ -100,10 +286,13 @@ def type_checker(
         "error_type": "type_error:simple",
     }
 
+    if compiled_possible_answer is None:
+        compiled_possible_answer = CompiledPossibleAnswer(possible_answer)
+
     is_variable = False
     # check for the case where a variable is used instead of a actual value.
     # use the type in possible_answer as the expected type
-    possible_answer_type = get_possible_answer_type(possible_answer)
+    possible_answer_type = compiled_possible_answer.answer_type
     # if possible_answer only contains optional parameters, we can't determine the type
     if possible_answer_type != None:
         # we are being precise here.
@@ -146,7 +335,7 @@ def type_checker(
 
     # value is not as expected, check for the case where a variable is used instead of a actual value
     # use the type in possible_answer as the expected type
-    possible_answer_type = get_possible_answer_type(possible_answer)
+    possible_answer_type = compiled_possible_answer.answer_type
     # if possible_answer only contains optional parameters, we can't determine the type
     if possible_answer_type != None:
         # we are being precise here.
@@ -168,18 +357,29 @@ def standardize_string(input_string: str):
     # It will also convert all the single quotes to double quotes
     # This is used to compare the model output with the possible answers
     # We don't want to punish model for answer like April 1, 2024 vs April 1,2024, vs April 1 2024
-    regex_string = r"[ \,\.\/\-\_\*\^]"
-    return re.sub(regex_string, "", input_string).lower().replace("'", '"')
+    return (
+        input_string.translate(STANDARDIZE_STRING_DELETION_TABLE)
+        .lower()
+        .replace("'", '"')
+    )
+
 
+def standardize_value(value):
+    # Standardize the value if it is a string, and leave it as is otherwise
+    if type(value) == str:
+        return standardize_string(value)
+    return value
 
-def string_checker(param: str, model_output: str, possible_answer: list):
-    standardize_possible_answer = []
+
+def string_checker(
+    param: str, model_output: str, possible_answer: list, compiled_possible_answer=None
+):
+    # The possible answers are standardized once, and reused for every model output checked against them
+    if compiled_possible_answer is None:
+        compiled_possible_answer = CompiledPossibleAnswer(possible_answer)
     standardize_model_output = standardize_string(model_output)
-    for i in range(len(possible_answer)):
-        if type(possible_answer[i]) == str:
-            standardize_possible_answer.append(standardize_string(possible_answer[i]))
 
-    if standardize_model_output not in standardize_possible_answer:
+    if standardize_model_output not in compiled_possible_answer.strings:
         return {
             "valid": False,
             "error": [
@@ -191,29 +391,18 @@ def string_checker(param: str, model_output: str, possible_answer: list):
     return {"valid": True, "error": []}
 
 
-def list_checker(param: str, model_output: list, possible_answer: list):
-    # Convert the tuple to a list
-
-    standardize_model_output = list(model_output)
+def list_checker(
+    param: str, model_output: list, possible_answer: list, compiled_possible_answer=None
+):
+    # The possible answers are standardized once, and reused for every model output checked against them
+    if compiled_possible_answer is None:
+        compiled_possible_answer = CompiledPossibleAnswer(possible_answer)
 
+    # Convert the list (or tuple) to a tuple, the form the possible answers are compiled in
     # If the element in the list is a string, we need to standardize it
-    for i in range(len(standardize_model_output)):
-        if type(standardize_model_output[i]) == str:
-            standardize_model_output[i] = standardize_string(model_output[i])
-
-    standardize_possible_answer = []
-    # We also need to standardize the possible answers
-    for i in range(len(possible_answer)):
-        standardize_possible_answer.append([])
-        for j in range(len(possible_answer[i])):
-            if type(possible_answer[i][j]) == str:
-                standardize_possible_answer[i].append(
-                    standardize_string(possible_answer[i][j])
-                )
-            else:
-                standardize_possible_answer[i].append(possible_answer[i][j])
+    standardize_model_output = tuple(standardize_value(item) for item in model_output)
 
-    if standardize_model_output not in standardize_possible_answer:
+    if standardize_model_output not in compiled_possible_answer.lists:
         return {
             "valid": False,
             "error": [
@@ -225,7 +414,9 @@ def list_checker(param: str, model_output: list, possible_answer: list):
     return {"valid": True, "error": []}
 
 
-def dict_checker(param: str, model_output: dict, possible_answers: list):
+def dict_checker(
+    param: str, model_output: dict, possible_answers: list, compiled_possible_answers=None
+):
     # This function works for simple dictionaries, but not dictionaries with nested dictionaries.
     # The current dataset only contains simple dictionaries, so this is sufficient.
 
@@ -241,7 +432,12 @@ def dict_checker(param: str, model_output: dict, possible_answers: list):
 
         possible_answer = possible_answers[i]
         # possible_anwer is a single dictionary
-        
+        compiled_possible_answer = (
+            compiled_possible_answers[i]
+            if compiled_possible_answers is not None
+            else CompiledDictAnswer(possible_answer)
+        )
+
         for key, value in model_output.items():
             if key not in possible_answer:
                 result["valid"] = False
@@ -250,22 +446,15 @@ def dict_checker(param: str, model_output: dict, possible_answers: list):
                 flag = False
                 break
 
-            standardize_value = value
             # If the value is a string, we need to standardize it
-            if type(value) == str:
-                standardize_value = standardize_string(value)
-                
-            # We also need to standardize the possible answers if they are string
-            standardize_possible_answer = []
-            for i in range(len(possible_answer[key])):
-                if type(possible_answer[key][i]) == str:
-                    standardize_possible_answer.append(
-                        standardize_string(possible_answer[key][i])
-                    )
-                else:
-                    standardize_possible_answer.append(possible_answer[key][i])
+            standardized_value = standardize_value(value)
 
-            if standardize_value not in standardize_possible_answer:
+            # The possible answers are standardized once, and reused for every model output checked against them
+            standardize_possible_answer, standardize_possible_answer_set = (
+                compiled_possible_answer.get_standardized(key)
+            )
+
+            if standardized_value not in standardize_possible_answer_set:
                 result["valid"] = False
                 result["error"].append(
                     f"Invalid value for parameter {repr(key)}: {repr(value)}. Expected one of {standardize_possible_answer}."
@@ -288,7 +477,9 @@ def dict_checker(param: str, model_output: dict, possible_answers: list):
     return result
 
 
-def list_dict_checker(param: str, model_output: list, possible_answers: list):
+def list_dict_checker(
+    param: str, model_output: list, possible_answers: list, compiled_possible_answers=None
+):
     # This function takes in a list of dictionaries and checks if each dictionary is valid
     # The order of the dictionaries in the list must match the order of the possible answers
 
@@ -310,6 +501,11 @@ def list_dict_checker(param: str, model_output: list, possible_answers: list):
                 param,
                 model_output[dict_index],
                 [possible_answers[answer_index][dict_index]],
+                (
+                    [compiled_possible_answers[answer_index][dict_index]]
+                    if compiled_possible_answers is not None
+                    else None
+                ),
             )
             if not result["valid"]:
                 flag = False
@@ -326,7 +522,10 @@ def simple_function_checker(
     possible_answer: dict,
     language: str,
     model_name: str,
+    compiled_possible_answer=None,
 ):
+    if compiled_possible_answer is None:
+        compiled_possible_answer = _compile_entry_answer([possible_answer])[0]
     possible_answer = list(possible_answer.values())[0]
     # Extract function name and parameters details
     func_name = func_description["name"]
@@ -446,6 +645,7 @@ def simple_function_checker(
             expected_type_description,
             expected_type_converted,
             nested_type_converted,
+            compiled_possible_answer[param],
         )
         is_variable = type_check_result["is_variable"]
         if not type_check_result["valid"]:
@@ -456,14 +656,21 @@ def simple_function_checker(
         if not is_variable:
             # Special handle for dictionaries
             if expected_type_converted == dict:
-                result = dict_checker(param, value, possible_answer[param])
+                result = dict_checker(
+                    param, value, possible_answer[param], compiled_possible_answer[param].dicts
+                )
                 if not result["valid"]:
                     return result
                 continue
 
             # Special handle for list of dictionaries
             elif expected_type_converted == list and nested_type_converted == dict:
-                result = list_dict_checker(param, value, possible_answer[param])
+                result = list_dict_checker(
+                    param,
+                    value,
+                    possible_answer[param],
+                    compiled_possible_answer[param].list_dicts,
+                )
                 if not result["valid"]:
                     return result
                 continue
@@ -471,19 +678,23 @@ def simple_function_checker(
             # Special handle for strings
             elif expected_type_converted == str:
                 # We don't check for case sensitivity for string, as long as it's not a variable
-                result = string_checker(param, value, possible_answer[param])
+                result = string_checker(
+                    param, value, possible_answer[param], compiled_possible_answer[param]
+                )
                 if not result["valid"]:
                     return result
                 continue
 
             elif expected_type_converted == list:
-                result = list_checker(param, value, possible_answer[param])
+                result = list_checker(
+                    param, value, possible_answer[param], compiled_possible_answer[param]
+                )
                 if not result["valid"]:
                     return result
                 continue
 
         # Check if the value is within the possible answers
-        if value not in possible_answer[param]:
+        if value not in compiled_possible_answer[param].values:
             result["valid"] = False
             result["error"].append(
                 f"Invalid value for parameter {repr(param)}: {repr(value)}. Expected one of {possible_answer[param]}."
@@ -546,6 +757,7 @@ def parallel_function_checker_no_order(
     possible_answers: list,
     language: str,
     model_name: str,
+    compiled_possible_answers=None,
 ):
     if len(model_output) != len(possible_answers):
         return {
@@ -554,32 +766,46 @@ def parallel_function_checker_no_order(
             "error_type": "parallel_function_checker_no_order:wrong_count",
         }
 
-    matched_indices = []
+    if compiled_possible_answers is None:
+        compiled_possible_answers = _compile_entry_answer(possible_answers)
 
-    # We go throught the possible answers one by one, and eliminate the model output that matches the possible answer
-    # It must be this way because we need ground truth to fetch the correct function description
-    for i in range(len(possible_answers)):
+    # Each pair of possible answer and model output is checked at most once, and the result is reused by both the greedy pass and the full matching below
+    func_descriptions_expected = [
         # possible_answers[i] is a dictionary with only one key
-        func_name_expected = list(possible_answers[i].keys())[0]
-        func_description = find_description(func_descriptions, func_name_expected)
+        find_description(func_descriptions, list(possible_answer.keys())[0])
+        for possible_answer in possible_answers
+    ]
+    checker_results = {}
+
+    def check_pair(i, index):
+        if (i, index) not in checker_results:
+            checker_results[(i, index)] = simple_function_checker(
+                func_descriptions_expected[i],
+                model_output[index],
+                possible_answers[i],
+                language,
+                model_name,
+                compiled_possible_answers[i],
+            )
+        return checker_results[(i, index)]
 
+    # possible answer index -> model output index
+    matching = {}
 
+    # We go throught the possible answers one by one, and eliminate the model output that matches the possible answer
+    # It must be this way because we need ground truth to fetch the correct function description
+    # This greedy pass finds a complete matching in most cases, with the fewest checks
+    for i in range(len(possible_answers)):
         all_errors = []
 
         for index in range(len(model_output)):
-            if index in matched_indices:
+            if index in matching.values():
                 continue
 
-            result = simple_function_checker(
-                func_description,
-                model_output[index],
-                possible_answers[i],
-                language,
-                model_name,
-            )
+            result = check_pair(i, index)
 
             if result["valid"]:
-                matched_indices.append(index)
+                matching[i] = index
                 break
             else:
                 all_errors.append(
@@ -594,8 +820,15 @@ def parallel_function_checker_no_order(
                 )
 
         if not result["valid"]:
+            # A model output taken by an earlier possible answer may have been the only match of this one, while the earlier possible answer also matches another model output
+            # Only a full bipartite matching can tell; the greedy error is reported if there is no complete matching either
+            if _has_complete_matching(
+                len(possible_answers), len(model_output), check_pair, matching
+            ):
+                return {"valid": True, "error": []}
+
             considered_indices = [
-                i for i in range(len(model_output)) if i not in matched_indices
+                i for i in range(len(model_output)) if i not in matching.values()
             ]
             all_errors.insert(
                 0,
@@ -610,12 +843,72 @@ def parallel_function_checker_no_order(
     return {"valid": True, "error": []}
 
 
+def _has_complete_matching(
+    num_possible_answers: int, num_model_outputs: int, check_pair, initial_matching: dict
+) -> bool:
+    """
+    Hopcroft-Karp maximum bipartite matching between the possible answers and the model outputs, where a pair is an edge if the model output passes `simple_function_checker` against the possible answer.
+    Starts from `initial_matching` (possible answer index -> model output index), and returns whether every possible answer can be matched to a distinct model output.
+    """
+    adjacency = [
+        [index for index in range(num_model_outputs) if check_pair(i, index)["valid"]]
+        for i in range(num_possible_answers)
+    ]
+    matched_output = [None] * num_possible_answers
+    matched_answer = [None] * num_model_outputs
+    for i, index in initial_matching.items():
+        matched_output[i] = index
+        matched_answer[index] = i
+
+    while True:
+        # Breadth-first search from the unmatched possible answers, layering the possible answers by the length of their shortest alternating path
+        distance = {}
+        queue = deque()
+        for i in range(num_possible_answers):
+            if matched_output[i] is None:
+                distance[i] = 0
+                queue.append(i)
+        found_augmenting_path = False
+        while queue:
+            i = queue.popleft()
+            for index in adjacency[i]:
+                next_i = matched_answer[index]
+                if next_i is None:
+                    found_augmenting_path = True
+                elif next_i not in distance:
+                    distance[next_i] = distance[i] + 1
+                    queue.append(next_i)
+        if not found_augmenting_path:
+            break
+
+        # Depth-first search along the layers, augmenting the matching with vertex-disjoint shortest paths
+        def augment(i):
+            for index in adjacency[i]:
+                next_i = matched_answer[index]
+                if next_i is None or (
+                    distance.get(next_i) == distance[i] + 1 and augment(next_i)
+                ):
+                    matched_output[i] = index
+                    matched_answer[index] = i
+                    return True
+            # Dead end; no other path goes through this possible answer in this phase
+            distance[i] = None
+            return False
+
+        for i in range(num_possible_answers):
+            if matched_output[i] is None:
+                augment(i)
+
+    return all(index is not None for index in matched_output)
+
+
 def multiple_function_checker(
     func_descriptions: list,
     model_output: list,
     possible_answers: list,
     language: str,
     model_name: str,
+    compiled_possible_answers=None,
 ):
     if len(model_output) != len(possible_answers):
         return {
@@ -633,4 +926,5 @@ def multiple_function_checker(
         possible_answers[0],
         language,
         model_name,
+        compiled_possible_answers[0] if compiled_possible_answers is not None else None,
     )
@@ -0,0 +1,134 @@
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+
+from bfcl.constant import DATASET_MANIFEST_PATH
+from bfcl.utils import decode_json_line, extract_test_category, sort_key
+
+# Bump this whenever the format of the manifest changes
+MANIFEST_FORMAT_VERSION = 1
+
+
+class DatasetCache:
+    """
+    Manifest and in-process cache of the dataset files (prompts and possible answers), shared by the evaluation of all the models.
+
+    The manifest records, for each JSON file of a dataset folder, its test category, entry count, entry IDs and content hash. It is stored on disk and only rebuilt for the files whose size or modification time changed, so finding the file of a test category or counting its entries does not read any file in later runs.
+    The decoded entries of each file are kept in memory, so the dataset is only read once per process, however many models are evaluated. A file modified in the meantime is read again.
+    """
+
+    def __init__(self, manifest_path: Path) -> None:
+        self.manifest_path = Path(manifest_path)
+        self._manifest = self._load_manifest()
+        self._manifest_changed = False
+        # Folder path -> {test category -> file path}
+        self._category_files: dict[str, dict[str, Path]] = {}
+        # (file path, sort_by_id) -> ((size, modification time), entries)
+        self._entries: dict[tuple[str, bool], tuple[tuple[int, int], list[dict]]] = {}
+
+    def find_file(self, folder_path: Path, test_category: str) -> Path:
+        category_files = self._category_files.get(str(folder_path))
+        if category_files is None:
+            category_files = {}
+            for json_file in Path(folder_path).glob("*.json"):
+                category_files[extract_test_category(json_file)] = json_file
+            self._category_files[str(folder_path)] = category_files
+
+        if test_category not in category_files:
+            raise FileNotFoundError(f"No JSON file found with suffix: {test_category}")
+        return category_files[test_category]
+
+    def get_file_info(self, folder_path: Path, test_category: str) -> dict:
+        """
+        Return the manifest entry of the file of the test category: its `path`, `entry_count`, `ids` and `content_hash`.
+        """
+        file_path = self.find_file(folder_path, test_category)
+        file_info = self._manifest.get(str(file_path))
+        if file_info is None or file_info["file_stat"] != list(_get_file_stat(file_path)):
+            self._load_entries(file_path)
+            file_info = self._manifest[str(file_path)]
+        return file_info
+
+    def load(self, folder_path: Path, test_category: str, sort_by_id: bool = False) -> list[dict]:
+        """
+        Return the entries of the file of the test category, like `load_file`.
+        The entries are shared with every other caller, and must not be modified; the returned list itself can be.
+        """
+        file_path = self.find_file(folder_path, test_category)
+        file_stat = _get_file_stat(file_path)
+        cached_entries = self._entries.get((str(file_path), sort_by_id))
+        if cached_entries is None or cached_entries[0] != file_stat:
+            entries = self._load_entries(file_path)
+            if sort_by_id:
+                entries = sorted(entries, key=sort_key)
+            cached_entries = (file_stat, entries)
+            self._entries[(str(file_path), sort_by_id)] = cached_entries
+        return list(cached_entries[1])
+
+    def save_manifest(self) -> None:
+        if not self._manifest_changed:
+            return
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so that an interrupted evaluation never leaves a partially written manifest
+            temp_file_path = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_file_path, "w") as f:
+                json.dump({"version": MANIFEST_FORMAT_VERSION, "files": self._manifest}, f)
+            os.replace(temp_file_path, self.manifest_path)
+            self._manifest_changed = False
+        except OSError as e:
+            # The manifest is only an optimization; it is rebuilt in the next run
+            print(f"Failed to write the dataset manifest: {e}")
+
+    def _load_manifest(self) -> dict:
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if manifest.get("version") != MANIFEST_FORMAT_VERSION:
+            return {}
+        return manifest["files"]
+
+    def _load_entries(self, file_path: Path) -> list[dict]:
+        # The file is read once, both to decode the entries and to update its manifest entry
+        file_stat = _get_file_stat(file_path)
+        content = file_path.read_bytes()
+        entries = [decode_json_line(line) for line in io.StringIO(content.decode())]
+
+        self._manifest[str(file_path)] = {
+            "path": str(file_path),
+            "file_stat": list(file_stat),
+            "test_category": extract_test_category(file_path),
+            "entry_count": len(entries),
+            "ids": [entry["id"] for entry in entries],
+            "content_hash": hashlib.sha256(content).hexdigest(),
+        }
+        self._manifest_changed = True
+        return entries
+
+
+def _get_file_stat(file_path: Path) -> tuple[int, int]:
+    stat = file_path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+_dataset_cache = DatasetCache(DATASET_MANIFEST_PATH)
+
+
+def find_dataset_file(folder_path: Path, test_category: str) -> Path:
+    return _dataset_cache.find_file(folder_path, test_category)
+
+
+def get_dataset_file_info(folder_path: Path, test_category: str) -> dict:
+    return _dataset_cache.get_file_info(folder_path, test_category)
+
+
+def load_dataset_file(folder_path: Path, test_category: str, sort_by_id: bool = False) -> list[dict]:
+    return _dataset_cache.load(folder_path, test_category, sort_by_id)
+
+
+def save_dataset_manifest() -> None:
+    _dataset_cache.save_manifest()
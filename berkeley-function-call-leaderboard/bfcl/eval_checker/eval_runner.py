@@ -1,4 +1,6 @@
 import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
 
 from bfcl.constant import (
     DOTENV_PATH,
@@ -9,20 +11,27 @@ from bfcl.constant import (
     SCORE_PATH,
     TEST_COLLECTION_MAPPING,
     TEST_FILE_MAPPING,
+    VERDICT_CACHE_PATH,
     VERSION_PREFIX,
 )
 from bfcl.eval_checker.ast_eval.ast_checker import ast_checker
+from bfcl.eval_checker.dataset_cache import load_dataset_file, save_dataset_manifest
 from bfcl.eval_checker.eval_runner_helper import *
 from bfcl.eval_checker.executable_eval.custom_exception import BadAPIStatusError
 from bfcl.eval_checker.executable_eval.executable_checker import (
     executable_checker_non_rest,
     executable_checker_rest,
 )
+from bfcl.eval_checker.executable_eval.expected_output_cache import (
+    get_executable_expected_outputs,
+)
+from bfcl.eval_checker.executable_eval.http_transport import print_http_cache_stats
 from bfcl.eval_checker.multi_turn_eval.multi_turn_checker import (
     multi_turn_checker,
     multi_turn_irrelevance_checker,
 )
 from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import is_empty_execute_response
+from bfcl.eval_checker.verdict_cache import VerdictCache
 from bfcl.model_handler.handler_map import HANDLER_MAP
 from bfcl.utils import *
 from dotenv import load_dotenv
@@ -32,14 +41,16 @@ from tqdm import tqdm
 # Key is model name, value is a dictionary with keys as test category and values as a dictionary with accuracy and total count
 LEADERBOARD_TABLE = {}
 
+# Number of entries checked per task when evaluating with multiple worker processes
+# Small enough that the multi-turn categories of a single model spread over many workers, large enough that the per-task overhead stays negligible for the cheap AST categories
+EVALUATION_CHUNK_SIZE = 50
+# Maximum number of chunks submitted to the pool but not yet done, per worker; bounds the memory held by the loaded model results waiting to be checked
+MAX_PENDING_CHUNKS_PER_WORKER = 4
 
-def multi_turn_runner(
-    handler, model_result, prompt, possible_answer, model_name, test_category, score_dir
-):
-    assert (
-        len(model_result) == len(prompt) == len(possible_answer)
-    ), f"The length of the model result ({len(model_result)}) does not match the length of the prompt ({len(prompt)}) or possible answer ({len(possible_answer)}). Please check the input files for completeness."
 
+def _multi_turn_check_entries(
+    handler, model_result, prompt, possible_answer, model_name, test_category
+):
     result = []
     correct_count = 0
     for i in range(len(model_result)):
@@ -47,11 +58,9 @@ def multi_turn_runner(
         # Model result is stored as a list of list of model responses. Each inner list represents a turn.
         multi_turn_model_result_list: list[list] = model_result[i]["result"]
         multi_turn_ground_truth_list: list[list[str]] = possible_answer[i]["ground_truth"]
-        test_entry: dict = prompt[i]
-
         # Remove the function doc from the score file for better readability; they are repeated and way too long
-        if "function" in test_entry:
-            del test_entry["function"]
+        # A copy is made, as the prompt entries are shared with the evaluation of the other models
+        test_entry: dict = {key: value for key, value in prompt[i].items() if key != "function"}
 
         if type(multi_turn_model_result_list) != list:
             result.append(
@@ -150,30 +159,17 @@ def multi_turn_runner(
         else:
             correct_count += 1
 
-    accuracy = correct_count / len(model_result)
-    result.insert(
-        0,
-        {
-            "accuracy": accuracy,
-            "correct_count": correct_count,
-            "total_count": len(model_result),
-        },
-    )
-    output_file_name = f"{VERSION_PREFIX}_{test_category}_score.json"
-    output_file_dir = score_dir / model_name
-    write_list_of_dicts_to_file(output_file_name, result, output_file_dir)
+    return result, correct_count
 
-    return accuracy, len(model_result)
 
-
-def executable_file_runner(
-    handler, model_result, prompt, model_name, test_category, score_dir
+def _executable_check_entries(
+    handler, model_result, prompt, model_name, test_category, start_index=0
 ):
-    assert len(model_result) == len(prompt)
-
+    # `start_index` is the position of the first entry in the whole test category, when only a chunk of it is checked
+    # The REST checker looks up the ground truth by that position
     result = []
     correct_count = 0
-    for i in tqdm(range(len(model_result)), desc="Running tests"):
+    for i in range(len(model_result)):
         index: str = model_result[i]["id"]
         raw_result = model_result[i]["result"]
         try:
@@ -213,7 +209,7 @@ def executable_file_runner(
                 )
                 continue
 
-            checker_result = executable_checker_rest(decoded_result[0], i)
+            checker_result = executable_checker_rest(decoded_result[0], start_index + i)
 
         else:
             if not is_executable_format_output(decoded_result):
@@ -256,25 +252,10 @@ def executable_file_runner(
                 temp["model_executed_output"] = checker_result["model_executed_output"]
             result.append(temp)
 
-    accuracy = correct_count / len(model_result)
-    result.insert(
-        0,
-        {
-            "accuracy": accuracy,
-            "correct_count": correct_count,
-            "total_count": len(model_result),
-        },
-    )
-    output_file_name = f"{VERSION_PREFIX}_{test_category}_score.json"
-    output_file_dir = score_dir / model_name
-    write_list_of_dicts_to_file(output_file_name, result, output_file_dir)
+    return result, correct_count
 
-    return accuracy, len(model_result)
 
-
-def relevance_file_runner(
-    handler, model_result, prompt, model_name, test_category, score_dir
-):
+def _relevance_check_entries(handler, model_result, prompt, model_name, test_category):
     # This function serves for both relevance and irrelevance tests, which share the exact opposite logic.
     # If `test_category` is "irrelevance", the model is expected to output no function call.
     # No function call means either the AST decoding fails (a error message is generated) or the decoded AST does not contain any function call (such as a empty list, `[]`).
@@ -331,23 +312,10 @@ def relevance_file_runner(
 
             result.append(temp)
 
-    accuracy = correct_count / len(model_result)
-    result.insert(
-        0,
-        {
-            "accuracy": accuracy,
-            "correct_count": correct_count,
-            "total_count": len(model_result),
-        },
-    )
-    output_file_name = f"{VERSION_PREFIX}_{test_category}_score.json"
-    output_file_dir = score_dir / model_name
-    write_list_of_dicts_to_file(output_file_name, result, output_file_dir)
-
-    return accuracy, len(model_result)
+    return result, correct_count
 
 
-def ast_file_runner(
+def _ast_check_entries(
     handler,
     model_result,
     prompt,
@@ -355,12 +323,7 @@ def ast_file_runner(
     language,
     test_category,
     model_name,
-    score_dir,
 ):
-    assert (
-        len(model_result) == len(prompt) == len(possible_answer)
-    ), f"The length of the model result ({len(model_result)}) does not match the length of the prompt ({len(prompt)}) or possible answer ({len(possible_answer)}). Please check the input files for completeness."
-
     result = []
     correct_count = 0
     for i in range(len(model_result)):
@@ -415,6 +378,7 @@ def ast_file_runner(
             language,
             test_category,
             model_name,
+            index,
         )
 
         if checker_result["valid"]:
@@ -433,24 +397,19 @@ def ast_file_runner(
             temp["possible_answer"] = possible_answer_item
             result.append(temp)
 
-    accuracy = correct_count / len(model_result)
-    result.insert(
-        0,
-        {
-            "accuracy": accuracy,
-            "correct_count": correct_count,
-            "total_count": len(model_result),
-        },
-    )
-    output_file_name = f"{VERSION_PREFIX}_{test_category}_score.json"
-    output_file_dir = score_dir / model_name
-    write_list_of_dicts_to_file(output_file_name, result, output_file_dir)
-
-    return accuracy, len(model_result)
+    return result, correct_count
 
 
 #### Main runner function ####
-def runner(model_names, test_categories, api_sanity_check, result_dir, score_dir):
+def runner(
+    model_names,
+    test_categories,
+    api_sanity_check,
+    result_dir,
+    score_dir,
+    num_workers=1,
+    use_verdict_cache=True,
+):
 
     # A flag to indicate if the API has been tested.
     # We should always test the API with ground truth first before running the executable tests.
@@ -460,165 +419,398 @@ def runner(model_names, test_categories, api_sanity_check, result_dir, score_dir
     API_STATUS_ERROR_EXECUTABLE = None
 
     # Before running the executable evaluation, we need to get the expected output from the ground truth.
-    # So we need a list of all the test categories that we have ran the ground truth evaluation on.
-    # We only get the expected output once for each test category.
-    EXECUTABLE_TEST_CATEGORIES_HAVE_RUN = []
+    # We only get the expected output once for each test category, and keep it here (test category -> expected output of each entry), instead of writing it to the prompt file.
+    EXECUTABLE_EXPECTED_OUTPUTS = {}
 
-    # Get a list of all entries in the folder
-    entries = result_dir.iterdir()
+    # Only the entries whose model result, prompt, possible answer or checker code changed since the last evaluation are checked again; the others reuse their cached verdict
+    verdict_cache = VerdictCache(VERDICT_CACHE_PATH) if use_verdict_cache else None
 
-    # Filter out the subdirectories
-    subdirs = [entry for entry in entries if entry.is_dir()]
+    # With multiple workers, the entries to check are split into chunks that are checked in a process pool, except those of the executable categories
+    # The files are still loaded, and the API sanity check and executable ground truth are still run, in this process and in the same order as the sequential evaluation
+    executor = ProcessPoolExecutor(max_workers=num_workers) if num_workers > 1 else None
+    try:
+        # The evaluation of each submitted test category, in submission order
+        submitted_evaluations = []
+        pending_chunk_futures = set()
 
-    # Traverse each subdirectory
-    for subdir in tqdm(subdirs, desc="Number of models evaluated"):
+        # Get a list of all entries in the folder
+        entries = result_dir.iterdir()
 
-        model_name = subdir.relative_to(result_dir).name
-        if model_names is not None and model_name not in model_names:
-            continue
+        # Filter out the subdirectories
+        subdirs = [entry for entry in entries if entry.is_dir()]
 
-        model_name_escaped = model_name.replace("_", "/")
+        # Traverse each subdirectory
+        for subdir in tqdm(subdirs, desc="Number of models evaluated"):
 
-        print(f"🦍 Model: {model_name}")
-
-        # Find and process all JSON files in the subdirectory
-        for model_result_json in subdir.glob("*.json"):
-            test_category = extract_test_category(model_result_json)
-            if test_category not in test_categories:
+            model_name = subdir.relative_to(result_dir).name
+            if model_names is not None and model_name not in model_names:
                 continue
 
-            handler = get_handler(model_name_escaped)
-
-            # We don't evaluate chatable and SQL models in our current leaderboard
-            if is_chatable(test_category) or is_sql(test_category):
-                continue
-
-            language = "Python"
-            if is_java(test_category):
-                language = "Java"
-            if is_js(test_category):
-                language = "JavaScript"
-
-            print(f"🔍 Running test: {test_category}")
-
-            model_result = load_file(model_result_json, sort_by_id=True)
-            record_cost_latency(LEADERBOARD_TABLE, model_name, model_result)
+            model_name_escaped = model_name.replace("_", "/")
 
-            # Find the corresponding test file
-            prompt_file = find_file_with_suffix(PROMPT_PATH, test_category)
-            prompt = load_file(prompt_file, sort_by_id=True)
+            print(f"🦍 Model: {model_name}")
 
-            if is_relevance_or_irrelevance(test_category):
-                accuracy, total_count = relevance_file_runner(
-                    handler, model_result, prompt, model_name, test_category, score_dir
-                )
-                record_result(
-                    LEADERBOARD_TABLE, model_name, test_category, accuracy, total_count
-                )
-                print(f"✅ Test completed: {test_category}. 🎯 Accuracy: {accuracy}")
-                continue
+            # Find and process all JSON files in the subdirectory
+            for model_result_json in subdir.glob("*.json"):
+                test_category = extract_test_category(model_result_json)
+                if test_category not in test_categories:
+                    continue
 
-            if is_executable(test_category):
-                # We only test the API with ground truth once
-                if not API_TESTED and api_sanity_check:
-                    print("---- Sanity checking API status ----")
-                    try:
-                        api_status_sanity_check_rest()
-                    except BadAPIStatusError as e:
-                        API_STATUS_ERROR_REST = e
-
-                    try:
-                        api_status_sanity_check_executable()
-                    except BadAPIStatusError as e:
-                        API_STATUS_ERROR_EXECUTABLE = e
-
-                    display_api_status_error(
-                        API_STATUS_ERROR_REST,
-                        API_STATUS_ERROR_EXECUTABLE,
-                        display_success=True,
-                    )
-                    print("Continuing evaluation...")
+                handler = get_handler(model_name_escaped)
 
-                    API_TESTED = True
+                # We don't evaluate chatable and SQL models in our current leaderboard
+                if is_chatable(test_category) or is_sql(test_category):
+                    continue
 
-                if (
-                    test_category not in EXECUTABLE_TEST_CATEGORIES_HAVE_RUN
-                    and not is_rest(test_category)
-                ):
-                    print(
-                        f"---- Getting real-time execution result from ground truth for {test_category} ----"
-                    )
-                    get_executable_expected_output(prompt_file)
-                    print(
-                        f"---- Ground truth real-time execution result obtained for {test_category} 🌟 ----"
+                language = "Python"
+                if is_java(test_category):
+                    language = "Java"
+                if is_js(test_category):
+                    language = "JavaScript"
+
+                print(f"🔍 Running test: {test_category}")
+
+                model_result = load_file(model_result_json, sort_by_id=True)
+                record_cost_latency(LEADERBOARD_TABLE, model_name, model_result)
+
+                # Find the corresponding test file
+                # The dataset files are only read once, and shared by all the models
+                prompt = load_dataset_file(PROMPT_PATH, test_category, sort_by_id=True)
+                possible_answer = None
+
+                if is_executable(test_category):
+                    # We only test the API with ground truth once
+                    if not API_TESTED and api_sanity_check:
+                        print("---- Sanity checking API status ----")
+                        try:
+                            api_status_sanity_check_rest()
+                        except BadAPIStatusError as e:
+                            API_STATUS_ERROR_REST = e
+
+                        try:
+                            api_status_sanity_check_executable()
+                        except BadAPIStatusError as e:
+                            API_STATUS_ERROR_EXECUTABLE = e
+
+                        display_api_status_error(
+                            API_STATUS_ERROR_REST,
+                            API_STATUS_ERROR_EXECUTABLE,
+                            display_success=True,
+                        )
+                        print("Continuing evaluation...")
+
+                        API_TESTED = True
+
+                    if not is_rest(test_category):
+                        if test_category not in EXECUTABLE_EXPECTED_OUTPUTS:
+                            print(
+                                f"---- Getting real-time execution result from ground truth for {test_category} ----"
+                            )
+                            EXECUTABLE_EXPECTED_OUTPUTS[test_category] = (
+                                get_executable_expected_outputs(prompt)
+                            )
+                            print(
+                                f"---- Ground truth real-time execution result obtained for {test_category} 🌟 ----"
+                            )
+                        # The prompt entries are shared with the other models, so the expected output is added to copies of them
+                        prompt = [
+                            {**prompt_entry, "execution_result": execution_result}
+                            for prompt_entry, execution_result in zip(
+                                prompt, EXECUTABLE_EXPECTED_OUTPUTS[test_category]
+                            )
+                        ]
+
+                    assert len(model_result) == len(prompt)
+
+                elif not is_relevance_or_irrelevance(test_category):
+                    # Find the corresponding possible answer file
+                    possible_answer = load_dataset_file(
+                        POSSIBLE_ANSWER_PATH, test_category, sort_by_id=True
                     )
-                    EXECUTABLE_TEST_CATEGORIES_HAVE_RUN.append(test_category)
-                    # Need to re-load the prompt file after getting the expected output, as the prompt file has been updated
-                    prompt = load_file(prompt_file, sort_by_id=True)
 
-                accuracy, total_count = executable_file_runner(
-                    handler, model_result, prompt, model_name, test_category, score_dir
-                )
-                record_result(
-                    LEADERBOARD_TABLE, model_name, test_category, accuracy, total_count
-                )
-                print(f"✅ Test completed: {test_category}. 🎯 Accuracy: {accuracy}")
-
-                continue
+                    assert (
+                        len(model_result) == len(prompt) == len(possible_answer)
+                    ), f"The length of the model result ({len(model_result)}) does not match the length of the prompt ({len(prompt)}) or possible answer ({len(possible_answer)}). Please check the input files for completeness."
 
-            # Find the corresponding possible answer file
-            possible_answer_file = find_file_with_suffix(
-                POSSIBLE_ANSWER_PATH, test_category
-            )
-            possible_answer = load_file(possible_answer_file, sort_by_id=True)
-
-            if is_multi_turn(test_category):
-                accuracy, total_count = multi_turn_runner(
+                evaluation = _start_evaluation(
+                    verdict_cache,
+                    executor,
+                    pending_chunk_futures,
+                    num_workers,
                     handler,
-                    model_result,
-                    prompt,
-                    possible_answer,
                     model_name,
                     test_category,
-                    score_dir,
-                )
-                record_result(
-                    LEADERBOARD_TABLE, model_name, test_category, accuracy, total_count
-                )
-                print(f"✅ Test completed: {test_category}. 🎯 Accuracy: {accuracy}")
-            # Single turn test
-            else:
-                accuracy, total_count = ast_file_runner(
-                    handler,
+                    language,
                     model_result,
                     prompt,
                     possible_answer,
-                    language,
-                    test_category,
-                    model_name,
-                    score_dir,
                 )
+                if executor is not None:
+                    submitted_evaluations.append(evaluation)
+                    continue
+
+                accuracy, total_count = _finish_evaluation(verdict_cache, evaluation, score_dir)
                 record_result(
                     LEADERBOARD_TABLE, model_name, test_category, accuracy, total_count
                 )
                 print(f"✅ Test completed: {test_category}. 🎯 Accuracy: {accuracy}")
 
+        if executor is not None:
+            # Merge the chunks and record the results in submission order, so that the score files and the leaderboard table are the same as with the sequential evaluation
+            for evaluation in submitted_evaluations:
+                accuracy, total_count = _finish_evaluation(verdict_cache, evaluation, score_dir)
+                record_result(
+                    LEADERBOARD_TABLE,
+                    evaluation["model_name"],
+                    evaluation["test_category"],
+                    accuracy,
+                    total_count,
+                )
+                print(
+                    f"✅ Test completed: {evaluation['model_name']} {evaluation['test_category']}. 🎯 Accuracy: {accuracy}"
+                )
+    finally:
+        # Also on failure (eg, while loading the files or in the API sanity check), so that the worker processes never outlive the evaluation
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if verdict_cache is not None:
+        verdict_cache.print_stats()
+    # All the API calls (ground truth, API sanity check and executable checks) are made in this process, even with multiple workers
+    print_http_cache_stats()
+
     # This function reads all the score files from local folder and updates the leaderboard table.
     # This is helpful when you only want to run the evaluation for a subset of models and test categories.
     update_leaderboard_table_with_local_score_file(LEADERBOARD_TABLE, score_dir)
     # Write the leaderboard table to a file
     generate_leaderboard_csv(LEADERBOARD_TABLE, score_dir, model_names, test_categories)
-
-    # Clean up the executable expected output files
-    # They should be re-generated the next time the evaluation is run
-    clean_up_executable_expected_output(PROMPT_PATH, EXECUTABLE_TEST_CATEGORIES_HAVE_RUN)
+    save_dataset_manifest()
 
     display_api_status_error(
         API_STATUS_ERROR_REST, API_STATUS_ERROR_EXECUTABLE, display_success=False
     )
 
 
-def main(model, test_categories, api_sanity_check, result_dir, score_dir):
+def _start_evaluation(
+    verdict_cache,
+    executor,
+    pending_chunk_futures,
+    num_workers,
+    handler,
+    model_name,
+    test_category,
+    language,
+    model_result,
+    prompt,
+    possible_answer,
+):
+    # The verdict of an entry is what checking it contributes to the score file: its error records (if any), and its correct count
+    verdicts = [None] * len(model_result)
+    verdict_keys = None
+
+    # The executable categories are never cached, as their verdicts depend on the live responses of the APIs
+    if verdict_cache is not None and not is_executable(test_category):
+        # The keys are computed before any check, as the multi-turn checker strips the function docs from the prompt entries
+        verdict_keys = [
+            verdict_cache.compute_key(
+                model_result[i],
+                prompt[i],
+                possible_answer[i] if possible_answer is not None else None,
+            )
+            for i in range(len(model_result))
+        ]
+        cached_verdicts = verdict_cache.load(model_name, test_category)
+        for i in range(len(model_result)):
+            verdicts[i] = cached_verdicts.get(verdict_keys[i])
+
+    entry_indices = [i for i in range(len(model_result)) if verdicts[i] is None]
+    # (entry indices, future) of each chunk submitted to the executor
+    chunk_futures = []
+    # The executable categories are always checked in this process, as the HTTP session they call the APIs through is per process: its per-host rate limits (eg, for geocode.maps.co) and its response cache would not be shared by the workers
+    if executor is None or is_executable(test_category):
+        checked_verdicts = _check_entries_individually(
+            handler,
+            model_name,
+            test_category,
+            language,
+            [model_result[i] for i in entry_indices],
+            [prompt[i] for i in entry_indices],
+            (
+                [possible_answer[i] for i in entry_indices]
+                if possible_answer is not None
+                else None
+            ),
+            entry_indices,
+        )
+        for i, verdict in zip(entry_indices, checked_verdicts):
+            verdicts[i] = verdict
+    else:
+        for start_index in range(0, len(entry_indices), EVALUATION_CHUNK_SIZE):
+            chunk_indices = entry_indices[start_index : start_index + EVALUATION_CHUNK_SIZE]
+            # Wait for some chunks to be done before submitting more
+            while len(pending_chunk_futures) >= num_workers * MAX_PENDING_CHUNKS_PER_WORKER:
+                done, _ = wait(pending_chunk_futures, return_when=FIRST_COMPLETED)
+                pending_chunk_futures.difference_update(done)
+
+            chunk_future = executor.submit(
+                _check_entries_in_worker,
+                model_name,
+                test_category,
+                language,
+                [model_result[i] for i in chunk_indices],
+                [prompt[i] for i in chunk_indices],
+                (
+                    [possible_answer[i] for i in chunk_indices]
+                    if possible_answer is not None
+                    else None
+                ),
+                chunk_indices,
+            )
+            chunk_futures.append((chunk_indices, chunk_future))
+            pending_chunk_futures.add(chunk_future)
+
+    return {
+        "model_name": model_name,
+        "test_category": test_category,
+        "verdicts": verdicts,
+        "verdict_keys": verdict_keys,
+        "entry_indices": entry_indices,
+        "chunk_futures": chunk_futures,
+    }
+
+
+def _finish_evaluation(verdict_cache, evaluation, score_dir):
+    model_name = evaluation["model_name"]
+    test_category = evaluation["test_category"]
+    verdicts = evaluation["verdicts"]
+    for chunk_indices, chunk_future in evaluation["chunk_futures"]:
+        for i, verdict in zip(chunk_indices, chunk_future.result()):
+            verdicts[i] = verdict
+
+    if evaluation["verdict_keys"] is not None:
+        verdict_cache.reused += len(verdicts) - len(evaluation["entry_indices"])
+        verdict_cache.checked += len(evaluation["entry_indices"])
+        if evaluation["entry_indices"]:
+            verdict_cache.store(
+                model_name,
+                test_category,
+                dict(zip(evaluation["verdict_keys"], verdicts)),
+            )
+
+    result = []
+    correct_count = 0
+    for entry_result, entry_correct_count in verdicts:
+        result.extend(entry_result)
+        correct_count += entry_correct_count
+    return write_score_file(
+        result, correct_count, len(verdicts), model_name, test_category, score_dir
+    )
+
+
+def _check_entries_individually(
+    handler,
+    model_name,
+    test_category,
+    language,
+    model_result,
+    prompt,
+    possible_answer,
+    entry_indices,
+):
+    # Each entry is checked on its own so that its verdict can be cached; the records and the correct count are the same as checking all the entries at once
+    # `entry_indices` are the positions of the entries in the whole test category, which the REST checker looks up the ground truth by
+    verdicts = []
+    for i in tqdm(
+        range(len(model_result)),
+        desc="Running tests",
+        disable=not is_executable(test_category),
+    ):
+        verdicts.append(
+            _check_entries(
+                handler,
+                model_name,
+                test_category,
+                language,
+                model_result[i : i + 1],
+                prompt[i : i + 1],
+                possible_answer[i : i + 1] if possible_answer is not None else None,
+                entry_indices[i],
+            )
+        )
+    return verdicts
+
+
+def _check_entries(
+    handler,
+    model_name,
+    test_category,
+    language,
+    model_result,
+    prompt,
+    possible_answer,
+    start_index,
+):
+    if is_relevance_or_irrelevance(test_category):
+        return _relevance_check_entries(
+            handler, model_result, prompt, model_name, test_category
+        )
+    if is_executable(test_category):
+        return _executable_check_entries(
+            handler, model_result, prompt, model_name, test_category, start_index
+        )
+    if is_multi_turn(test_category):
+        return _multi_turn_check_entries(
+            handler, model_result, prompt, possible_answer, model_name, test_category
+        )
+    return _ast_check_entries(
+        handler,
+        model_result,
+        prompt,
+        possible_answer,
+        language,
+        test_category,
+        model_name,
+    )
+
+
+def _check_entries_in_worker(
+    model_name,
+    test_category,
+    language,
+    model_result,
+    prompt,
+    possible_answer,
+    entry_indices,
+):
+    # Runs in a worker process; the entries are checked exactly as in the sequential evaluation, but the score file is written by the main process
+    handler = _get_worker_handler(model_name.replace("_", "/"))
+    return _check_entries_individually(
+        handler,
+        model_name,
+        test_category,
+        language,
+        model_result,
+        prompt,
+        possible_answer,
+        entry_indices,
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_worker_handler(model_name):
+    # Each worker process builds the handler of a model once, and reuses it for all the chunks of that model
+    return get_handler(model_name)
+
+
+def main(
+    model,
+    test_categories,
+    api_sanity_check,
+    result_dir,
+    score_dir,
+    num_workers=1,
+    use_verdict_cache=True,
+):
     if result_dir is None:
         result_dir = RESULT_PATH
     else:
@@ -657,7 +849,15 @@ def main(model, test_categories, api_sanity_check, result_dir, score_dir):
             model_names.append(model_name.replace("/", "_"))
 
     # Driver function to run the evaluation for all categories involved.
-    runner(model_names, all_test_categories, api_sanity_check, result_dir, score_dir)
+    runner(
+        model_names,
+        all_test_categories,
+        api_sanity_check,
+        result_dir,
+        score_dir,
+        num_workers,
+        use_verdict_cache,
+    )
 
     if len(skipped_categories) > 0:
         print("----------")
@@ -713,6 +913,18 @@ if __name__ == "__main__":
         type=str,
         help="Path to the folder where the evaluation score files will be stored; relative to the `berkeley-function-call-leaderboard` root folder",
     )
+    parser.add_argument(
+        "--num-workers",
+        default=1,
+        type=int,
+        help="The number of worker processes to check the model results with. The default (1) evaluates everything in the main process",
+    )
+    parser.add_argument(
+        "--no-verdict-cache",
+        action="store_true",
+        default=False,
+        help="Check every entry again, instead of reusing the cached verdicts of the entries whose model result, prompt, possible answer and checker code are unchanged since the last evaluation",
+    )
 
     args = parser.parse_args()
 
@@ -723,4 +935,6 @@ if __name__ == "__main__":
         args.api_sanity_check,
         args.result_dir,
         args.score_dir,
+        args.num_workers,
+        not args.no_verdict_cache,
     )
@@ -1,18 +1,26 @@
+import itertools
 import os
-import statistics
 from datetime import datetime
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 from bfcl._apply_function_credential_config import apply_function_credential_config
-from bfcl.constant import PROMPT_PATH, TEST_FILE_MAPPING
+from bfcl.constant import PROMPT_PATH
 from bfcl.eval_checker.constant import *
+from bfcl.eval_checker.dataset_cache import get_dataset_file_info
 from bfcl.eval_checker.executable_eval.custom_exception import BadAPIStatusError
 from bfcl.eval_checker.model_metadata import *
+from bfcl.eval_checker.score_blob_store import SCORE_BLOB_DIR_NAME, intern_score_entry
+from bfcl.eval_checker.score_summary import (
+    SCORE_SUMMARY_FILE_NAME,
+    get_score_file_path,
+    get_score_metadata,
+    load_score_summary,
+    update_score_summary,
+)
 from bfcl.utils import (
     extract_test_category,
-    find_file_with_suffix,
     load_file,
     write_list_of_dicts_to_file,
 )
@@ -113,35 +121,6 @@ def display_api_status_error(rest_error, executable_error, display_success=False
     print(f"{RED_FONT}{'-' * 100}\n{RESET}")
 
 
-def get_executable_expected_output(prompt_file_path):
-    # Before we run the evaluation, we need to add the "execution_result" field to the prompt file, using the ground truth data.
-    prompt_content = load_file(prompt_file_path)
-    exec_dict = {}
-    for item in tqdm(prompt_content, desc="Getting Executable Expected Output"):
-        execution_result = []
-        ground_truth = item["ground_truth"]
-        for i in range(len(ground_truth)):
-            exec(
-                "from bfcl.eval_checker.executable_eval.data.executable_python_function import *"
-                + "\nresult="
-                + ground_truth[i],
-                exec_dict,
-            )
-            execution_result.append(exec_dict["result"])
-        item["execution_result"] = execution_result
-
-    write_list_of_dicts_to_file(prompt_file_path, prompt_content)
-
-
-def clean_up_executable_expected_output(prompt_path, categories):
-    for category in categories:
-        prompt_file = find_file_with_suffix(prompt_path, category)
-        prompt_content = load_file(prompt_file)
-        for item in prompt_content:
-            del item["execution_result"]
-        write_list_of_dicts_to_file(prompt_file, prompt_content)
-
-
 def calculate_weighted_accuracy(accuracy_dict_list, display_na_if_category_missing=True):
     has_na = False
     total_count = 0
@@ -191,6 +170,28 @@ def calculate_unweighted_accuracy(accuracy_dict_list, display_na_if_category_mis
 
     return result
 
+def write_score_file(result, correct_count, total_count, model_name, test_category, score_dir):
+    accuracy = correct_count / total_count
+    metadata = {
+        "accuracy": accuracy,
+        "correct_count": correct_count,
+        "total_count": total_count,
+    }
+    output_file_path = get_score_file_path(score_dir, model_name, test_category)
+    # The prompts and possible answers are the same for every model, so each one is stored once in the blob store of the score directory, and the entries refer to it
+    write_list_of_dicts_to_file(
+        output_file_path.name,
+        itertools.chain(
+            [metadata], (intern_score_entry(entry, score_dir) for entry in result)
+        ),
+        output_file_path.parent,
+    )
+    # The leaderboard is regenerated from the summary index, so the (possibly huge) score files are not read again
+    update_score_summary(output_file_path, test_category, metadata)
+
+    return accuracy, total_count
+
+
 def record_result(leaderboard_table, model_name, test_category, accuracy, total_count):
     if model_name not in leaderboard_table:
         leaderboard_table[model_name] = {}
@@ -200,35 +201,67 @@ def record_result(leaderboard_table, model_name, test_category, accuracy, total_
     }
 
 
+class MetricSamples:
+    """
+    The samples of one cost or latency metric of a model, across all its test categories.
+    They are stored in a preallocated NumPy array, which doubles in size when full, so a sample takes 8 bytes instead of a Python float and a list slot.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self) -> None:
+        self._samples = np.empty(self.INITIAL_CAPACITY, dtype=np.float64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def samples(self) -> np.ndarray:
+        return self._samples[: self._size]
+
+    def extend(self, samples: np.ndarray) -> None:
+        new_size = self._size + len(samples)
+        if new_size > len(self._samples):
+            grown_samples = np.empty(
+                max(new_size, 2 * len(self._samples)), dtype=np.float64
+            )
+            grown_samples[: self._size] = self.samples
+            self._samples = grown_samples
+        self._samples[self._size : new_size] = samples
+        self._size = new_size
+
+
 def record_cost_latency(leaderboard_table, model_name, model_output_data):
-    def process_data(key, data, output_list):
+    def iter_values(key):
         # All entries are either a list of list (in multi-turn), or a single value (in single-turn)
-        if key in data:
-            if isinstance(data[key], list) and all(
-                isinstance(inner_item, list) for inner_item in data[key]
-            ):
-                flattened_list = sum(data[key], [])
-                output_list.extend([item for item in flattened_list if item != 0])
-            else:
-                if data[key] != 0:
-                    output_list.append(data[key])
+        for data in model_output_data:
+            if key in data:
+                if isinstance(data[key], list):
+                    for inner_item in data[key]:
+                        if isinstance(inner_item, list):
+                            yield from inner_item
+                        else:
+                            yield inner_item
+                else:
+                    yield data[key]
 
     if model_name not in leaderboard_table:
         leaderboard_table[model_name] = {}
-        leaderboard_table[model_name]["cost"] = {"input_data": [], "output_data": []}
-        leaderboard_table[model_name]["latency"] = {"data": []}
-
-    input_token = []
-    output_token = []
-    latency = []
-    for data in model_output_data:
-        process_data("latency", data, latency)
-        process_data("input_token_count", data, input_token)
-        process_data("output_token_count", data, output_token)
+        leaderboard_table[model_name]["cost"] = {
+            "input_data": MetricSamples(),
+            "output_data": MetricSamples(),
+        }
+        leaderboard_table[model_name]["latency"] = {"data": MetricSamples()}
 
-    leaderboard_table[model_name]["cost"]["input_data"].extend(input_token)
-    leaderboard_table[model_name]["cost"]["output_data"].extend(output_token)
-    leaderboard_table[model_name]["latency"]["data"].extend(latency)
+    for key, metric_samples in [
+        ("latency", leaderboard_table[model_name]["latency"]["data"]),
+        ("input_token_count", leaderboard_table[model_name]["cost"]["input_data"]),
+        ("output_token_count", leaderboard_table[model_name]["cost"]["output_data"]),
+    ]:
+        values = np.fromiter(iter_values(key), dtype=np.float64)
+        # Zero means that the metric was not recorded for that entry or turn
+        metric_samples.extend(values[values != 0])
 
 
 def get_cost_letency_info(model_name, cost_data, latency_data):
@@ -241,8 +274,8 @@ def get_cost_letency_info(model_name, cost_data, latency_data):
         and len(cost_data["output_data"]) > 0
     ):
 
-        mean_input_token = statistics.mean(cost_data["input_data"])
-        mean_output_token = statistics.mean(cost_data["output_data"])
+        mean_input_token = float(cost_data["input_data"].samples.mean())
+        mean_output_token = float(cost_data["output_data"].samples.mean())
         cost = (
             mean_input_token * INPUT_PRICE_PER_MILLION_TOKEN[model_name]
             + mean_output_token * OUTPUT_PRICE_PER_MILLION_TOKEN[model_name]
@@ -262,12 +295,12 @@ def get_cost_letency_info(model_name, cost_data, latency_data):
     #     cost = round(cost, 2)
 
     if len(latency_data["data"]) != 0:
-        mean_latency = statistics.mean(latency_data["data"])
-        std_latency = statistics.stdev(latency_data["data"])
-        percentile_95_latency = np.percentile(latency_data["data"], 95)
-        mean_latency = round(mean_latency, 2)
-        std_latency = round(std_latency, 2)
-        percentile_95_latency = round(percentile_95_latency, 2)
+        latency_samples = latency_data["data"].samples
+        mean_latency = round(float(latency_samples.mean()), 2)
+        # The sample standard deviation is undefined for a single sample
+        if len(latency_samples) > 1:
+            std_latency = round(float(latency_samples.std(ddof=1)), 2)
+        percentile_95_latency = round(float(np.percentile(latency_samples, 95)), 2)
 
         # if model_name not in INPUT_PRICE_PER_MILLION_TOKEN:
         #     cost = sum(latency_data["data"]) * V100_x8_PRICE_PER_HOUR / 3600
@@ -285,8 +318,8 @@ def get_category_score(score_dict: dict, test_category: str) -> dict:
         score["display_accuracy"] = score["accuracy"]
         return score
     else:
-        test_file_path = TEST_FILE_MAPPING[test_category]
-        num_entry = len(load_file(PROMPT_PATH / test_file_path))
+        # The entry count is recorded in the dataset manifest, so the prompt file is not read again
+        num_entry = get_dataset_file_info(PROMPT_PATH, test_category)["entry_count"]
         # If a category is not being evaluated, it needs to be distinguished from the situation where the evaluation score is 0
         # It will still be considered 0 in the overall score calculation though
         # We use `display_accuracy` to special handle
@@ -335,8 +368,10 @@ def generate_leaderboard_csv(
     for model_name, value in leaderboard_table.items():
         model_name_escaped = model_name.replace("_", "/")
 
-        cost_data = value.get("cost", {"input_data": [], "output_data": []})
-        latency_data = value.get("latency", {"data": []})
+        cost_data = value.get(
+            "cost", {"input_data": MetricSamples(), "output_data": MetricSamples()}
+        )
+        latency_data = value.get("latency", {"data": MetricSamples()})
         cost, latency_mean, latency_std, percentile_95_latency = get_cost_letency_info(
             model_name_escaped, cost_data, latency_data
         )
@@ -773,17 +808,25 @@ def update_leaderboard_table_with_local_score_file(
 
     entries = score_path.iterdir()
 
-    # Filter out the subdirectories
-    subdirs = [entry for entry in entries if entry.is_dir()]
+    # Filter out the subdirectories, except the blob store shared by the models
+    subdirs = [
+        entry
+        for entry in entries
+        if entry.is_dir() and entry.name != SCORE_BLOB_DIR_NAME
+    ]
 
     # Traverse each subdirectory
     for subdir in subdirs:
         model_name = subdir.relative_to(score_path).name
+        # Only the small summary index of the model is read, as long as it is up to date with the score files
+        score_summary = load_score_summary(subdir)
         # Find and process all JSON files in the subdirectory
         for model_score_json in subdir.glob("*.json"):
-            metadata = load_file(model_score_json)[0]
-            accuracy, total_count = metadata["accuracy"], metadata["total_count"]
+            if model_score_json.name == SCORE_SUMMARY_FILE_NAME:
+                continue
             test_category = extract_test_category(model_score_json)
+            metadata = get_score_metadata(model_score_json, test_category, score_summary)
+            accuracy, total_count = metadata["accuracy"], metadata["total_count"]
             if model_name not in leaderboard_table:
                 leaderboard_table[model_name] = {}
             if test_category not in leaderboard_table[model_name]:
@@ -1,8 +1,10 @@
 import os
 import math
-import requests
 from bfcl.eval_checker.executable_eval.custom_exception import NoAPIKeyError
-import time
+from bfcl.eval_checker.executable_eval.http_transport import (
+    get_http_session,
+    sleep_unless_replaying,
+)
 
 # Make sure the env variables are populated
 ENV_VARS = ("GEOCODE_API_KEY", "RAPID_API_KEY", "OMDB_API_KEY", "EXCHANGERATE_API_KEY")
@@ -340,7 +342,7 @@ def get_weather_data(coordinates):
         "temperature_unit": "fahrenheit",
     }
 
-    response = requests.get(url, params=params)
+    response = get_http_session().get(url, params=params)
     if response.status_code == 200:
         return response.json()["current"]["temperature_2m"]
     else:
@@ -357,11 +359,10 @@ def get_coordinates_from_city(city_name):
     Returns:
     tuple: The latitude and longitude of the city.
     """
-    time.sleep(2)  # To avoid rate limiting
     url = "https://geocode.maps.co/search"
     params = {"q": city_name, "api_key": api_key["GEOCODE-API-KEY"]}
 
-    response = requests.get(url, params=params)
+    response = get_http_session().get(url, params=params)
     if response.status_code == 200:
         data = response.json()
         if data:
@@ -386,7 +387,7 @@ def convert_currency(amount, from_currency, to_currency):
     """
     key = api_key["EXCHANGERATE-API-KEY"]
     base_url = f"https://v6.exchangerate-api.com/v6/{key}/latest/{from_currency}"
-    response = requests.get(base_url)
+    response = get_http_session().get(base_url)
 
     if response.status_code == 200:
         data = response.json()
@@ -415,7 +416,7 @@ def find_term_on_urban_dictionary(term):
         "X-RapidAPI-Host": "mashape-community-urban-dictionary.p.rapidapi.com",
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = get_http_session().get(url, headers=headers, params=querystring)
 
     return response.json()["list"][0]["definition"]
 
@@ -427,7 +428,7 @@ def get_coordinate_by_ip_address(ip_address):
         ip_address (str): The IP address to find the location of.
     """
     url = f"http://ip-api.com/json/{ip_address}"
-    response = requests.get(url)
+    response = get_http_session().get(url)
     try:
         return (response.json()["lat"], response.json()["lon"])
     except:
@@ -441,7 +442,7 @@ def get_zipcode_by_ip_address(ip_address):
         ip_address (str): The IP address to find the location of.
     """
     url = f"http://ip-api.com/json/{ip_address}"
-    response = requests.get(url)
+    response = get_http_session().get(url)
     try:
         return response.json()["zip"]
     except:
@@ -463,7 +464,7 @@ def get_covid_death_by_country(country):
         "X-RapidAPI-Host": "covid-193.p.rapidapi.com",
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = get_http_session().get(url, headers=headers, params=querystring)
     try:
         return response.json()["response"][0]["deaths"]["total"]
     except:
@@ -485,7 +486,7 @@ def get_active_covid_case_by_country(country):
         "X-RapidAPI-Host": "covid-193.p.rapidapi.com",
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = get_http_session().get(url, headers=headers, params=querystring)
     try:
         return response.json()["response"][0]["cases"]["active"]
     except:
@@ -503,13 +504,15 @@ def get_rating_by_amazon_ASIN(ASIN):
     retries = 0
     max_retries = 5
     while retries < max_retries:
-        response = requests.get(url, headers=headers, params=querystring)
+        response = get_http_session().get(url, headers=headers, params=querystring)
         try:
             return response.json()["data"]["product_star_rating"]
         except KeyError:
             wait_time = 2**retries  # Exponential backoff: 1, 2, 4 seconds
-            time.sleep(wait_time)
+            sleep_unless_replaying(wait_time)
             retries += 1
+            # Retry with a fresh response, not the cached one; the fresh response also replaces the cached one for the later calls
+            headers["Cache-Control"] = "no-cache"
 
     return None
 
@@ -525,13 +528,15 @@ def get_price_by_amazon_ASIN(ASIN):
     retries = 0
     max_retries = 5
     while retries < max_retries:
-        response = requests.get(url, headers=headers, params=querystring)
+        response = get_http_session().get(url, headers=headers, params=querystring)
         try:
             return response.json()["data"]["product_price"]
         except KeyError:
             wait_time = 2**retries  # Exponential backoff: 1, 2, 4 seconds
-            time.sleep(wait_time)
+            sleep_unless_replaying(wait_time)
             retries += 1
+            # Retry with a fresh response, not the cached one; the fresh response also replaces the cached one for the later calls
+            headers["Cache-Control"] = "no-cache"
 
     return None
 
@@ -547,13 +552,15 @@ def get_product_name_by_amazon_ASIN(ASIN):
     retries = 0
     max_retries = 5
     while retries < max_retries:
-        response = requests.get(url, headers=headers, params=querystring)
+        response = get_http_session().get(url, headers=headers, params=querystring)
         try:
             return response.json()["data"]["product_title"]
         except KeyError:
             wait_time = 2**retries  # Exponential backoff: 1, 2, 4 seconds
-            time.sleep(wait_time)
+            sleep_unless_replaying(wait_time)
             retries += 1
+            # Retry with a fresh response, not the cached one; the fresh response also replaces the cached one for the later calls
+            headers["Cache-Control"] = "no-cache"
 
     return None
 
@@ -573,7 +580,7 @@ def get_company_name_by_stock_name(stock_name):
         "X-RapidAPI-Host": "yahoo-finance15.p.rapidapi.com",
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = get_http_session().get(url, headers=headers, params=querystring)
     try:
         return response.json()["body"][0]["name"]
     except:
@@ -595,7 +602,7 @@ def get_stock_price_by_stock_name(stock_name):
         "X-RapidAPI-Host": "yahoo-finance15.p.rapidapi.com",
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = get_http_session().get(url, headers=headers, params=querystring)
     try:
         return float(response.json()["body"][0]["regularMarketPrice"])
     except:
@@ -623,7 +630,7 @@ def get_stock_history(stock_name, interval, diffandsplits="true"):
         "X-RapidAPI-Host": "yahoo-finance15.p.rapidapi.com",
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = get_http_session().get(url, headers=headers, params=querystring)
     try:
         data = response.json()["body"]
         return {key: data[key] for key in list(data)[-10:]}
@@ -638,7 +645,7 @@ def retrieve_city_based_on_zipcode(zipcode):
         zipcode (str): The zipcode of the city.
     """
     url = f"http://ziptasticapi.com/{zipcode}"
-    response = requests.get(url)
+    response = get_http_session().get(url)
     try:
         return response.json()["city"]
     except:
@@ -653,7 +660,7 @@ def retrieve_holiday_by_year(country, year):
         country (str): The country of the holidays. Possible options: US, AT, DE, ES, FR, GB, IT, NL, PL, RO, SK, UA.
     """
     url = f"https://date.nager.at/api/v3/publicholidays/{year}/{country}"
-    response = requests.get(url)
+    response = get_http_session().get(url)
     return response.json()
 
 
@@ -673,7 +680,7 @@ def get_time_zone_by_coord(long, lat):
         "X-RapidAPI-Host": "timezone-by-location.p.rapidapi.com",
     }
 
-    response = requests.get(url, headers=headers, params=querystring)
+    response = get_http_session().get(url, headers=headers, params=querystring)
     try:
         return response.json()["Zones"][0]["TimezoneId"]
     except:
@@ -864,7 +871,7 @@ def get_movie_rating(movie_name):
     """
     url = "http://www.omdbapi.com/"
     params = {"t": movie_name, "apikey": api_key["OMDB-API-KEY"]}
-    response = requests.get(url, params=params)
+    response = get_http_session().get(url, params=params)
     return response.json()["Rated"]
 
 
@@ -876,7 +883,7 @@ def get_movie_director(movie_name):
     """
     url = "http://www.omdbapi.com/"
     params = {"t": movie_name, "apikey": api_key["OMDB-API-KEY"]}
-    response = requests.get(url, params=params)
+    response = get_http_session().get(url, params=params)
     return response.json()["Director"]
 
 
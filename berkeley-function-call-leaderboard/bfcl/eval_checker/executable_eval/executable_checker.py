@@ -1,13 +1,12 @@
 import json
-import time
 from functools import lru_cache
 
-import requests  # Do not remove this import even though it seems to be unused. It's used in the executable_checker_rest function.
 from bfcl.eval_checker.constant import (
     REAL_TIME_MATCH_ALLOWED_DIFFERENCE,
     REST_EVAL_GROUND_TRUTH_PATH,
 )
 from bfcl.eval_checker.executable_eval.custom_exception import NoAPIKeyError
+from bfcl.eval_checker.executable_eval.http_transport import get_http_session
 
 # Load the ground truth data for the `rest` test category
 @lru_cache(maxsize=1)  # cache the result, effectively loading data once
@@ -19,12 +18,11 @@ def load_eval_ground_truth():
 def executable_checker_rest(func_call, idx):
     EVAL_GROUND_TRUTH = load_eval_ground_truth()
     
-    if "https://geocode.maps.co" in func_call:
-        time.sleep(2)
     if "requests_get" in func_call:
         func_call = func_call.replace("requests_get", "requests.get")
     try:
-        response = eval(func_call)
+        # Same namespace as the module, except that the HTTP session stands in for the `requests` module; it records or replays the responses, and waits between the requests to rate limited hosts (eg, geocode.maps.co)
+        response = eval(func_call, {**globals(), "requests": get_http_session()})
     except Exception as e:
         return {
             "valid": False,
@@ -0,0 +1,194 @@
+import ast
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from pathlib import Path
+
+from bfcl.constant import EXECUTABLE_EXPECTED_OUTPUT_CACHE_PATH
+from bfcl.utils import make_json_serializable
+from tqdm import tqdm
+
+# Bump this whenever the format of the cache file changes
+CACHE_FORMAT_VERSION = 1
+EXECUTABLE_FUNCTION_SOURCE_PATH = (
+    Path(__file__).parent / "data" / "executable_python_function.py"
+)
+# The ground truth functions mostly wait on API calls, so they are run in threads
+NUM_THREADS = 8
+# The names through which the functions send HTTP requests
+HTTP_CLIENT_NAMES = {"requests", "get_http_session"}
+
+
+class ExpectedOutputCache:
+    """
+    Sidecar cache of the expected outputs of the executable test categories, ie the execution results of their ground truth function calls.
+
+    The expected outputs are attached to copies of the prompt entries, so the prompt files are never rewritten, and several evaluations can share one checkout.
+    The results are keyed by a hash of the ground truth function call. The deterministic ones are stored on disk together with a hash of `executable_python_function.py`, and reused until that file changes.
+    The results of the functions that call an external API (real-time data such as weather or stock prices) are never stored on disk; they are computed once per process, like before.
+    """
+
+    def __init__(self, cache_path: Path) -> None:
+        self.cache_path = Path(cache_path)
+        self._results = None
+        self._new_results = {}
+        self._real_time_results = {}
+
+    def get_expected_outputs(self, prompt_entries: list[dict]) -> list[list]:
+        """
+        Return the expected output of each prompt entry: the list of the execution results of its ground truth function calls.
+        """
+        if self._results is None:
+            self._results = self._load()
+
+        ground_truths = {
+            ground_truth
+            for entry in prompt_entries
+            for ground_truth in entry["ground_truth"]
+            if self._get_cached_result(ground_truth) is None
+        }
+        if ground_truths:
+            self._compute(sorted(ground_truths))
+            self._save()
+
+        return [
+            [self._get_cached_result(ground_truth)[0] for ground_truth in entry["ground_truth"]]
+            for entry in prompt_entries
+        ]
+
+    def _get_cached_result(self, ground_truth: str):
+        # Wrapped in a tuple, so that a `None` execution result is told apart from a missing one
+        if _is_real_time(ground_truth):
+            return self._real_time_results.get(ground_truth)
+        key = _compute_key(ground_truth)
+        if key in self._results:
+            return (self._results[key],)
+        return None
+
+    def _compute(self, ground_truths: list[str]) -> None:
+        with ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
+            futures = {
+                executor.submit(_execute_ground_truth, ground_truth): ground_truth
+                for ground_truth in ground_truths
+            }
+            for future in tqdm(
+                as_completed(futures),
+                total=len(futures),
+                desc="Getting Executable Expected Output",
+            ):
+                ground_truth = futures[future]
+                result = future.result()
+                if _is_real_time(ground_truth):
+                    self._real_time_results[ground_truth] = (result,)
+                else:
+                    self._results[_compute_key(ground_truth)] = result
+                    self._new_results[_compute_key(ground_truth)] = result
+
+    def _load(self) -> dict:
+        try:
+            with open(self.cache_path) as f:
+                cache_content = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if (
+            cache_content.get("version") != CACHE_FORMAT_VERSION
+            or cache_content.get("source_hash") != _compute_source_hash()
+        ):
+            return {}
+        return cache_content["results"]
+
+    def _save(self) -> None:
+        if not self._new_results:
+            return
+        try:
+            # Merge with the results stored by any other evaluation in the meantime
+            results = {**self._load(), **self._new_results}
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so that an interrupted evaluation never leaves a partially written file
+            temp_file_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_file_path, "w") as f:
+                json.dump(
+                    {
+                        "version": CACHE_FORMAT_VERSION,
+                        "source_hash": _compute_source_hash(),
+                        "results": results,
+                    },
+                    f,
+                )
+            os.replace(temp_file_path, self.cache_path)
+            self._new_results = {}
+        except OSError as e:
+            # The cache is only an optimization; the expected outputs are computed again in the next run
+            print(f"Failed to write the executable expected output cache: {e}")
+
+
+def _execute_ground_truth(ground_truth: str):
+    result = eval(ground_truth, dict(_get_function_namespace()))
+    # The expected outputs used to be read back from the prompt file they were written to, so they go through the same JSON round trip (eg, tuples become lists)
+    return json.loads(json.dumps(make_json_serializable(result)))
+
+
+@lru_cache(maxsize=1)  # cache the result, effectively importing the functions once
+def _get_function_namespace() -> dict:
+    # Equivalent to `from ...executable_python_function import *`; imported lazily, as it requires the API keys to be set
+    from bfcl.eval_checker.executable_eval.data import executable_python_function
+
+    return {
+        name: value
+        for name, value in vars(executable_python_function).items()
+        if not name.startswith("_")
+    }
+
+
+@lru_cache(maxsize=1)  # cache the result, effectively hashing the source code once
+def _compute_source_hash() -> str:
+    return hashlib.sha256(EXECUTABLE_FUNCTION_SOURCE_PATH.read_bytes()).hexdigest()
+
+
+@lru_cache(maxsize=1)  # cache the result, effectively parsing the source code once
+def _get_real_time_function_names() -> frozenset:
+    # A function is real-time if it sends HTTP requests to an external API, or calls another real-time function
+    module = ast.parse(EXECUTABLE_FUNCTION_SOURCE_PATH.read_text())
+    referenced_names = {
+        node.name: {child.id for child in ast.walk(node) if isinstance(child, ast.Name)}
+        for node in module.body
+        if isinstance(node, ast.FunctionDef)
+    }
+    real_time_function_names = set(HTTP_CLIENT_NAMES)
+    while True:
+        new_names = {
+            function_name
+            for function_name, names in referenced_names.items()
+            if function_name not in real_time_function_names
+            and names & real_time_function_names
+        }
+        if not new_names:
+            break
+        real_time_function_names |= new_names
+    return frozenset(real_time_function_names - HTTP_CLIENT_NAMES)
+
+
+@lru_cache(maxsize=None)
+def _is_real_time(ground_truth: str) -> bool:
+    try:
+        expression = ast.parse(ground_truth, mode="eval")
+    except SyntaxError:
+        # Never cache what cannot be analyzed; the execution raises the error anyway
+        return True
+    return any(
+        isinstance(node, ast.Name) and node.id in _get_real_time_function_names()
+        for node in ast.walk(expression)
+    )
+
+
+def _compute_key(ground_truth: str) -> str:
+    return hashlib.sha256(ground_truth.encode()).hexdigest()
+
+
+_expected_output_cache = ExpectedOutputCache(EXECUTABLE_EXPECTED_OUTPUT_CACHE_PATH)
+
+
+def get_executable_expected_outputs(prompt_entries: list[dict]) -> list[list]:
+    return _expected_output_cache.get_expected_outputs(prompt_entries)
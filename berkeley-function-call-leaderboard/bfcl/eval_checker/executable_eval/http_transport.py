@@ -0,0 +1,296 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from bfcl.constant import HTTP_CASSETTE_PATH
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# The HTTP modes of the executable test categories, set by the `BFCL_HTTP_MODE` environment variable
+# - `live` (default): send every request to the API
+# - `record`: send every request to the API, and store its response in the cassette store
+# - `replay`: answer every request from the cassette store, without any network access; a request that was never recorded fails
+HTTP_MODES = ("live", "record", "replay")
+# Bump this whenever the format of the recorded responses changes
+CASSETTE_FORMAT_VERSION = 1
+# The API keys are redacted from the URLs before they are hashed or stored, so that responses recorded with one set of keys are replayed with any other
+# Query parameters that hold an API key
+API_KEY_QUERY_PARAMS = ("api_key", "apikey")
+# URLs that hold an API key in their path; the first group is kept, and the rest of the match redacted
+API_KEY_PATH_PATTERNS = (re.compile(r"^(https?://v6\.exchangerate-api\.com/v6/)[^/]+"),)
+# Minimum time in seconds between two requests sent to the same host, to stay under its rate limit; never applied to replayed requests
+# It is only enforced within a process, which is why the executable categories are never checked in the worker processes of `--num-workers`
+HOST_MIN_REQUEST_INTERVALS = {"geocode.maps.co": 2}
+# The functions of the executable test categories may be run from many threads at once
+MAX_POOL_CONNECTIONS = 32
+# How long in seconds a live response is reused for the same request, unless the `BFCL_HTTP_CACHE_TTL` environment variable is set; `0` disables the response cache
+# The same API calls are made for the ground truth, the API sanity check and every model, and the real-time data they return is compared with a tolerance anyway
+DEFAULT_RESPONSE_CACHE_TTL = 300
+# Bounds the memory held by the response cache; the oldest responses are dropped first
+MAX_CACHED_RESPONSES = 4096
+
+
+class CassetteMissError(requests.exceptions.ConnectionError):
+    def __init__(self, method, url):
+        self.message = f"No recorded response for {method} {url}. Record it first with `BFCL_HTTP_MODE=record`."
+        super().__init__(self.message)
+
+
+class ResponseCache:
+    """
+    Thread-safe in-memory cache of the successful responses to GET requests, each reused for `ttl` seconds.
+
+    A response is keyed by the whole request (URL and headers), API keys included, so a request sent with other credentials is never answered from the cache. A request with a `Cache-Control: no-cache` header is never answered from the cache, but its fresh response still replaces the cached one, so that a retry after a bad response fixes the cache for the later identical requests.
+    """
+
+    def __init__(self, ttl: float, max_size: int = MAX_CACHED_RESPONSES) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Key -> (expiry time, recorded response)
+        self._responses: dict[str, tuple[float, dict]] = {}
+
+    def is_cacheable(self, request) -> bool:
+        return self.ttl > 0 and request.method == "GET" and request.body is None
+
+    def is_lookup_allowed(self, request) -> bool:
+        return "no-cache" not in request.headers.get("Cache-Control", "")
+
+    def get(self, key: str):
+        with self._lock:
+            cached_response = self._responses.get(key)
+            if cached_response is not None and cached_response[0] < time.monotonic():
+                del self._responses[key]
+                cached_response = None
+            if cached_response is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return cached_response[1]
+
+    def put(self, key: str, recorded_response: dict) -> None:
+        if recorded_response["status_code"] != 200:
+            return
+        with self._lock:
+            # A replaced response moves to the end, as the newest one
+            self._responses.pop(key, None)
+            if len(self._responses) >= self.max_size:
+                # Dicts keep the insertion order, so the first key is the oldest response
+                del self._responses[next(iter(self._responses))]
+            self._responses[key] = (time.monotonic() + self.ttl, recorded_response)
+
+    def print_stats(self) -> None:
+        print(f"HTTP response cache: {self.hits} hits, {self.misses} misses.")
+
+
+class CassetteAdapter(HTTPAdapter):
+    """
+    Transport adapter of the HTTP session of the executable test categories, which records and replays the responses.
+
+    The cassette store is content-addressed: each response body is stored once in `blobs/`, named by its hash, and each request in `requests/`, named by the hash of its method, URL (API keys redacted) and body, points to the body of its last recorded response.
+    Writes are atomic, so several threads or processes can record into the same store.
+    """
+
+    def __init__(self, mode: str, cassette_dir: Path, response_cache: ResponseCache) -> None:
+        if mode not in HTTP_MODES:
+            raise ValueError(f"Invalid HTTP mode: {mode}. Must be one of {HTTP_MODES}.")
+        super().__init__(pool_connections=MAX_POOL_CONNECTIONS, pool_maxsize=MAX_POOL_CONNECTIONS)
+        self.mode = mode
+        self.cassette_dir = Path(cassette_dir)
+        # Only used for the requests sent to the APIs; replayed responses are already read from disk
+        self.response_cache = response_cache
+        self._host_locks = {host: threading.Lock() for host in HOST_MIN_REQUEST_INTERVALS}
+        self._host_last_request_times = {}
+
+    def send(self, request, **kwargs):
+        redacted_url = _redact(request.url)
+        key = _compute_request_key(request.method, redacted_url, request.body)
+        if self.mode == "replay":
+            response = self._load(key, request)
+            if response is None:
+                raise CassetteMissError(request.method, redacted_url)
+            return response
+
+        cache_key = None
+        if self.response_cache.is_cacheable(request):
+            cache_key = _compute_cache_key(request)
+            if self.response_cache.is_lookup_allowed(request):
+                cached_response = self.response_cache.get(cache_key)
+                if cached_response is not None:
+                    return _build_response(request, cached_response, cached_response["content"])
+
+        self._wait_for_host(urlsplit(request.url).hostname)
+        response = super().send(request, **kwargs)
+        if cache_key is not None or self.mode == "record":
+            # Reading the content here loads the whole body, which `send` would otherwise only do when it is accessed
+            recorded_response = _record_response(response)
+            if cache_key is not None:
+                self.response_cache.put(cache_key, recorded_response)
+            if self.mode == "record":
+                self._store(key, redacted_url, recorded_response)
+        return response
+
+    def _wait_for_host(self, host) -> None:
+        if host not in self._host_locks:
+            return
+        with self._host_locks[host]:
+            last_request_time = self._host_last_request_times.get(host)
+            if last_request_time is not None:
+                time.sleep(
+                    max(0, last_request_time + HOST_MIN_REQUEST_INTERVALS[host] - time.monotonic())
+                )
+            self._host_last_request_times[host] = time.monotonic()
+
+    def _load(self, key, request):
+        try:
+            with open(self.cassette_dir / "requests" / f"{key}.json") as f:
+                recorded_response = json.load(f)
+            content = (self.cassette_dir / "blobs" / recorded_response["body_hash"]).read_bytes()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if recorded_response.get("version") != CASSETTE_FORMAT_VERSION:
+            return None
+        return _build_response(request, recorded_response, content)
+
+    def _store(self, key, redacted_url, recorded_response) -> None:
+        content = recorded_response["content"]
+        body_hash = hashlib.sha256(content).hexdigest()
+        cassette_entry = {
+            "version": CASSETTE_FORMAT_VERSION,
+            "url": redacted_url,
+            "status_code": recorded_response["status_code"],
+            "reason": recorded_response["reason"],
+            "headers": recorded_response["headers"],
+            "encoding": recorded_response["encoding"],
+            "body_hash": body_hash,
+        }
+        try:
+            blob_path = self.cassette_dir / "blobs" / body_hash
+            if not blob_path.exists():
+                _write_atomically(blob_path, content)
+            _write_atomically(
+                self.cassette_dir / "requests" / f"{key}.json",
+                json.dumps(cassette_entry, indent=2).encode(),
+            )
+        except OSError as e:
+            # The response is still returned; only the recording is lost
+            print(f"Failed to record the response of {redacted_url}: {e}")
+
+
+def get_http_mode() -> str:
+    return os.getenv("BFCL_HTTP_MODE") or "live"
+
+
+@lru_cache(maxsize=1)  # cache the result, effectively sharing one session (and its connection pool) per process
+def get_http_session() -> requests.Session:
+    """
+    Return the HTTP session used by the functions of the executable test categories and by the REST checker, in place of the `requests` module.
+    The `BFCL_HTTP_MODE` environment variable selects the mode (see `HTTP_MODES`), `BFCL_HTTP_CASSETTE_DIR` the cassette store (defaults to `.cache/http_cassette/`), and `BFCL_HTTP_CACHE_TTL` how long the live responses are reused (see `ResponseCache`).
+    """
+    response_cache_ttl = os.getenv("BFCL_HTTP_CACHE_TTL")
+    adapter = CassetteAdapter(
+        get_http_mode(),
+        os.getenv("BFCL_HTTP_CASSETTE_DIR") or HTTP_CASSETTE_PATH,
+        ResponseCache(
+            float(response_cache_ttl) if response_cache_ttl else DEFAULT_RESPONSE_CACHE_TTL
+        ),
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def print_http_cache_stats() -> None:
+    # Nothing to report if no HTTP request was sent in this process
+    if get_http_session.cache_info().currsize == 0:
+        return
+    response_cache = get_http_session().get_adapter("https://").response_cache
+    if response_cache.hits or response_cache.misses:
+        response_cache.print_stats()
+
+
+def sleep_unless_replaying(seconds: float) -> None:
+    # Waiting for an API to recover (eg, before a retry) is pointless when the responses are replayed
+    if get_http_mode() != "replay":
+        time.sleep(seconds)
+
+
+def _redact(url: str) -> str:
+    for pattern in API_KEY_PATH_PATTERNS:
+        url = pattern.sub(r"\1<API_KEY>", url)
+
+    scheme, netloc, path, query, fragment = urlsplit(url)
+    query = urlencode(
+        [
+            (name, "<API_KEY>" if name.lower() in API_KEY_QUERY_PARAMS else value)
+            for name, value in parse_qsl(query, keep_blank_values=True)
+        ]
+    )
+    return urlunsplit((scheme, netloc, path, query, fragment))
+
+
+def _compute_request_key(method: str, redacted_url: str, body) -> str:
+    if body is None:
+        body = b""
+    elif isinstance(body, str):
+        body = body.encode()
+    elif not isinstance(body, bytes):
+        # Streamed bodies are not read, as they could not be sent afterwards; they are keyed by their type only
+        body = repr(type(body)).encode()
+    return hashlib.sha256(
+        json.dumps(
+            [method, redacted_url, base64.b64encode(body).decode()]
+        ).encode()
+    ).hexdigest()
+
+
+def _compute_cache_key(request) -> str:
+    # The `Cache-Control` header is left out, so that the fresh response to a `no-cache` request replaces the cached response to the same request
+    headers = sorted(
+        (name, value) for name, value in request.headers.items() if name.lower() != "cache-control"
+    )
+    return hashlib.sha256(json.dumps([request.url, headers]).encode()).hexdigest()
+
+
+def _record_response(response) -> dict:
+    return {
+        "status_code": response.status_code,
+        "reason": response.reason,
+        "headers": dict(response.headers),
+        "encoding": response.encoding,
+        "content": response.content,
+    }
+
+
+def _build_response(request, recorded_response: dict, content: bytes) -> requests.Response:
+    # A new response every time, as the callers may consume or modify it
+    response = requests.Response()
+    response.status_code = recorded_response["status_code"]
+    response.reason = recorded_response["reason"]
+    response.headers = CaseInsensitiveDict(recorded_response["headers"])
+    response.encoding = recorded_response["encoding"]
+    response.url = request.url
+    response.request = request
+    response._content = content
+    return response
+
+
+def _write_atomically(file_path: Path, content: bytes) -> None:
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first, so that an interrupted recording never leaves a partially written file
+    temp_file_path = file_path.with_name(
+        f"{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    temp_file_path.write_bytes(content)
+    os.replace(temp_file_path, file_path)
@@ -0,0 +1,163 @@
+import copy
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+from bfcl.constant import MULTI_TURN_GROUND_TRUTH_CACHE_PATH
+from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import ExecutionSession
+
+# Bump this whenever the format of the cached entries changes
+CACHE_FORMAT_VERSION = 1
+# The execution results depend on the backend implementations as much as on the dataset, so their source code is part of the dataset hash
+BACKEND_SOURCE_PATHS = sorted(
+    (Path(__file__).parent / "func_source_code").glob("*.py")
+) + [Path(__file__).parent / "multi_turn_utils.py"]
+# Maximum number of entries kept in memory, beyond which the least recently used ones are dropped (they stay on disk); enough for all the multi-turn categories, each entry taking tens of KB
+MAX_MEMORY_CACHED_ENTRIES = 1024
+
+
+class GroundTruthExecutionCache:
+    """
+    Cache of the ground truth execution of the multi-turn entries: for each turn, the execution results of the ground truth function calls, and a snapshot of the public attributes of every instance after that turn.
+
+    The ground truth trajectory is the same for every model, so it is executed once and then reused by the evaluation of all the other models, in this process (in memory) and in later runs (on disk).
+    Each entry is stored as a pickle file named after its test entry ID, along with a hash of everything the execution depends on (the initial config, the involved classes, the ground truth, and the backend source code); an entry whose hash no longer matches is executed again.
+    At most `max_memory_entries` entries are kept in memory; the least recently used ones are read back from disk when needed again.
+    """
+
+    def __init__(
+        self, cache_dir: Path, max_memory_entries: int = MAX_MEMORY_CACHED_ENTRIES
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_memory_entries = max_memory_entries
+        self._lock = threading.Lock()
+        # Test entry ID -> (dataset hash, turns), in least recently used order
+        self._memory_cache: OrderedDict[str, tuple[str, list[dict]]] = OrderedDict()
+
+    def get(
+        self, test_entry: dict, ground_truth_list: list[list[str]], long_context: bool
+    ) -> list[dict]:
+        """
+        Return, for each turn, a dict with the `execution_results` of the ground truth function calls and the `instance_states` of the involved classes after that turn.
+        The returned value is shared across callers, and must not be modified.
+        """
+        test_entry_id = test_entry["id"]
+        dataset_hash = _compute_dataset_hash(test_entry, ground_truth_list, long_context)
+
+        with self._lock:
+            cached_entry = self._memory_cache.get(test_entry_id)
+            if cached_entry is not None:
+                self._memory_cache.move_to_end(test_entry_id)
+        if cached_entry is not None and cached_entry[0] == dataset_hash:
+            return cached_entry[1]
+
+        turns = self._load(test_entry_id, dataset_hash)
+        if turns is None:
+            turns = _execute_ground_truth(test_entry, ground_truth_list, long_context)
+            self._store(test_entry_id, dataset_hash, turns)
+
+        with self._lock:
+            self._memory_cache[test_entry_id] = (dataset_hash, turns)
+            self._memory_cache.move_to_end(test_entry_id)
+            while len(self._memory_cache) > self.max_memory_entries:
+                self._memory_cache.popitem(last=False)
+        return turns
+
+    def _get_file_path(self, test_entry_id: str) -> Path:
+        return self.cache_dir / f"{test_entry_id}.pkl"
+
+    def _load(self, test_entry_id: str, dataset_hash: str):
+        try:
+            with open(self._get_file_path(test_entry_id), "rb") as f:
+                cached_entry = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Corrupted entry, or written by an incompatible version of the backends; it will be overwritten
+            return None
+
+        if cached_entry["dataset_hash"] != dataset_hash:
+            return None
+        return cached_entry["turns"]
+
+    def _store(self, test_entry_id: str, dataset_hash: str, turns: list[dict]) -> None:
+        file_path = self._get_file_path(test_entry_id)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so that concurrent evaluations never see a partially written entry
+            temp_file_path = file_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(temp_file_path, "wb") as f:
+                pickle.dump({"dataset_hash": dataset_hash, "turns": turns}, f)
+            os.replace(temp_file_path, file_path)
+        except OSError as e:
+            # The cache is only an optimization; the evaluation goes on without it (eg, on a read-only install)
+            print(f"Failed to write the ground truth execution cache for {test_entry_id}: {e}")
+
+
+@lru_cache(maxsize=1)  # cache the result, effectively hashing the source code once
+def _compute_backend_source_hash() -> str:
+    source_hash = hashlib.sha256()
+    for source_path in BACKEND_SOURCE_PATHS:
+        source_hash.update(source_path.read_bytes())
+    return source_hash.hexdigest()
+
+
+def _compute_dataset_hash(
+    test_entry: dict, ground_truth_list: list[list[str]], long_context: bool
+) -> str:
+    key_content = {
+        "version": CACHE_FORMAT_VERSION,
+        "initial_config": test_entry["initial_config"],
+        "involved_classes": test_entry["involved_classes"],
+        "ground_truth": ground_truth_list,
+        "long_context": long_context,
+        "backend_source": _compute_backend_source_hash(),
+        # Some backends format timestamps in the local timezone
+        "timezone": time.timezone,
+    }
+    return hashlib.sha256(json.dumps(key_content, sort_keys=True).encode()).hexdigest()
+
+
+def _execute_ground_truth(
+    test_entry: dict, ground_truth_list: list[list[str]], long_context: bool
+) -> list[dict]:
+    turns = []
+    with ExecutionSession() as execution_session:
+        for single_turn_ground_truth_list in ground_truth_list:
+            execution_results, ground_truth_instances = execution_session.step(
+                "ground_truth",
+                single_turn_ground_truth_list,
+                test_entry["initial_config"],
+                test_entry["involved_classes"],
+                long_context=long_context,
+            )
+            turns.append(
+                {
+                    "execution_results": execution_results,
+                    # Deep copy, as the instances keep changing in the following turns
+                    "instance_states": {
+                        class_name: {
+                            key: copy.deepcopy(value)
+                            for key, value in vars(class_instance).items()
+                            if not key.startswith("_")
+                        }
+                        for class_name, class_instance in ground_truth_instances.items()
+                    },
+                }
+            )
+    return turns
+
+
+_ground_truth_execution_cache = GroundTruthExecutionCache(MULTI_TURN_GROUND_TRUTH_CACHE_PATH)
+
+
+def get_ground_truth_execution(
+    test_entry: dict, ground_truth_list: list[list[str]], long_context: bool
+) -> list[dict]:
+    return _ground_truth_execution_cache.get(test_entry, ground_truth_list, long_context)
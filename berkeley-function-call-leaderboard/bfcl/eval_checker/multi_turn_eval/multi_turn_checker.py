@@ -1,5 +1,8 @@
+from bfcl.eval_checker.multi_turn_eval.ground_truth_cache import (
+    get_ground_truth_execution,
+)
 from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
-    execute_multi_turn_func_call,
+    ExecutionSession,
     is_empty_execute_response,
 )
 
@@ -23,6 +26,13 @@ def multi_turn_checker(
     test_category: str = test_entry_id.rsplit("_", 1)[0]
     execution_results: list[dict] = []
     all_turn_model_execution_results: list[str] = []
+    long_context: bool = "long_context" in test_category or "composite" in test_category
+    # The model instances of this entry live in their own session, and are released with it once the checker returns
+    execution_session = ExecutionSession()
+    # The ground truth execution is the same for every model, so it is only executed once and then served from the cache
+    ground_truth_turns: list[dict] = get_ground_truth_execution(
+        test_entry, multi_turn_ground_truth_list, long_context
+    )
 
     # First execute all the function calls
     for turn_index, single_turn_ground_truth_list in enumerate(
@@ -39,35 +49,22 @@ def multi_turn_checker(
     
         for single_step_model_response in single_turn_model_response_list:
             single_step_model_execution_results, model_instances = (
-                execute_multi_turn_func_call(
-                    func_call_list=single_step_model_response,
-                    initial_config=initial_config,
-                    involved_classes=involved_classes,
-                    model_name=model_name,
-                    test_entry_id=test_entry_id,
-                    long_context=(
-                        "long_context" in test_category or "composite" in test_category
-                    ),
-                    is_evaL_run=True,
+                execution_session.step(
+                    "model",
+                    single_step_model_response,
+                    initial_config,
+                    involved_classes,
+                    long_context=long_context,
                 )
             )
             single_turn_model_execution_results.extend(single_step_model_execution_results)
             single_turn_model_execution_results_uncombined.append(single_step_model_execution_results)
 
-        # Execute the ground truth function calls
-        single_turn_ground_truth_execution_results, ground_truth_instances = (
-            execute_multi_turn_func_call(
-                func_call_list=single_turn_ground_truth_list,
-                initial_config=initial_config,
-                involved_classes=involved_classes,
-                model_name=model_name + "_ground_truth",
-                test_entry_id=test_entry_id,
-                long_context=(
-                    "long_context" in test_category or "composite" in test_category
-                ),
-                is_evaL_run=True,
-            )
-        )
+        # The ground truth execution results and instance states after this turn
+        single_turn_ground_truth_execution_results = ground_truth_turns[turn_index][
+            "execution_results"
+        ]
+        ground_truth_instance_states = ground_truth_turns[turn_index]["instance_states"]
 
         all_turn_model_execution_results.extend(single_turn_model_execution_results)
         execution_results.append(
@@ -99,12 +96,12 @@ def multi_turn_checker(
 
         ## Check after each turn ##
         assert len(model_instances) == len(
-            ground_truth_instances
-        ), f"Model instances and ground truth instances do not match in length for turn {turn_index}. Model instances: {len(model_instances)}, Ground truth instances: {len(ground_truth_instances)}"
-        assert set(model_instances.keys()) == set(ground_truth_instances.keys())
+            ground_truth_instance_states
+        ), f"Model instances and ground truth instances do not match in length for turn {turn_index}. Model instances: {len(model_instances)}, Ground truth instances: {len(ground_truth_instance_states)}"
+        assert set(model_instances.keys()) == set(ground_truth_instance_states.keys())
 
         # Check the state of the instances
-        state_check_result = state_checker(model_instances, ground_truth_instances)
+        state_check_result = state_checker(model_instances, ground_truth_instance_states)
         if not state_check_result["valid"]:
             state_check_result["execution_result"] = execution_results
             return state_check_result
@@ -159,14 +156,14 @@ def multi_turn_irrelevance_checker(
 #### Sub-Chekcers ####
 
 
-def state_checker(model_instances: dict, ground_truth_instances: dict):
+def state_checker(model_instances: dict, ground_truth_instance_states: dict):
     """
     Checks if, after executing the function calls, the model_instance has the same state (defined by the attributes) as the ground_truth_instance.
-    It checks if every instance in the model_instances has the same attributes as their corresponding instance (of the same class) from ground_truth_instances.
+    It checks if every instance in the model_instances has the same attributes as the state snapshot of their corresponding ground truth instance (of the same class) from ground_truth_instance_states.
     """
-    for class_name, ground_truth_instance in ground_truth_instances.items():
+    for class_name, ground_truth_instance_state in ground_truth_instance_states.items():
         model_instance = model_instances[class_name]
-        valid, differences = _compare_instances(model_instance, ground_truth_instance)
+        valid, differences = _compare_instance_state(model_instance, ground_truth_instance_state)
 
         if not valid:
             model_instance_attributes = {
@@ -174,11 +171,7 @@ def state_checker(model_instances: dict, ground_truth_instances: dict):
                 for key, value in vars(model_instance).items()
                 if not key.startswith("_")
             }
-            ground_truth_instance_attributes = {
-                key: value
-                for key, value in vars(ground_truth_instance).items()
-                if not key.startswith("_")
-            }
+            ground_truth_instance_attributes = ground_truth_instance_state
             # Format the error message for better readability
             return {
                 "valid": False,
@@ -256,21 +249,15 @@ def method_invoke_order_checker(model_instances: dict, ground_truth_instances: d
 #### Helper functions ####
 
 
-def _compare_instances(model_obect, ground_truth_object):
+def _compare_instance_state(model_obect, ground_truth_state: dict):
     """
-    Checks if the model_object has the same attributes as the ground_truth_object. They are instances of the same class.
+    Checks if the model_object has the same attributes as the ground_truth_state, which is a snapshot of the public attributes of a ground truth instance of the same class.
     """
-    assert type(model_obect) == type(
-        ground_truth_object
-    ), "Objects are not of the same type."
     differences = {}
     valid = True
-    for attr_name in vars(ground_truth_object):
-        # We don't check for private attributes
-        if attr_name.startswith("_"):
-            continue
+    # Private attributes are not part of the snapshot, so they are not checked
+    for attr_name, ground_truth_attr in ground_truth_state.items():
         model_attr = getattr(model_obect, attr_name)
-        ground_truth_attr = getattr(ground_truth_object, attr_name)
 
         if model_attr != ground_truth_attr:
             valid = False
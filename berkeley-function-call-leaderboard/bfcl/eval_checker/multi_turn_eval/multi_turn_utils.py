@@ -1,8 +1,13 @@
+import ast
 import importlib
 import inspect
+import itertools
 import json
-import re
 import copy
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Hashable, Optional
 
 CLASS_FILE_PATH_MAPPING = {
     "GorillaFileSystem": "bfcl.eval_checker.multi_turn_eval.func_source_code.gorilla_file_system",
@@ -20,6 +25,168 @@ STATELESS_CLASSES = [
     "MathAPI",
 ]
 
+# Function names that are never executed, even if a backend class happens to define them
+BLOCKED_FUNCTION_NAMES = ["kill", "exit", "quit", "remove", "unlink", "popen", "Popen", "run"]
+
+
+# Maximum number of conversations whose instances are kept alive by the session behind `execute_multi_turn_func_call`, beyond which the least recently used ones are released
+# Its callers never close their conversations, so this bounds the memory they hold; the other sessions are unbounded, as their owners close every conversation once it is done
+DEFAULT_MAX_LIVE_SCOPES = 1024
+
+
+class ExecutionSession:
+    """
+    Owns the backend instances (eg, `GorillaFileSystem`, `TradingBot`) that the function calls of multi-turn conversations are executed against.
+
+    Each conversation is identified by a scope (eg, the test entry ID). Its instances are created from the initial config on first use (`create`), carried over from one step to the next (`step`), and released once the conversation is done (`close`).
+    If `max_live_scopes` is set, at most that many conversations are kept alive at once; beyond that, the least recently used ones are released, and a conversation that is stepped again after that restarts from its initial config, so a warning is printed.
+    A session can be shared by several threads, as long as each scope is only used by one thread at a time.
+    """
+
+    def __init__(self, max_live_scopes: Optional[int] = None) -> None:
+        self.max_live_scopes = max_live_scopes
+
+        self._lock = threading.Lock()
+        # Scope -> (involved instances, method name to bound method dispatch table), in least recently used order
+        self._scopes: OrderedDict[Hashable, tuple[dict, dict]] = OrderedDict()
+
+        self.live_instances = 0
+        self.peak_live_instances = 0
+        self.created_instances = 0
+        self.closed_scopes = 0
+        self.evicted_scopes = 0
+
+    def create(
+        self,
+        scope: Hashable,
+        initial_config: dict,
+        involved_classes: list,
+        long_context: bool = False,
+    ) -> dict:
+        """
+        Return the instances of the conversation, keyed by class name.
+        They are created from the initial config if the conversation is not live yet, and reused as is otherwise.
+        """
+        involved_instances, _ = self._get_or_create_scope(
+            scope, initial_config, involved_classes, long_context
+        )
+        return involved_instances
+
+    def step(
+        self,
+        scope: Hashable,
+        func_call_list: list[str],
+        initial_config: dict,
+        involved_classes: list,
+        long_context: bool = False,
+    ) -> tuple[list[str], dict]:
+        """
+        Execute a list of function calls against the instances of the conversation, creating them first if needed.
+        Returns the execution result of each function call, and the instances keyed by class name.
+        """
+        involved_instances, method_dispatch_table = self._get_or_create_scope(
+            scope, initial_config, involved_classes, long_context
+        )
+        execution_results = _execute_func_calls(func_call_list, method_dispatch_table)
+        return execution_results, involved_instances
+
+    def close(self, scope: Optional[Hashable] = None) -> None:
+        """
+        Release the instances of the conversation, or of all the conversations if no scope is given.
+        Closing a scope that is not live is a no-op.
+        """
+        with self._lock:
+            scopes = list(self._scopes) if scope is None else [scope]
+            for scope in scopes:
+                if self._release_scope(scope):
+                    self.closed_scopes += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "live_scopes": len(self._scopes),
+                "live_instances": self.live_instances,
+                "peak_live_instances": self.peak_live_instances,
+                "created_instances": self.created_instances,
+                "closed_scopes": self.closed_scopes,
+                "evicted_scopes": self.evicted_scopes,
+            }
+
+    def print_stats(self) -> None:
+        stats = self.stats()
+        print(
+            f"Execution session: {stats['created_instances']} instances created, "
+            f"{stats['live_instances']} still live (peak {stats['peak_live_instances']}), "
+            f"{stats['closed_scopes']} conversations closed, {stats['evicted_scopes']} evicted."
+        )
+
+    def __enter__(self) -> "ExecutionSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _get_or_create_scope(
+        self,
+        scope: Hashable,
+        initial_config: dict,
+        involved_classes: list,
+        long_context: bool,
+    ) -> tuple[dict, dict]:
+        with self._lock:
+            scope_state = self._scopes.get(scope)
+            if scope_state is not None:
+                self._scopes.move_to_end(scope)
+                return scope_state
+
+        # Creating the instances can be slow for the long context scenarios, so it is done outside the lock
+        involved_instances = {}
+        method_dispatch_table = {}
+        for class_name in involved_classes:
+            class_instance = _load_class(class_name)()
+            if class_name not in STATELESS_CLASSES:
+                class_initial_config = initial_config.get(class_name, {})
+                # Deep copy the initial configuration to avoid mutation issues
+                class_instance._load_scenario(
+                    copy.deepcopy(class_initial_config), long_context=long_context
+                )
+
+            involved_instances[class_name] = class_instance
+            # Bind the public methods of the instance once, so that each function call is a single dictionary lookup
+            for method_name in _get_public_method_names(class_name):
+                method_dispatch_table[method_name] = getattr(class_instance, method_name)
+
+        scope_state = (involved_instances, method_dispatch_table)
+        with self._lock:
+            self._release_scope(scope)
+            self._scopes[scope] = scope_state
+            self.live_instances += len(involved_instances)
+            self.created_instances += len(involved_instances)
+            self.peak_live_instances = max(self.peak_live_instances, self.live_instances)
+            if self.max_live_scopes is not None:
+                while len(self._scopes) > self.max_live_scopes:
+                    evicted_scope = next(iter(self._scopes))
+                    self._release_scope(evicted_scope)
+                    self.evicted_scopes += 1
+                    # Only the first eviction is reported, as the following ones are usually from the same cause; they are counted in the stats
+                    if self.evicted_scopes == 1:
+                        print(
+                            f"❗️ More than {self.max_live_scopes} conversations are open in the execution session; the instances of {evicted_scope} were released before it was closed, and it restarts from its initial config if it is stepped again."
+                        )
+        return scope_state
+
+    def _release_scope(self, scope: Hashable) -> bool:
+        # Must be called with the lock held
+        scope_state = self._scopes.pop(scope, None)
+        if scope_state is None:
+            return False
+        self.live_instances -= len(scope_state[0])
+        return True
+
+
+# Backs `execute_multi_turn_func_call`, whose callers never close their conversations, so the LRU cap is what bounds its memory
+_default_execution_session = ExecutionSession(max_live_scopes=DEFAULT_MAX_LIVE_SCOPES)
+
 
 def execute_multi_turn_func_call(
     func_call_list: list[str],  # a list of strings of func calls
@@ -31,66 +198,166 @@ def execute_multi_turn_func_call(
     is_evaL_run: bool = False,
 ) -> tuple[list[str], dict]:
     """
-    TODO: Add docstring
+    Execute the function calls against the instances of the (model_name, test_entry_id) conversation, which persist across calls.
+    Kept for backward compatibility; prefer using an `ExecutionSession` directly, so that the instances can be released once the conversation is done.
     """
     if is_evaL_run:
         model_name += "_eval"
 
-    class_method_name_mapping = {}
-    involved_instances = {}
-    for class_name in involved_classes:
-        module_name = CLASS_FILE_PATH_MAPPING[class_name]
-        # TODO: Handler the model name issue from handler more elegantly
-        instance_name = (
-            f"{model_name.replace('-', '_').replace('.', '_').replace('/', '_')}_{test_entry_id}_{class_name.lower()}_instance"
+    return _default_execution_session.step(
+        (model_name, test_entry_id),
+        func_call_list,
+        initial_config,
+        involved_classes,
+        long_context=long_context,
+    )
+
+
+@lru_cache(maxsize=None)
+def _load_class(class_name: str) -> type:
+    return getattr(importlib.import_module(CLASS_FILE_PATH_MAPPING[class_name]), class_name)
+
+
+@lru_cache(maxsize=None)
+def _get_public_method_names(class_name: str) -> tuple[str, ...]:
+    """
+    The dispatch table of a backend class, ie the names of the methods that the function calls can invoke.
+    Computed once per class, instead of inspecting every instance.
+    """
+    return tuple(
+        method_name
+        for method_name, _ in inspect.getmembers(
+            _load_class(class_name), predicate=inspect.isfunction
         )
-        if instance_name not in globals():
-            module = importlib.import_module(module_name)
-            class_ = getattr(module, class_name)
-            class_instance = class_()
-            if class_name not in STATELESS_CLASSES:
-                class_initial_config = initial_config.get(class_name, {})
-                # Deep copy the initial configuration to avoid mutation issues
-                class_instance._load_scenario(
-                    copy.deepcopy(class_initial_config), long_context=long_context
-                )
-            globals()[instance_name] = class_instance
-        # This happens in subsequent turns
-        else:
-            class_instance = globals()[instance_name]
-
-        involved_instances[class_name] = class_instance
-
-        # Retrieve all method names and map them to the instance
-        for method_name, method in inspect.getmembers(
-            class_instance, predicate=inspect.ismethod
-        ):
-            # Skip private methods
-            if method_name.startswith("_"):
+        # Skip private methods
+        if not method_name.startswith("_")
+    )
+
+
+class _ParsedFuncCall:
+    """
+    A function call string parsed into its function name and literal arguments.
+    Arguments can themselves be function calls, which are executed first, like `eval` would.
+    Any other function call string (eg, with an expression like `1 + 1` as argument) is not parsed, and is left to `eval`.
+    """
+
+    __slots__ = ("func_name", "args", "kwargs")
+
+    def __init__(self, func_name: str, args: tuple, kwargs: tuple) -> None:
+        self.func_name = func_name
+        self.args = args
+        self.kwargs = kwargs
+
+
+@lru_cache(maxsize=65536)
+def _parse_func_call(func_call: str) -> Optional[_ParsedFuncCall]:
+    # The same calls come up over and over again (eg, the ground truth of every model), so the parsing is cached
+    try:
+        return _parse_call_node(ast.parse(func_call, mode="eval").body)
+    except (SyntaxError, ValueError, TypeError):
+        # Left to `eval`, which gives the same result (or error message) as before
+        return None
+
+
+def _parse_call_node(node: ast.expr) -> _ParsedFuncCall:
+    if not isinstance(node, ast.Call):
+        raise ValueError(f"{ast.unparse(node)} is not a function call.")
+    if not isinstance(node.func, ast.Name):
+        raise ValueError(f"Function {ast.unparse(node.func)} is not supported.")
+    if any(keyword.arg is None for keyword in node.keywords):
+        raise ValueError("Unpacking keyword arguments with ** is not supported.")
+
+    return _ParsedFuncCall(
+        node.func.id,
+        tuple(_parse_argument_node(arg) for arg in node.args),
+        tuple((keyword.arg, _parse_argument_node(keyword.value)) for keyword in node.keywords),
+    )
+
+
+def _parse_argument_node(node: ast.expr):
+    if isinstance(node, ast.Call):
+        return _parse_call_node(node)
+    return ast.literal_eval(node)
+
+
+def _is_dispatchable(parsed_call: _ParsedFuncCall, method_dispatch_table: dict) -> bool:
+    # Whether all the functions called are methods of the involved classes; calls to anything else (eg, builtins like `str`) are left to `eval`
+    if parsed_call.func_name not in method_dispatch_table:
+        return False
+    return all(
+        _is_dispatchable(value, method_dispatch_table)
+        for value in itertools.chain(
+            parsed_call.args, (value for _, value in parsed_call.kwargs)
+        )
+        if isinstance(value, _ParsedFuncCall)
+    )
+
+
+def _invoke_parsed_func_call(parsed_call: _ParsedFuncCall, method_dispatch_table: dict):
+    if parsed_call.func_name in BLOCKED_FUNCTION_NAMES:
+        raise Exception(f"Function call {parsed_call.func_name} is not allowed.")
+    # All the functions called are in the dispatch table (see `_is_dispatchable`)
+    method = method_dispatch_table[parsed_call.func_name]
+
+    args = [
+        _resolve_argument(arg, method_dispatch_table) for arg in parsed_call.args
+    ]
+    kwargs = {
+        name: _resolve_argument(value, method_dispatch_table)
+        for name, value in parsed_call.kwargs
+    }
+    return method(*args, **kwargs)
+
+
+def _resolve_argument(value, method_dispatch_table: dict):
+    if isinstance(value, _ParsedFuncCall):
+        return _invoke_parsed_func_call(value, method_dispatch_table)
+    # The parsed call is cached, so mutable arguments are copied to keep the methods from modifying the cached value
+    if isinstance(value, (list, dict, set)):
+        return copy.deepcopy(value)
+    return value
+
+
+def _eval_func_call(func_call: str, method_dispatch_table: dict):
+    # Before calling `eval`, we need to make sure that the function call is safe
+    # We do so by checking that none of the functions called is `kill` or `exit`, etc.
+    try:
+        func_call_tree = ast.parse(func_call, mode="eval")
+    except SyntaxError:
+        func_call_tree = None
+    if func_call_tree is not None:
+        for node in ast.walk(func_call_tree):
+            if not isinstance(node, ast.Call):
                 continue
-            class_method_name_mapping[method_name] = instance_name
+            if isinstance(node.func, ast.Name):
+                func_name = node.func.id
+            elif isinstance(node.func, ast.Attribute):
+                func_name = node.func.attr
+            else:
+                continue
+            if func_name in BLOCKED_FUNCTION_NAMES:
+                raise Exception(f"Function call {func_name} is not allowed.")
+
+    # The method names resolve to the methods of the involved instances, and everything else to the module globals and builtins
+    # The dispatch table is copied, as `eval` can assign to its locals (eg, with `:=`)
+    return eval(func_call, globals(), dict(method_dispatch_table))
 
+
+def _execute_func_calls(func_call_list: list[str], method_dispatch_table: dict) -> list[str]:
     execution_results = []
     for func_call in func_call_list:
-        # Add the instance name to the method calls
-        func_call = _process_method_calls(func_call, class_method_name_mapping)
-
-        # Evaluate the function call
         try:
-            # We need to make a copy here because otherwise the `eval(func_call)` would error. 
-            func_call_copy = func_call
-            # Before calling `eval`, we need to make sure that the function call is safe
-            # We do so by checking if the function is `kill` or `exit`, etc.
-            # Extract the function name first
-            if "(" in func_call_copy:
-                func_call_copy = func_call_copy.split("(")[0]
-            # Situation where the function call is a method call
-            if "." in func_call_copy:
-                func_call_copy = func_call_copy.split(".")[1]
-            if func_call_copy in ["kill", "exit", "quit", "remove", "unlink", "popen", "Popen", "run"]:
-                raise Exception(f"Function call {func_call_copy} is not allowed.")
-
-            func_call_result = eval(func_call)
+            # The function calls with literal arguments are parsed and dispatched to the instance methods directly, instead of going through `eval`
+            # Any other function call (eg, with `1 + 1` or `str(5)` as argument) is evaluated as before
+            parsed_call = _parse_func_call(func_call)
+            if parsed_call is not None and _is_dispatchable(
+                parsed_call, method_dispatch_table
+            ):
+                func_call_result = _invoke_parsed_func_call(
+                    parsed_call, method_dispatch_table
+                )
+            else:
+                func_call_result = _eval_func_call(func_call, method_dispatch_table)
 
             if type(func_call_result) == str:
                 pass
@@ -107,7 +374,7 @@ def execute_multi_turn_func_call(
         except Exception as e:
             execution_results.append(f"Error during execution: {str(e)}")
 
-    return execution_results, involved_instances
+    return execution_results
 
 
 def is_empty_execute_response(input_list: list):
@@ -116,41 +383,3 @@ def is_empty_execute_response(input_list: list):
     if len(input_list) == 1 and len(input_list[0]) == 0:
         return True
     return False
-
-
-def _process_method_calls(function_call_string: str, instance_mapping: dict) -> str:
-    """
-    Prepends the instance name to the function name for each of the function name represented in the string, you will
-    also be provided with the mapping of method name to instance name.
-
-    Example input:
-    ```
-    f(x = g((1, 2), h(3)), y = (4), z = (5, 6))
-    ```
-
-    Example return:
-    ```
-    a.f(x=a.g((1, 2), a.h(3)), y=(4), z=(5, 6))
-    ```
-
-    Args:
-        function_call_string (str): The function call string to parse.
-        class_mapping (dict): A dictionary mapping method names to instance names.
-
-    Returns:
-        str: The parsed function call string with instance names prepended to method names.
-    """
-
-    def replace_function(match):
-        func_name = match.group(1)
-        if func_name in instance_mapping:
-            return f"{instance_mapping[func_name]}.{func_name}"
-        return func_name
-
-    # Regular expression to match function names
-    pattern = r"\b([a-zA-Z_]\w*)\s*(?=\()"
-
-    # Replace function names with their class-prepended versions
-    processed_string = re.sub(pattern, replace_function, function_call_string)
-
-    return processed_string
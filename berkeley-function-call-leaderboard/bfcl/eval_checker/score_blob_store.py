@@ -0,0 +1,119 @@
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from bfcl.utils import make_json_serializable
+
+# The blob store is shared by all the models of a score directory; the leading dot keeps it apart from the model folders
+SCORE_BLOB_DIR_NAME = ".blobs"
+# A reference to a blob is written as `{"$blob": "<sha256 of the blob>"}` in place of the value
+BLOB_REFERENCE_KEY = "$blob"
+# The fields of the score entries that are the same for every model (and every evaluation of it), and so are stored once in the blob store
+# Only the score files refer to the blob store; the model result files have neither field, and are written as before, as they are the input of the evaluation and of other tools
+INTERNED_SCORE_FIELDS = ("prompt", "possible_answer")
+
+
+class BlobStore:
+    """
+    Content-addressed store of the large immutable values embedded in the score entries, such as the prompts (with their function docs) and the possible answers.
+
+    Each value is stored once, named by the hash of its content, however many models and score entries refer to it. The values are encoded exactly as they would be inline in a score file, so resolving a reference gives back the same value.
+    The blobs are spread over 256 append-only pack files by the first two hex digits of their hash, as one file per blob would waste most of a disk block on each. Each blob is one line of its pack: its hash, a space, and its JSON encoding.
+    """
+
+    def __init__(self, blob_dir: Path) -> None:
+        self.blob_dir = Path(blob_dir)
+        # Pack name -> {blob hash -> JSON encoding}, loaded on first use
+        self._packs: dict[str, dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def intern(self, value) -> dict:
+        """
+        Store the value if it is not stored yet, and return a reference to it.
+        """
+        content = json.dumps(make_json_serializable(value))
+        blob_hash = hashlib.sha256(content.encode()).hexdigest()
+        with self._lock:
+            pack = self._get_pack(blob_hash[:2])
+            if blob_hash not in pack:
+                self.blob_dir.mkdir(parents=True, exist_ok=True)
+                # A single unbuffered append of a whole line, so that several processes can add to the same pack
+                # The line starts with a line break, so that a line left partially written by an interrupted evaluation is never joined to the next one
+                with open(self._get_pack_path(blob_hash[:2]), "ab", buffering=0) as f:
+                    f.write(f"\n{blob_hash} {content}".encode())
+                pack[blob_hash] = content
+        return {BLOB_REFERENCE_KEY: blob_hash}
+
+    def resolve(self, value):
+        """
+        Return the value referred to, if `value` is a reference; otherwise, `value` itself.
+        """
+        if not is_blob_reference(value):
+            return value
+        blob_hash = value[BLOB_REFERENCE_KEY]
+        with self._lock:
+            content = self._get_pack(blob_hash[:2]).get(blob_hash)
+            if content is None:
+                # Possibly added by another process since the pack was loaded
+                del self._packs[blob_hash[:2]]
+                content = self._get_pack(blob_hash[:2]).get(blob_hash)
+        if content is None:
+            raise KeyError(f"Blob {blob_hash} not found in {self.blob_dir}")
+        return json.loads(content)
+
+    def _get_pack(self, pack_name: str) -> dict[str, str]:
+        if pack_name not in self._packs:
+            pack = {}
+            try:
+                with open(self._get_pack_path(pack_name)) as f:
+                    for line in f:
+                        blob_hash, _, content = line.rstrip("\n").partition(" ")
+                        # Skip the empty lines, and any line left partially written (whose content does not match its hash)
+                        if (
+                            content
+                            and blob_hash not in pack
+                            and hashlib.sha256(content.encode()).hexdigest() == blob_hash
+                        ):
+                            pack[blob_hash] = content
+            except FileNotFoundError:
+                pass
+            self._packs[pack_name] = pack
+        return self._packs[pack_name]
+
+    def _get_pack_path(self, pack_name: str) -> Path:
+        return self.blob_dir / f"{pack_name}.pack"
+
+
+def is_blob_reference(value) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and BLOB_REFERENCE_KEY in value
+
+
+_blob_stores: dict[str, BlobStore] = {}
+
+
+def get_blob_store(score_dir: Path) -> BlobStore:
+    blob_dir = Path(score_dir) / SCORE_BLOB_DIR_NAME
+    if str(blob_dir) not in _blob_stores:
+        _blob_stores[str(blob_dir)] = BlobStore(blob_dir)
+    return _blob_stores[str(blob_dir)]
+
+
+def intern_score_entry(score_entry: dict, score_dir: Path) -> dict:
+    """
+    Return a copy of the score entry, with the interned fields replaced by references to the blob store of the score directory.
+    """
+    blob_store = get_blob_store(score_dir)
+    return {
+        key: blob_store.intern(value) if key in INTERNED_SCORE_FIELDS else value
+        for key, value in score_entry.items()
+    }
+
+
+def resolve_score_entry(score_entry: dict, score_dir: Path) -> dict:
+    """
+    Return a copy of the score entry, with the references to the blob store of the score directory replaced by the values they refer to; the inverse of `intern_score_entry`.
+    Score entries written before the blob store existed are returned as they are.
+    """
+    blob_store = get_blob_store(score_dir)
+    return {key: blob_store.resolve(value) for key, value in score_entry.items()}
@@ -0,0 +1,93 @@
+import json
+import os
+from pathlib import Path
+from typing import Iterator
+
+from bfcl.constant import VERSION_PREFIX
+from bfcl.eval_checker.score_blob_store import resolve_score_entry
+from bfcl.utils import decode_json_line, iter_file
+
+# One summary index per model folder of the score directory, next to the score files
+SCORE_SUMMARY_FILE_NAME = "score_summary.json"
+# Bump this whenever the format of the summary index changes
+SCORE_SUMMARY_FORMAT_VERSION = 1
+
+
+def get_score_file_path(score_dir: Path, model_name: str, test_category: str) -> Path:
+    return Path(score_dir) / model_name / f"{VERSION_PREFIX}_{test_category}_score.json"
+
+
+def update_score_summary(score_file_path: Path, test_category: str, metadata: dict) -> None:
+    """
+    Record the metadata (accuracy, correct and total count) of a score file that was just written in the summary index of its model folder.
+    The index is read, updated and replaced without a lock, so concurrent evaluations writing to the same score directory are not supported: one may drop the entries recorded by the other. This only costs speed: a category without an entry has its score file read instead, and an entry that is stale is never used, as its file stat no longer matches the score file.
+    """
+    summary_path = Path(score_file_path).parent / SCORE_SUMMARY_FILE_NAME
+    score_summary = load_score_summary(summary_path.parent)
+    score_summary[test_category] = {
+        **metadata,
+        "score_file": Path(score_file_path).name,
+        "file_stat": list(_get_file_stat(score_file_path)),
+    }
+    try:
+        # Write to a temporary file first, so that an interrupted evaluation never leaves a partially written index
+        temp_file_path = summary_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(temp_file_path, "w") as f:
+            json.dump(
+                {
+                    "version": SCORE_SUMMARY_FORMAT_VERSION,
+                    "categories": dict(sorted(score_summary.items())),
+                },
+                f,
+                indent=4,
+            )
+        os.replace(temp_file_path, summary_path)
+    except OSError as e:
+        # The index is only an optimization; the score files are read instead
+        print(f"Failed to write the score summary in {summary_path.parent}: {e}")
+
+
+def load_score_summary(model_score_dir: Path) -> dict:
+    """
+    Return the summary index of a model folder of the score directory, as a dict from test category to the metadata of its score file.
+    """
+    try:
+        with open(Path(model_score_dir) / SCORE_SUMMARY_FILE_NAME) as f:
+            score_summary = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if score_summary.get("version") != SCORE_SUMMARY_FORMAT_VERSION:
+        return {}
+    return score_summary["categories"]
+
+
+def get_score_metadata(score_file_path: Path, test_category: str, score_summary: dict) -> dict:
+    """
+    Return the metadata (first line) of a score file, from the summary index of its model folder if it is up to date with the file, without opening the file.
+    Score files written by an older version, or modified since, are read instead.
+    """
+    summary_entry = score_summary.get(test_category)
+    if summary_entry is not None and summary_entry["file_stat"] == list(
+        _get_file_stat(score_file_path)
+    ):
+        return summary_entry
+    # The metadata is the first line of the score file; the entries after it are not needed
+    with open(score_file_path) as f:
+        return decode_json_line(f.readline())
+
+
+def iter_score_entries(score_dir: Path, model_name: str, test_category: str) -> Iterator[dict]:
+    """
+    Iterate over the failed entries recorded in the score file of a model and test category, for error browsing.
+    The entries (which embed the full model response and inference log) are decoded one at a time, as they are consumed, and their prompt and possible answer are read back from the blob store.
+    """
+    entries = iter_file(get_score_file_path(score_dir, model_name, test_category))
+    # Skip the metadata
+    next(entries)
+    for entry in entries:
+        yield resolve_score_entry(entry, score_dir)
+
+
+def _get_file_stat(file_path: Path) -> tuple[int, int]:
+    stat = Path(file_path).stat()
+    return stat.st_size, stat.st_mtime_ns
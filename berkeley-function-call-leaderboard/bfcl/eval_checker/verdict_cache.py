@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+# Bump this whenever the format of the cached verdicts changes
+CACHE_FORMAT_VERSION = 1
+# A verdict depends on the decoding in the model handlers as much as on the checkers, so the source code of both is part of the checker version
+BFCL_PACKAGE_DIR = Path(__file__).parent.parent
+CHECKER_SOURCE_PATHS = sorted(
+    [
+        *(BFCL_PACKAGE_DIR / "eval_checker").rglob("*.py"),
+        *(BFCL_PACKAGE_DIR / "model_handler").rglob("*.py"),
+        BFCL_PACKAGE_DIR / "utils.py",
+    ]
+)
+
+
+class VerdictCache:
+    """
+    On-disk cache of the evaluation verdict of each entry, so that re-evaluating a model only checks the entries that changed.
+
+    A verdict is what the checking of a single entry contributes to the score file: the error records of the entry (empty if it is correct), and whether it counts as correct.
+    It is keyed by a hash of the raw model result entry (which holds the entry ID), of the prompt and possible answer entries, and of the checker version (the source code of the checkers and the model handlers).
+    The verdicts of each model and test category are stored together in one pickle file, which only keeps the verdicts of the last evaluation.
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.reused = 0
+        self.checked = 0
+
+    def compute_key(
+        self,
+        model_result_entry: dict,
+        prompt_entry: dict,
+        possible_answer_entry: Optional[dict],
+    ) -> str:
+        key_content = {
+            "version": CACHE_FORMAT_VERSION,
+            "checker_version": _compute_checker_version(),
+            "model_result": model_result_entry,
+            "prompt": prompt_entry,
+            "possible_answer": possible_answer_entry,
+        }
+        return hashlib.sha256(
+            json.dumps(key_content, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    def load(self, model_name: str, test_category: str) -> dict:
+        """
+        Return the cached verdicts of the test category, as a dict from key to verdict.
+        """
+        try:
+            with open(self._get_file_path(model_name, test_category), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return {}
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Corrupted file; it will be overwritten
+            return {}
+
+    def store(self, model_name: str, test_category: str, verdicts: dict) -> None:
+        """
+        Replace the cached verdicts of the test category with `verdicts`, a dict from key to verdict.
+        """
+        file_path = self._get_file_path(model_name, test_category)
+        try:
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first, so that an interrupted evaluation never leaves a partially written file
+            temp_file_path = file_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(temp_file_path, "wb") as f:
+                pickle.dump(verdicts, f)
+            os.replace(temp_file_path, file_path)
+        except OSError as e:
+            # The cache is only an optimization; the score files are still written without it
+            print(f"Failed to write the verdict cache for {model_name} {test_category}: {e}")
+
+    def print_stats(self) -> None:
+        print(
+            f"Verdict cache: {self.reused} verdicts reused, {self.checked} entries checked."
+        )
+
+    def _get_file_path(self, model_name: str, test_category: str) -> Path:
+        return self.cache_dir / model_name / f"{test_category}.pkl"
+
+
+@lru_cache(maxsize=1)  # cache the result, effectively hashing the source code once
+def _compute_checker_version() -> str:
+    checker_version = hashlib.sha256()
+    for source_path in CHECKER_SOURCE_PATHS:
+        checker_version.update(str(source_path.relative_to(BFCL_PACKAGE_DIR)).encode())
+        checker_version.update(source_path.read_bytes())
+    return checker_version.hexdigest()
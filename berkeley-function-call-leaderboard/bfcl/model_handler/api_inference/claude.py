@@ -1,11 +1,12 @@
+import itertools
 import json
 import os
 import time
 
-from anthropic import Anthropic, RateLimitError
+from anthropic import Anthropic, AsyncAnthropic, RateLimitError
 from anthropic.types import TextBlock, ToolUseBlock
 from bfcl.model_handler.base_handler import BaseHandler
-from bfcl.model_handler.constant import GORILLA_TO_OPENAPI
+from bfcl.model_handler.constant import ASYNC_CLIENT_POOL_SIZE, GORILLA_TO_OPENAPI
 from bfcl.model_handler.model_style import ModelStyle
 from bfcl.model_handler.utils import (
     ast_parse,
@@ -78,9 +79,38 @@ class ClaudeHandler(BaseHandler):
 
         return api_response, end_time - start_time
 
+    @property
+    def async_client(self) -> AsyncAnthropic:
+        if getattr(self, "_async_clients", None) is None:
+            self._async_clients = itertools.cycle(
+                [
+                    AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+                    for _ in range(ASYNC_CLIENT_POOL_SIZE)
+                ]
+            )
+        return next(self._async_clients)
+
+    @retry_with_backoff(error_type=RateLimitError)
+    async def generate_with_backoff_async(self, **kwargs):
+        start_time = time.time()
+        api_response = await self.async_client.beta.prompt_caching.messages.create(
+            **kwargs
+        )
+        end_time = time.time()
+
+        return api_response, end_time - start_time
+
     #### FC methods ####
 
     def _query_FC(self, inference_data: dict):
+        return self.generate_with_backoff(**self._build_query_FC_kwargs(inference_data))
+
+    async def _query_FC_async(self, inference_data: dict):
+        return await self.generate_with_backoff_async(
+            **self._build_query_FC_kwargs(inference_data)
+        )
+
+    def _build_query_FC_kwargs(self, inference_data: dict) -> dict:
         inference_data["inference_input_log"] = {
             "message": repr(inference_data["message"]),
             "tools": inference_data["tools"],
@@ -100,14 +130,13 @@ class ClaudeHandler(BaseHandler):
                             del message["content"][0]["cache_control"]
                     count += 1
 
-        return self.generate_with_backoff(
-            model=self.model_name.strip("-FC"),
-            max_tokens=(
-                8192 if "claude-3-5" in self.model_name else 4096
-            ),  # 3.5 Sonnet has a higher max token limit
-            tools=inference_data["tools"],
-            messages=messages,
-        )
+        return {
+            "model": self.model_name.strip("-FC"),
+            # 3.5 Sonnet has a higher max token limit
+            "max_tokens": (8192 if "claude-3-5" in self.model_name else 4096),
+            "tools": inference_data["tools"],
+            "messages": messages,
+        }
 
     def _pre_query_processing_FC(self, inference_data: dict, test_entry: dict) -> dict:
         for round_idx in range(len(test_entry["question"])):
@@ -230,6 +259,16 @@ class ClaudeHandler(BaseHandler):
     #### Prompting methods ####
 
     def _query_prompting(self, inference_data: dict):
+        return self.generate_with_backoff(
+            **self._build_query_prompting_kwargs(inference_data)
+        )
+
+    async def _query_prompting_async(self, inference_data: dict):
+        return await self.generate_with_backoff_async(
+            **self._build_query_prompting_kwargs(inference_data)
+        )
+
+    def _build_query_prompting_kwargs(self, inference_data: dict) -> dict:
         inference_data["inference_input_log"] = {
             "message": repr(inference_data["message"]),
             "system_prompt": inference_data["system_prompt"],
@@ -249,13 +288,15 @@ class ClaudeHandler(BaseHandler):
                             del message["content"][0]["cache_control"]
                     count += 1
 
-        return self.generate_with_backoff(
-            model=self.model_name,
-            max_tokens=(8192 if "claude-3-5-sonnet-20240620" in self.model_name else 4096),
-            temperature=self.temperature,
-            system=inference_data["system_prompt"],
-            messages=inference_data["message"],
-        )
+        return {
+            "model": self.model_name,
+            "max_tokens": (
+                8192 if "claude-3-5-sonnet-20240620" in self.model_name else 4096
+            ),
+            "temperature": self.temperature,
+            "system": inference_data["system_prompt"],
+            "messages": inference_data["message"],
+        }
 
     def _pre_query_processing_prompting(self, test_entry: dict) -> dict:
         functions: list = test_entry["function"]
@@ -1,9 +1,10 @@
+import itertools
 import json
 import os
 import time
 
 from bfcl.model_handler.base_handler import BaseHandler
-from bfcl.model_handler.constant import GORILLA_TO_OPENAPI
+from bfcl.model_handler.constant import ASYNC_CLIENT_POOL_SIZE, GORILLA_TO_OPENAPI
 from bfcl.model_handler.model_style import ModelStyle
 from bfcl.model_handler.utils import (
     convert_to_function_call,
@@ -15,7 +16,7 @@ from bfcl.model_handler.utils import (
     retry_with_backoff,
     system_prompt_pre_processing_chat_model,
 )
-from openai import OpenAI, RateLimitError
+from openai import AsyncOpenAI, OpenAI, RateLimitError
 
 
 class OpenAIHandler(BaseHandler):
@@ -49,41 +50,65 @@ class OpenAIHandler(BaseHandler):
 
         return api_response, end_time - start_time
 
+    @retry_with_backoff(error_type=RateLimitError)
+    async def generate_with_backoff_async(self, **kwargs):
+        start_time = time.time()
+        api_response = await self.async_client.chat.completions.create(**kwargs)
+        end_time = time.time()
+
+        return api_response, end_time - start_time
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        # Built lazily from `self.client`, so that subclasses pointing `self.client` at a different endpoint get matching async clients
+        if getattr(self, "_async_clients", None) is None:
+            self._async_clients = itertools.cycle(
+                [
+                    AsyncOpenAI(api_key=self.client.api_key, base_url=self.client.base_url)
+                    for _ in range(ASYNC_CLIENT_POOL_SIZE)
+                ]
+            )
+        return next(self._async_clients)
+
+    def _has_native_async_query(self, query_method_name: str) -> bool:
+        # Subclasses that customize the sync query path, or that talk to a non-OpenAI client, run the sync query in a worker thread instead
+        return (
+            isinstance(self.client, OpenAI)
+            and getattr(type(self), query_method_name)
+            is getattr(OpenAIHandler, query_method_name)
+            and type(self).generate_with_backoff is OpenAIHandler.generate_with_backoff
+        )
+
     #### FC methods ####
 
     def _query_FC(self, inference_data: dict):
+        return self.generate_with_backoff(**self._build_query_FC_kwargs(inference_data))
+
+    async def _query_FC_async(self, inference_data: dict):
+        if not self._has_native_async_query("_query_FC"):
+            return await super()._query_FC_async(inference_data)
+
+        return await self.generate_with_backoff_async(
+            **self._build_query_FC_kwargs(inference_data)
+        )
+
+    def _build_query_FC_kwargs(self, inference_data: dict) -> dict:
         message: list[dict] = inference_data["message"]
         tools = inference_data["tools"]
         inference_data["inference_input_log"] = {"message": repr(message), "tools": tools}
 
+        kwargs = {
+            "messages": message,
+            "model": self.model_name.replace("-FC", ""),
+        }
+        # Reasoning models don't support temperature parameter
+        # Beta limitation: https://platform.openai.com/docs/guides/reasoning/beta-limitations
+        if "o1" not in self.model_name and "o3-mini" not in self.model_name:
+            kwargs["temperature"] = self.temperature
         if len(tools) > 0:
-            # Reasoning models don't support temperature parameter
-            # Beta limitation: https://platform.openai.com/docs/guides/reasoning/beta-limitations
-            if "o1" in self.model_name or "o3-mini" in self.model_name:
-                return self.generate_with_backoff(
-                    messages=message,
-                    model=self.model_name.replace("-FC", ""),
-                    tools=tools,
-                )
-            else:
-                return self.generate_with_backoff(
-                    messages=message,
-                    model=self.model_name.replace("-FC", ""),
-                    temperature=self.temperature,
-                    tools=tools,
-                )
-        else:
-            if "o1" in self.model_name or "o3-mini" in self.model_name:
-                return self.generate_with_backoff(
-                    messages=message,
-                    model=self.model_name.replace("-FC", ""),
-                )
-            else:
-                return self.generate_with_backoff(
-                    messages=message,
-                    model=self.model_name.replace("-FC", ""),
-                    temperature=self.temperature,
-                )
+            kwargs["tools"] = tools
+
+        return kwargs
 
     def _pre_query_processing_FC(self, inference_data: dict, test_entry: dict) -> dict:
         inference_data["message"] = []
@@ -165,21 +190,31 @@ class OpenAIHandler(BaseHandler):
     #### Prompting methods ####
 
     def _query_prompting(self, inference_data: dict):
+        return self.generate_with_backoff(
+            **self._build_query_prompting_kwargs(inference_data)
+        )
+
+    async def _query_prompting_async(self, inference_data: dict):
+        if not self._has_native_async_query("_query_prompting"):
+            return await super()._query_prompting_async(inference_data)
+
+        return await self.generate_with_backoff_async(
+            **self._build_query_prompting_kwargs(inference_data)
+        )
+
+    def _build_query_prompting_kwargs(self, inference_data: dict) -> dict:
         inference_data["inference_input_log"] = {"message": repr(inference_data["message"])}
 
+        kwargs = {
+            "messages": inference_data["message"],
+            "model": self.model_name,
+        }
         # OpenAI reasoning models don't support temperature parameter
         # Beta limitation: https://platform.openai.com/docs/guides/reasoning/beta-limitations
-        if "o1" in self.model_name or "o3-mini" in self.model_name:
-            return self.generate_with_backoff(
-                messages=inference_data["message"],
-                model=self.model_name,
-            )
-        else:
-            return self.generate_with_backoff(
-                messages=inference_data["message"],
-                model=self.model_name,
-                temperature=self.temperature,
-            )
+        if "o1" not in self.model_name and "o3-mini" not in self.model_name:
+            kwargs["temperature"] = self.temperature
+
+        return kwargs
 
     def _pre_query_processing_prompting(self, test_entry: dict) -> dict:
         functions: list = test_entry["function"]
@@ -1,11 +1,14 @@
+import asyncio
 import json
+import os
 import time
 from copy import deepcopy
+from typing import Optional
 
 from bfcl.constant import RESULT_PATH, VERSION_PREFIX
 from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
     STATELESS_CLASSES,
-    execute_multi_turn_func_call,
+    ExecutionSession,
     is_empty_execute_response,
 )
 from bfcl.model_handler.constant import (
@@ -14,6 +17,8 @@ from bfcl.model_handler.constant import (
     MAXIMUM_STEP_LIMIT,
 )
 from bfcl.model_handler.model_style import ModelStyle
+from bfcl.model_handler.rate_limiter import RateLimiter, get_rate_limiter
+from bfcl.model_handler.response_cache import ResponseCache
 from bfcl.utils import load_file, make_json_serializable, sort_key
 from overrides import final
 
@@ -31,6 +36,17 @@ class BaseHandler:
         )
         self.temperature = temperature
         self.is_fc_model = False  # Whether the model is a function calling model
+        # Opt-in on-disk cache of the model responses, set by the generation pipeline when `--response-cache` is used
+        self.response_cache: Optional[ResponseCache] = None
+        # Holds the backend instances of the multi-turn entries being generated, keyed by test entry ID; each entry is closed once its inference is done
+        # It is unbounded, so that no entry in flight ever loses its instances; the number of live entries is bounded by `--num-threads` or `--max-concurrency` instead
+        self.execution_session = ExecutionSession()
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        # Shared by all handler instances and workers querying the same provider and model
+        # Resolved lazily because subclasses set `model_style` after calling `super().__init__`
+        return get_rate_limiter(self.model_style.value, self.model_name)
 
     def inference(self, test_entry: dict, include_input_log: bool, exclude_state_log: bool):
         # This method is used to retrive model response for each model.
@@ -53,10 +69,145 @@ class BaseHandler:
             else:
                 return self.inference_single_turn_prompting(test_entry, include_input_log)
 
+    async def inference_async(
+        self, test_entry: dict, include_input_log: bool, exclude_state_log: bool
+    ):
+        # Same as `inference`, but the model queries are awaited so that many entries can be in flight on one event loop.
+        if "FC" in self.model_name or self.is_fc_model:
+            if "multi_turn" in test_entry["id"]:
+                return await self.inference_multi_turn_FC_async(
+                    test_entry, include_input_log, exclude_state_log
+                )
+            else:
+                return await self.inference_single_turn_FC_async(
+                    test_entry, include_input_log
+                )
+        else:
+            if "multi_turn" in test_entry["id"]:
+                return await self.inference_multi_turn_prompting_async(
+                    test_entry, include_input_log, exclude_state_log
+                )
+            else:
+                return await self.inference_single_turn_prompting_async(
+                    test_entry, include_input_log
+                )
+
+    @final
+    def _run_inference_steps(self, steps):
+        """
+        Drive an inference step generator to completion.
+        The generator yields a `(query_mode, inference_data)` request every time it needs a model response, and receives back the `(api_response, query_latency)` tuple.
+        Keeping the query out of the inference loop lets the same loop be shared by the blocking and the asyncio execution modes.
+        """
+        try:
+            query_mode, inference_data = next(steps)
+            while True:
+                query_mode, inference_data = steps.send(
+                    self._query(query_mode, inference_data)
+                )
+        except StopIteration as e:
+            return e.value
+
+    @final
+    async def _run_inference_steps_async(self, steps):
+        """
+        The asyncio counterpart of `_run_inference_steps`.
+        """
+        try:
+            query_mode, inference_data = next(steps)
+            while True:
+                query_mode, inference_data = steps.send(
+                    await self._query_async(query_mode, inference_data)
+                )
+        except StopIteration as e:
+            return e.value
+
+    @final
+    def _query(self, query_mode: str, inference_data: dict):
+        cache_key = self._get_response_cache_key(query_mode, inference_data)
+        if cache_key is not None:
+            cached_result = self.response_cache.get(cache_key, inference_data)
+            if cached_result is not None:
+                return cached_result
+
+        self.rate_limiter.acquire()
+        if query_mode == "FC":
+            result = self._query_FC(inference_data)
+        else:
+            result = self._query_prompting(inference_data)
+        self.rate_limiter.on_success()
+
+        if cache_key is not None:
+            self.response_cache.put(cache_key, inference_data, *result)
+        return result
+
+    @final
+    async def _query_async(self, query_mode: str, inference_data: dict):
+        cache_key = self._get_response_cache_key(query_mode, inference_data)
+        if cache_key is not None:
+            cached_result = self.response_cache.get(cache_key, inference_data)
+            if cached_result is not None:
+                return cached_result
+
+        await self.rate_limiter.acquire_async()
+        if query_mode == "FC":
+            result = await self._query_FC_async(inference_data)
+        else:
+            result = await self._query_prompting_async(inference_data)
+        self.rate_limiter.on_success()
+
+        if cache_key is not None:
+            self.response_cache.put(cache_key, inference_data, *result)
+        return result
+
+    @final
+    def _get_response_cache_key(self, query_mode: str, inference_data: dict):
+        if self.response_cache is None:
+            return None
+        # The key is computed before the query, as some handlers modify the inference data while querying
+        return self.response_cache.compute_key(
+            self.model_name, self.temperature, query_mode, inference_data
+        )
+
+    @final
+    def _record_token_usage(self, model_response_data: dict) -> None:
+        # The token count of a request is only known once the response is parsed, so it is debited from the rate limiter afterwards
+        input_token = model_response_data.get("input_token")
+        output_token = model_response_data.get("output_token")
+        if isinstance(input_token, (int, float)) and isinstance(output_token, (int, float)):
+            self.rate_limiter.record_usage(input_token + output_token)
+
     @final
     def inference_multi_turn_FC(
         self, test_entry: dict, include_input_log: bool, exclude_state_log: bool
     ) -> tuple[list[list], dict]:
+        try:
+            return self._run_inference_steps(
+                self._inference_multi_turn_FC_steps(
+                    test_entry, include_input_log, exclude_state_log
+                )
+            )
+        finally:
+            # Also on failure, so that a retried entry starts again from its initial config
+            self.execution_session.close(test_entry["id"])
+
+    @final
+    async def inference_multi_turn_FC_async(
+        self, test_entry: dict, include_input_log: bool, exclude_state_log: bool
+    ) -> tuple[list[list], dict]:
+        try:
+            return await self._run_inference_steps_async(
+                self._inference_multi_turn_FC_steps(
+                    test_entry, include_input_log, exclude_state_log
+                )
+            )
+        finally:
+            self.execution_session.close(test_entry["id"])
+
+    @final
+    def _inference_multi_turn_FC_steps(
+        self, test_entry: dict, include_input_log: bool, exclude_state_log: bool
+    ):
         initial_config: dict = test_entry["initial_config"]
         involved_classes: list = test_entry["involved_classes"]
         test_entry_id: str = test_entry["id"]
@@ -79,16 +230,13 @@ class BaseHandler:
 
         # Execute no function call, but just to get a reference to all the instances to get the initial state for logging purpose
         if not exclude_state_log:
-            _, involved_instances = execute_multi_turn_func_call(
-                [],
+            involved_instances = self.execution_session.create(
+                test_entry_id,
                 initial_config,
                 involved_classes,
-                self.model_name_underline_replaced,
-                test_entry_id,
                 long_context=(
                     "long_context" in test_category or "composite" in test_category
                 ),
-                is_evaL_run=False,
             )
             state_log = []
             for class_name, class_instance in involved_instances.items():
@@ -158,7 +306,7 @@ class BaseHandler:
                 # Add to the current_turn_inference_log at beginning of each step so that we don't need to bother dealing with the break statements
                 current_turn_inference_log[f"step_{count}"] = current_step_inference_log
 
-                api_response, query_latency = self._query_FC(inference_data)
+                api_response, query_latency = yield "FC", inference_data
 
                 # This part of logging is disabled by default because it is too verbose and will make the result file extremely large
                 # It is only useful to see if the inference pipeline is working as expected (eg, does it convert all the inputs correctly)
@@ -180,6 +328,7 @@ class BaseHandler:
                 )
 
                 # Process the metadata
+                self._record_token_usage(model_response_data)
                 current_turn_input_token_count.append(model_response_data["input_token"])
                 current_turn_output_token_count.append(model_response_data["output_token"])
                 current_turn_latency.append(query_latency)
@@ -223,16 +372,14 @@ class BaseHandler:
                     break
 
                 # Obtain the execution results
-                execution_results, involved_instances = execute_multi_turn_func_call(
+                execution_results, involved_instances = self.execution_session.step(
+                    test_entry_id,
                     decoded_model_responses,
                     initial_config,
                     involved_classes,
-                    self.model_name_underline_replaced,
-                    test_entry_id,
                     long_context=(
                         "long_context" in test_category or "composite" in test_category
                     ),
-                    is_evaL_run=False,
                 )
 
                 # Add the execution results to the chat history for the next turn
@@ -304,6 +451,33 @@ class BaseHandler:
     def inference_multi_turn_prompting(
         self, test_entry: dict, include_input_log: bool, exclude_state_log: bool
     ) -> tuple[list[list], dict]:
+        try:
+            return self._run_inference_steps(
+                self._inference_multi_turn_prompting_steps(
+                    test_entry, include_input_log, exclude_state_log
+                )
+            )
+        finally:
+            # Also on failure, so that a retried entry starts again from its initial config
+            self.execution_session.close(test_entry["id"])
+
+    @final
+    async def inference_multi_turn_prompting_async(
+        self, test_entry: dict, include_input_log: bool, exclude_state_log: bool
+    ) -> tuple[list[list], dict]:
+        try:
+            return await self._run_inference_steps_async(
+                self._inference_multi_turn_prompting_steps(
+                    test_entry, include_input_log, exclude_state_log
+                )
+            )
+        finally:
+            self.execution_session.close(test_entry["id"])
+
+    @final
+    def _inference_multi_turn_prompting_steps(
+        self, test_entry: dict, include_input_log: bool, exclude_state_log: bool
+    ):
         initial_config: dict = test_entry["initial_config"]
         involved_classes: list = test_entry["involved_classes"]
         test_entry_id: str = test_entry["id"]
@@ -326,16 +500,13 @@ class BaseHandler:
 
         # Execute no function call, but just to get a reference to all the instances to get the initial state for logging purpose
         if not exclude_state_log:
-            _, involved_instances = execute_multi_turn_func_call(
-                [],
+            involved_instances = self.execution_session.create(
+                test_entry_id,
                 initial_config,
                 involved_classes,
-                self.model_name_underline_replaced,
-                test_entry_id,
                 long_context=(
                     "long_context" in test_category or "composite" in test_category
                 ),
-                is_evaL_run=False,
             )
             state_log = []
             for class_name, class_instance in involved_instances.items():
@@ -403,7 +574,7 @@ class BaseHandler:
                 # Add to the current_turn_inference_log at beginning of each step so that we don't need to bother dealing with the break statements
                 current_turn_inference_log[f"step_{count}"] = current_step_inference_log
 
-                api_response, query_latency = self._query_prompting(inference_data)
+                api_response, query_latency = yield "prompting", inference_data
 
                 # This part of logging is disabled by default because it is too verbose and will make the result file extremely large
                 # It is only useful to see if the inference pipeline is working as expected (eg, does it convert all the inputs correctly)
@@ -425,6 +596,7 @@ class BaseHandler:
                 )
 
                 # Process the metadata
+                self._record_token_usage(model_response_data)
                 current_turn_input_token_count.append(model_response_data["input_token"])
                 current_turn_output_token_count.append(model_response_data["output_token"])
                 current_turn_latency.append(query_latency)
@@ -477,16 +649,14 @@ class BaseHandler:
                     break
 
                 # Obtain the execution results
-                execution_results, involved_instances = execute_multi_turn_func_call(
+                execution_results, involved_instances = self.execution_session.step(
+                    test_entry_id,
                     decoded_model_responses,
                     initial_config,
                     involved_classes,
-                    self.model_name_underline_replaced,
-                    test_entry_id,
                     long_context=(
                         "long_context" in test_category or "composite" in test_category
                     ),
-                    is_evaL_run=False,
                 )
 
                 # Add the execution results to the chat history for the next turn
@@ -564,6 +734,20 @@ class BaseHandler:
     def inference_single_turn_FC(
         self, test_entry: dict, include_input_log: bool
     ) -> tuple[any, dict]:
+        return self._run_inference_steps(
+            self._inference_single_turn_FC_steps(test_entry, include_input_log)
+        )
+
+    @final
+    async def inference_single_turn_FC_async(
+        self, test_entry: dict, include_input_log: bool
+    ) -> tuple[any, dict]:
+        return await self._run_inference_steps_async(
+            self._inference_single_turn_FC_steps(test_entry, include_input_log)
+        )
+
+    @final
+    def _inference_single_turn_FC_steps(self, test_entry: dict, include_input_log: bool):
         inference_data: dict = {}
         inference_data = self._pre_query_processing_FC(inference_data, test_entry)
         inference_data = self._compile_tools(inference_data, test_entry)
@@ -571,7 +755,7 @@ class BaseHandler:
             inference_data, test_entry["question"][0]
         )
 
-        api_response, query_latency = self._query_FC(inference_data)
+        api_response, query_latency = yield "FC", inference_data
 
         # Try parsing the model response
         model_response_data = self._parse_query_response_FC(api_response)
@@ -585,6 +769,7 @@ class BaseHandler:
                     "content": inference_data.get("inference_input_log", ""),
                 }
             ]
+        self._record_token_usage(model_response_data)
         metadata["input_token_count"] = model_response_data["input_token"]
         metadata["output_token_count"] = model_response_data["output_token"]
         metadata["latency"] = query_latency
@@ -595,12 +780,26 @@ class BaseHandler:
     def inference_single_turn_prompting(
         self, test_entry: dict, include_input_log: bool
     ) -> tuple[any, dict]:
+        return self._run_inference_steps(
+            self._inference_single_turn_prompting_steps(test_entry, include_input_log)
+        )
+
+    @final
+    async def inference_single_turn_prompting_async(
+        self, test_entry: dict, include_input_log: bool
+    ) -> tuple[any, dict]:
+        return await self._run_inference_steps_async(
+            self._inference_single_turn_prompting_steps(test_entry, include_input_log)
+        )
+
+    @final
+    def _inference_single_turn_prompting_steps(self, test_entry: dict, include_input_log: bool):
         inference_data: dict = self._pre_query_processing_prompting(test_entry)
         inference_data = self.add_first_turn_message_prompting(
             inference_data, test_entry["question"][0]
         )
 
-        api_response, query_latency = self._query_prompting(inference_data)
+        api_response, query_latency = yield "prompting", inference_data
 
         # Try parsing the model response
         model_response_data = self._parse_query_response_prompting(api_response)
@@ -614,6 +813,7 @@ class BaseHandler:
                     "content": inference_data.get("inference_input_log", ""),
                 }
             ]
+        self._record_token_usage(model_response_data)
         metadata["input_token_count"] = model_response_data["input_token"]
         metadata["output_token_count"] = model_response_data["output_token"]
         metadata["latency"] = query_latency
@@ -636,7 +836,7 @@ class BaseHandler:
         raise NotImplementedError
 
     @final
-    def write(self, result, result_dir, update_mode=False):
+    def write(self, result, result_dir):
         model_name_dir = self.model_name.replace("/", "_")
         model_result_dir = result_dir / model_name_dir
         model_result_dir.mkdir(parents=True, exist_ok=True)
@@ -655,31 +855,41 @@ class BaseHandler:
             file_path = model_result_dir / file_name
             file_entries.setdefault(file_path, []).append(entry)
 
+        # The result files are append-only logs, so that writing a result is O(1) regardless of the file size
+        # An entry can supersede an earlier entry with the same id in the file (eg, when re-generating specific test ids); `compact_result_files` keeps only the latest one when the generation is done
         for file_path, entries in file_entries.items():
-            if update_mode:
-                # Load existing entries from the file
-                existing_entries = {}
-                if file_path.exists():
-                    existing_entries = {
-                        entry["id"]: entry for entry in load_file(file_path)
-                    }
-
-                # Update existing entries with new data
+            entries.sort(key=sort_key)
+            with open(file_path, "a") as f:
                 for entry in entries:
-                    existing_entries[entry["id"]] = entry
+                    f.write(json.dumps(entry) + "\n")
 
-                # Sort entries by `id` and write them back to ensure order consistency
-                sorted_entries = sorted(existing_entries.values(), key=sort_key)
-                with open(file_path, "w") as f:
-                    for entry in sorted_entries:
-                        f.write(json.dumps(entry) + "\n")
-
-            else:
-                # Normal mode: Append in sorted order
-                entries.sort(key=sort_key)
-                with open(file_path, "a") as f:
-                    for entry in entries:
-                        f.write(json.dumps(entry) + "\n")
+    @final
+    def compact_result_files(self, result_dir):
+        """
+        Results are appended to the result files in the order they complete, so that a slow entry does not hold back the writing of every entry after it, and re-generated entries are appended after the ones they replace.
+        Once the generation is done, this rewrites each result file of the model in sorted order, keeping only the latest entry for each id.
+        """
+        model_name_dir = self.model_name.replace("/", "_")
+        model_result_dir = result_dir / model_name_dir
+        if not model_result_dir.exists():
+            return
+
+        for file_path in model_result_dir.glob(f"{VERSION_PREFIX}_*_result.json"):
+            entries = load_file(file_path)
+            # Later entries overwrite earlier ones with the same id
+            latest_entries = {entry["id"]: entry for entry in entries}
+            sorted_entries = sorted(latest_entries.values(), key=sort_key)
+            if [entry["id"] for entry in entries] == [
+                entry["id"] for entry in sorted_entries
+            ]:
+                continue
+
+            # Write to a temporary file first, so that the results are not lost if the process is interrupted halfway
+            temp_file_path = file_path.with_suffix(".json.tmp")
+            with open(temp_file_path, "w") as f:
+                for entry in sorted_entries:
+                    f.write(json.dumps(entry) + "\n")
+            os.replace(temp_file_path, file_path)
 
     #### FC methods ####
 
@@ -690,6 +900,13 @@ class BaseHandler:
         """
         raise NotImplementedError
 
+    async def _query_FC_async(self, inference_data: dict):
+        """
+        Async version of `_query_FC`, used by the asyncio execution mode.
+        Handlers with an async client should override this method. The default implementation runs the blocking `_query_FC` in a worker thread, so every handler works in asyncio mode.
+        """
+        return await asyncio.to_thread(self._query_FC, inference_data)
+
     def _pre_query_processing_FC(self, inference_data: dict, test_entry: dict) -> dict:
         """
         Preprocess the testset entry before sending it to the model.
@@ -780,6 +997,13 @@ class BaseHandler:
         """
         raise NotImplementedError
 
+    async def _query_prompting_async(self, inference_data: dict):
+        """
+        Async version of `_query_prompting`, used by the asyncio execution mode.
+        Handlers with an async client should override this method. The default implementation runs the blocking `_query_prompting` in a worker thread.
+        """
+        return await asyncio.to_thread(self._query_prompting, inference_data)
+
     def _pre_query_processing_prompting(self, test_entry: dict) -> dict:
         """
         Preprocess the testset entry before sending it to the model.
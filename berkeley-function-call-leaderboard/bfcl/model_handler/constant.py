@@ -1,5 +1,9 @@
 MAXIMUM_STEP_LIMIT = 20
 
+# Number of async API clients a handler spreads its in-flight requests over in the asyncio execution mode.
+# httpcore's async connection pool scans every connection for every queued request, so a single client slows down quadratically with the number of in-flight requests.
+ASYNC_CLIENT_POOL_SIZE = 32
+
 DEFAULT_SYSTEM_PROMPT_WITHOUT_FUNC_DOC = """You are an expert in composing functions. You are given a question and a set of possible functions. Based on the question, you will need to make one or more function/tool calls to achieve the purpose.
 If none of the functions can be used, point it out. If the given question lacks the parameters required by the function, also point it out.
 You should only return the function calls in your response.
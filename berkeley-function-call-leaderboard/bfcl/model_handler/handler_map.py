@@ -1,214 +1,218 @@
-from bfcl.model_handler.api_inference.claude import ClaudeHandler
-from bfcl.model_handler.api_inference.cohere import CohereHandler
-from bfcl.model_handler.api_inference.databricks import DatabricksHandler
-from bfcl.model_handler.api_inference.deepseek import DeepSeekAPIHandler
-from bfcl.model_handler.api_inference.fireworks import FireworksHandler
-from bfcl.model_handler.api_inference.functionary import FunctionaryHandler
-from bfcl.model_handler.api_inference.gemini import GeminiHandler
-from bfcl.model_handler.api_inference.gogoagent import GoGoAgentHandler
-from bfcl.model_handler.api_inference.gorilla import GorillaHandler
-from bfcl.model_handler.api_inference.grok import GrokHandler
-from bfcl.model_handler.api_inference.mistral import MistralHandler
-from bfcl.model_handler.api_inference.nexus import NexusHandler
-from bfcl.model_handler.api_inference.nova import NovaHandler
-from bfcl.model_handler.api_inference.nvidia import NvidiaHandler
-from bfcl.model_handler.api_inference.openai import OpenAIHandler
-from bfcl.model_handler.api_inference.writer import WriterHandler
-from bfcl.model_handler.api_inference.yi import YiHandler
-from bfcl.model_handler.local_inference.bielik import BielikHandler
-from bfcl.model_handler.local_inference.deepseek import DeepseekHandler
-from bfcl.model_handler.local_inference.deepseek_coder import DeepseekCoderHandler
-from bfcl.model_handler.local_inference.gemma import GemmaHandler
-from bfcl.model_handler.local_inference.glaive import GlaiveHandler
-from bfcl.model_handler.local_inference.glm import GLMHandler
-from bfcl.model_handler.local_inference.granite import GraniteHandler
-from bfcl.model_handler.local_inference.hammer import HammerHandler
-from bfcl.model_handler.local_inference.hermes import HermesHandler
-from bfcl.model_handler.local_inference.llama import LlamaHandler
-from bfcl.model_handler.local_inference.llama_fc import LlamaFCHandler
-from bfcl.model_handler.local_inference.minicpm import MiniCPMHandler
-from bfcl.model_handler.local_inference.minicpm_fc import MiniCPMFCHandler
-from bfcl.model_handler.local_inference.mistral_fc import MistralFCHandler
-from bfcl.model_handler.local_inference.phi import PhiHandler
-from bfcl.model_handler.local_inference.quick_testing_oss import QuickTestingOSSHandler
-from bfcl.model_handler.local_inference.qwen import QwenHandler
-from bfcl.model_handler.local_inference.salesforce import SalesforceHandler
-from bfcl.model_handler.local_inference.falcon_fc import Falcon3FCHandler
+import importlib
+from collections.abc import Mapping
+from functools import lru_cache
+
+# Handlers are registered as "module:Class" strings, and only imported when a model is actually built
+# Importing every handler module up front pulls in all the provider SDKs (vertexai, anthropic, cohere, mistralai, etc.), which made every `bfcl` command, even `bfcl models`, take several seconds to start
+
+
+@lru_cache(maxsize=None)
+def load_handler_class(handler_path: str) -> type:
+    """
+    Import and return the handler class referenced by a "module:Class" string.
+    """
+    module_name, class_name = handler_path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class LazyHandlerMap(Mapping):
+    """
+    Read-only mapping from model name to handler class, backed by "module:Class" strings.
+    Listing the model names or checking membership doesn't import anything; the handler module is imported on first lookup of a model.
+    """
+
+    def __init__(self, handler_paths: dict[str, str]) -> None:
+        self.handler_paths = handler_paths
+
+    def __getitem__(self, model_name: str) -> type:
+        return load_handler_class(self.handler_paths[model_name])
+
+    def __iter__(self):
+        return iter(self.handler_paths)
+
+    def __len__(self) -> int:
+        return len(self.handler_paths)
+
+    def __contains__(self, model_name) -> bool:
+        return model_name in self.handler_paths
+
 
 # TODO: Add meta-llama/Llama-3.1-405B-Instruct
 
 # Inference through API calls
 api_inference_handler_map = {
-    "gorilla-openfunctions-v2": GorillaHandler,
-    "DeepSeek-R1": DeepSeekAPIHandler,
-    "DeepSeek-V3-FC": DeepSeekAPIHandler,
-    "gpt-4.5-preview-2025-02-27": OpenAIHandler,
-    "gpt-4.5-preview-2025-02-27-FC": OpenAIHandler,
-    "o1-2024-12-17-FC": OpenAIHandler,
-    "o1-2024-12-17": OpenAIHandler,
-    "o3-mini-2025-01-31-FC": OpenAIHandler,
-    "o3-mini-2025-01-31": OpenAIHandler,
-    "gpt-4o-2024-11-20": OpenAIHandler,
-    "gpt-4o-2024-11-20-FC": OpenAIHandler,
-    "gpt-4o-mini-2024-07-18": OpenAIHandler,
-    "gpt-4o-mini-2024-07-18-FC": OpenAIHandler,
-    "gpt-4-turbo-2024-04-09": OpenAIHandler,
-    "gpt-4-turbo-2024-04-09-FC": OpenAIHandler,
-    "gpt-3.5-turbo-0125": OpenAIHandler,
-    "gpt-3.5-turbo-0125-FC": OpenAIHandler,
-    "claude-3-opus-20240229": ClaudeHandler,
-    "claude-3-opus-20240229-FC": ClaudeHandler,
-    "claude-3-5-sonnet-20241022": ClaudeHandler,
-    "claude-3-5-sonnet-20241022-FC": ClaudeHandler,
-    "claude-3-5-haiku-20241022": ClaudeHandler,
-    "claude-3-5-haiku-20241022-FC": ClaudeHandler,
-    "nova-pro-v1.0": NovaHandler,
-    "nova-lite-v1.0": NovaHandler,
-    "nova-micro-v1.0": NovaHandler,
-    "open-mistral-nemo-2407": MistralHandler,
-    "open-mistral-nemo-2407-FC": MistralHandler,
-    "open-mixtral-8x22b": MistralHandler,
-    "open-mixtral-8x22b-FC": MistralHandler,
-    "open-mixtral-8x7b": MistralHandler,
-    "mistral-large-2407": MistralHandler,
-    "mistral-large-2407-FC": MistralHandler,
-    "mistral-medium-2312": MistralHandler,
-    "mistral-small-2402": MistralHandler,
-    "mistral-small-2402-FC": MistralHandler,
-    "firefunction-v1-FC": FireworksHandler,
-    "firefunction-v2-FC": FireworksHandler,
-    "Nexusflow-Raven-v2": NexusHandler,
-    "gemini-2.0-flash-lite-preview-02-05-FC": GeminiHandler,
-    "gemini-2.0-flash-lite-preview-02-05": GeminiHandler,
-    "gemini-2.0-flash-001-FC": GeminiHandler,
-    "gemini-2.0-flash-001": GeminiHandler,
-    "gemini-2.0-pro-exp-02-05-FC": GeminiHandler,
-    "gemini-2.0-pro-exp-02-05": GeminiHandler,
-    "gemini-1.5-pro-002": GeminiHandler,
-    "gemini-1.5-pro-002-FC": GeminiHandler,
-    "gemini-1.5-pro-001": GeminiHandler,
-    "gemini-1.5-pro-001-FC": GeminiHandler,
-    "gemini-1.5-flash-002": GeminiHandler,
-    "gemini-1.5-flash-002-FC": GeminiHandler,
-    "gemini-1.5-flash-001": GeminiHandler,
-    "gemini-1.5-flash-001-FC": GeminiHandler,
-    "gemini-1.0-pro-002": GeminiHandler,
-    "gemini-1.0-pro-002-FC": GeminiHandler,
-    "meetkai/functionary-small-v3.1-FC": FunctionaryHandler,
-    "meetkai/functionary-medium-v3.1-FC": FunctionaryHandler,
-    "databricks-dbrx-instruct": DatabricksHandler,
-    "command-r-plus-FC": CohereHandler,
-    "command-r7b-12-2024-FC": CohereHandler,
-    "snowflake/arctic": NvidiaHandler,
-    "nvidia/nemotron-4-340b-instruct": NvidiaHandler,
-    "BitAgent/GoGoAgent": GoGoAgentHandler,
-    # "yi-large-fc": YiHandler,  #  Their API is under maintenance, and will not be back online in the near future
-    "palmyra-x-004": WriterHandler,
-    "grok-beta": GrokHandler,
+    "gorilla-openfunctions-v2": "bfcl.model_handler.api_inference.gorilla:GorillaHandler",
+    "DeepSeek-R1": "bfcl.model_handler.api_inference.deepseek:DeepSeekAPIHandler",
+    "DeepSeek-V3-FC": "bfcl.model_handler.api_inference.deepseek:DeepSeekAPIHandler",
+    "gpt-4.5-preview-2025-02-27": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "gpt-4.5-preview-2025-02-27-FC": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "o1-2024-12-17-FC": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "o1-2024-12-17": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "o3-mini-2025-01-31-FC": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "o3-mini-2025-01-31": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "gpt-4o-2024-11-20": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "gpt-4o-2024-11-20-FC": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "gpt-4o-mini-2024-07-18": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "gpt-4o-mini-2024-07-18-FC": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "gpt-4-turbo-2024-04-09": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "gpt-4-turbo-2024-04-09-FC": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "gpt-3.5-turbo-0125": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "gpt-3.5-turbo-0125-FC": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    "claude-3-opus-20240229": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    "claude-3-opus-20240229-FC": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    "claude-3-5-sonnet-20241022": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    "claude-3-5-sonnet-20241022-FC": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    "claude-3-5-haiku-20241022": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    "claude-3-5-haiku-20241022-FC": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    "nova-pro-v1.0": "bfcl.model_handler.api_inference.nova:NovaHandler",
+    "nova-lite-v1.0": "bfcl.model_handler.api_inference.nova:NovaHandler",
+    "nova-micro-v1.0": "bfcl.model_handler.api_inference.nova:NovaHandler",
+    "open-mistral-nemo-2407": "bfcl.model_handler.api_inference.mistral:MistralHandler",
+    "open-mistral-nemo-2407-FC": "bfcl.model_handler.api_inference.mistral:MistralHandler",
+    "open-mixtral-8x22b": "bfcl.model_handler.api_inference.mistral:MistralHandler",
+    "open-mixtral-8x22b-FC": "bfcl.model_handler.api_inference.mistral:MistralHandler",
+    "open-mixtral-8x7b": "bfcl.model_handler.api_inference.mistral:MistralHandler",
+    "mistral-large-2407": "bfcl.model_handler.api_inference.mistral:MistralHandler",
+    "mistral-large-2407-FC": "bfcl.model_handler.api_inference.mistral:MistralHandler",
+    "mistral-medium-2312": "bfcl.model_handler.api_inference.mistral:MistralHandler",
+    "mistral-small-2402": "bfcl.model_handler.api_inference.mistral:MistralHandler",
+    "mistral-small-2402-FC": "bfcl.model_handler.api_inference.mistral:MistralHandler",
+    "firefunction-v1-FC": "bfcl.model_handler.api_inference.fireworks:FireworksHandler",
+    "firefunction-v2-FC": "bfcl.model_handler.api_inference.fireworks:FireworksHandler",
+    "Nexusflow-Raven-v2": "bfcl.model_handler.api_inference.nexus:NexusHandler",
+    "gemini-2.0-flash-lite-preview-02-05-FC": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-2.0-flash-lite-preview-02-05": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-2.0-flash-001-FC": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-2.0-flash-001": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-2.0-pro-exp-02-05-FC": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-2.0-pro-exp-02-05": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-1.5-pro-002": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-1.5-pro-002-FC": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-1.5-pro-001": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-1.5-pro-001-FC": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-1.5-flash-002": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-1.5-flash-002-FC": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-1.5-flash-001": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-1.5-flash-001-FC": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-1.0-pro-002": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "gemini-1.0-pro-002-FC": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    "meetkai/functionary-small-v3.1-FC": "bfcl.model_handler.api_inference.functionary:FunctionaryHandler",
+    "meetkai/functionary-medium-v3.1-FC": "bfcl.model_handler.api_inference.functionary:FunctionaryHandler",
+    "databricks-dbrx-instruct": "bfcl.model_handler.api_inference.databricks:DatabricksHandler",
+    "command-r-plus-FC": "bfcl.model_handler.api_inference.cohere:CohereHandler",
+    "command-r7b-12-2024-FC": "bfcl.model_handler.api_inference.cohere:CohereHandler",
+    "snowflake/arctic": "bfcl.model_handler.api_inference.nvidia:NvidiaHandler",
+    "nvidia/nemotron-4-340b-instruct": "bfcl.model_handler.api_inference.nvidia:NvidiaHandler",
+    "BitAgent/GoGoAgent": "bfcl.model_handler.api_inference.gogoagent:GoGoAgentHandler",
+    # "yi-large-fc": "bfcl.model_handler.api_inference.yi:YiHandler",  #  Their API is under maintenance, and will not be back online in the near future
+    "palmyra-x-004": "bfcl.model_handler.api_inference.writer:WriterHandler",
+    "grok-beta": "bfcl.model_handler.api_inference.grok:GrokHandler",
 }
 
 # Inference through local hosting
 local_inference_handler_map = {
-    "google/gemma-2-2b-it": GemmaHandler,
-    "google/gemma-2-9b-it": GemmaHandler,
-    "google/gemma-2-27b-it": GemmaHandler,
-    "meta-llama/Meta-Llama-3-8B-Instruct": LlamaHandler,
-    "meta-llama/Meta-Llama-3-70B-Instruct": LlamaHandler,
-    "meta-llama/Llama-3.1-8B-Instruct-FC": LlamaFCHandler,
-    "meta-llama/Llama-3.1-8B-Instruct": LlamaHandler,
-    "meta-llama/Llama-3.1-70B-Instruct-FC": LlamaFCHandler,
-    "meta-llama/Llama-3.1-70B-Instruct": LlamaHandler,
-    "meta-llama/Llama-3.2-1B-Instruct": LlamaHandler,
-    "meta-llama/Llama-3.2-3B-Instruct": LlamaHandler,
-    "meta-llama/Llama-3.3-70B-Instruct-FC": LlamaFCHandler,
-    "meta-llama/Llama-3.3-70B-Instruct": LlamaHandler,
-    "Salesforce/xLAM-1b-fc-r": SalesforceHandler,
-    "Salesforce/xLAM-7b-fc-r": SalesforceHandler,
-    "Salesforce/xLAM-7b-r": SalesforceHandler,
-    "Salesforce/xLAM-8x22b-r": SalesforceHandler,
-    "Salesforce/xLAM-8x7b-r": SalesforceHandler,
-    "mistralai/Ministral-8B-Instruct-2410": MistralFCHandler,
-    "microsoft/Phi-3-mini-4k-instruct": PhiHandler,
-    "microsoft/Phi-3-mini-128k-instruct": PhiHandler,
-    "microsoft/Phi-3-small-8k-instruct": PhiHandler,
-    "microsoft/Phi-3-small-128k-instruct": PhiHandler,
-    "microsoft/Phi-3-medium-4k-instruct": PhiHandler,
-    "microsoft/Phi-3-medium-128k-instruct": PhiHandler,
-    "microsoft/Phi-3.5-mini-instruct": PhiHandler,
-    "NousResearch/Hermes-2-Pro-Mistral-7B": HermesHandler,
-    "NousResearch/Hermes-2-Pro-Llama-3-8B": HermesHandler,
-    "NousResearch/Hermes-2-Theta-Llama-3-8B": HermesHandler,
-    "NousResearch/Hermes-2-Pro-Llama-3-70B": HermesHandler,
-    "NousResearch/Hermes-2-Theta-Llama-3-70B": HermesHandler,
-    "ibm-granite/granite-20b-functioncalling": GraniteHandler,
-    "MadeAgents/Hammer2.1-7b": HammerHandler,
-    "MadeAgents/Hammer2.1-3b": HammerHandler,
-    "MadeAgents/Hammer2.1-1.5b": HammerHandler,
-    "MadeAgents/Hammer2.1-0.5b": HammerHandler,
-    "THUDM/glm-4-9b-chat": GLMHandler,
-    "Qwen/Qwen2-1.5B-Instruct": QwenHandler,
-    "Qwen/Qwen2-7B-Instruct": QwenHandler,
-    "Qwen/Qwen2.5-0.5B-Instruct": QwenHandler,
-    "Qwen/Qwen2.5-1.5B-Instruct": QwenHandler,
-    "Qwen/Qwen2.5-3B-Instruct": QwenHandler,
-    "Qwen/Qwen2.5-7B-Instruct": QwenHandler,
-    "Qwen/Qwen2.5-14B-Instruct": QwenHandler,
-    "Qwen/Qwen2.5-32B-Instruct": QwenHandler,
-    "Qwen/Qwen2.5-72B-Instruct": QwenHandler,
-    "Team-ACE/ToolACE-8B": LlamaHandler,
-    "openbmb/MiniCPM3-4B": MiniCPMHandler,
-    "openbmb/MiniCPM3-4B-FC": MiniCPMFCHandler,
-    "watt-ai/watt-tool-8B": LlamaHandler,
-    "watt-ai/watt-tool-70B": LlamaHandler,
-    "deepseek-ai/DeepSeek-V2.5": DeepseekCoderHandler,
-    "deepseek-ai/DeepSeek-Coder-V2-Instruct-0724": DeepseekCoderHandler,
-    "deepseek-ai/DeepSeek-Coder-V2-Lite-Instruct": DeepseekCoderHandler,
-    "deepseek-ai/DeepSeek-V2-Chat-0628": DeepseekHandler,
-    "deepseek-ai/DeepSeek-V2-Lite-Chat": DeepseekHandler,
-    "ZJared/Haha-7B": QwenHandler,
-    "speakleash/Bielik-11B-v2.3-Instruct": BielikHandler,
-    "NovaSky-AI/Sky-T1-32B-Preview": QwenHandler,
-    "Qwen/QwQ-32B-Preview": QwenHandler,
-    "tiiuae/Falcon3-10B-Instruct-FC": Falcon3FCHandler,
-    "tiiuae/Falcon3-7B-Instruct-FC": Falcon3FCHandler,
-    "tiiuae/Falcon3-3B-Instruct-FC": Falcon3FCHandler,
-    "tiiuae/Falcon3-1B-Instruct-FC": Falcon3FCHandler,
-    "uiuc-convai/CoALM-8B": LlamaHandler,
-    "uiuc-convai/CoALM-70B": LlamaHandler,
-    "uiuc-convai/CoALM-405B": LlamaHandler,
-    "BitAgent/BitAgent-8B": LlamaHandler
+    "google/gemma-2-2b-it": "bfcl.model_handler.local_inference.gemma:GemmaHandler",
+    "google/gemma-2-9b-it": "bfcl.model_handler.local_inference.gemma:GemmaHandler",
+    "google/gemma-2-27b-it": "bfcl.model_handler.local_inference.gemma:GemmaHandler",
+    "meta-llama/Meta-Llama-3-8B-Instruct": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "meta-llama/Meta-Llama-3-70B-Instruct": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "meta-llama/Llama-3.1-8B-Instruct-FC": "bfcl.model_handler.local_inference.llama_fc:LlamaFCHandler",
+    "meta-llama/Llama-3.1-8B-Instruct": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "meta-llama/Llama-3.1-70B-Instruct-FC": "bfcl.model_handler.local_inference.llama_fc:LlamaFCHandler",
+    "meta-llama/Llama-3.1-70B-Instruct": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "meta-llama/Llama-3.2-1B-Instruct": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "meta-llama/Llama-3.2-3B-Instruct": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "meta-llama/Llama-3.3-70B-Instruct-FC": "bfcl.model_handler.local_inference.llama_fc:LlamaFCHandler",
+    "meta-llama/Llama-3.3-70B-Instruct": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "Salesforce/xLAM-1b-fc-r": "bfcl.model_handler.local_inference.salesforce:SalesforceHandler",
+    "Salesforce/xLAM-7b-fc-r": "bfcl.model_handler.local_inference.salesforce:SalesforceHandler",
+    "Salesforce/xLAM-7b-r": "bfcl.model_handler.local_inference.salesforce:SalesforceHandler",
+    "Salesforce/xLAM-8x22b-r": "bfcl.model_handler.local_inference.salesforce:SalesforceHandler",
+    "Salesforce/xLAM-8x7b-r": "bfcl.model_handler.local_inference.salesforce:SalesforceHandler",
+    "mistralai/Ministral-8B-Instruct-2410": "bfcl.model_handler.local_inference.mistral_fc:MistralFCHandler",
+    "microsoft/Phi-3-mini-4k-instruct": "bfcl.model_handler.local_inference.phi:PhiHandler",
+    "microsoft/Phi-3-mini-128k-instruct": "bfcl.model_handler.local_inference.phi:PhiHandler",
+    "microsoft/Phi-3-small-8k-instruct": "bfcl.model_handler.local_inference.phi:PhiHandler",
+    "microsoft/Phi-3-small-128k-instruct": "bfcl.model_handler.local_inference.phi:PhiHandler",
+    "microsoft/Phi-3-medium-4k-instruct": "bfcl.model_handler.local_inference.phi:PhiHandler",
+    "microsoft/Phi-3-medium-128k-instruct": "bfcl.model_handler.local_inference.phi:PhiHandler",
+    "microsoft/Phi-3.5-mini-instruct": "bfcl.model_handler.local_inference.phi:PhiHandler",
+    "NousResearch/Hermes-2-Pro-Mistral-7B": "bfcl.model_handler.local_inference.hermes:HermesHandler",
+    "NousResearch/Hermes-2-Pro-Llama-3-8B": "bfcl.model_handler.local_inference.hermes:HermesHandler",
+    "NousResearch/Hermes-2-Theta-Llama-3-8B": "bfcl.model_handler.local_inference.hermes:HermesHandler",
+    "NousResearch/Hermes-2-Pro-Llama-3-70B": "bfcl.model_handler.local_inference.hermes:HermesHandler",
+    "NousResearch/Hermes-2-Theta-Llama-3-70B": "bfcl.model_handler.local_inference.hermes:HermesHandler",
+    "ibm-granite/granite-20b-functioncalling": "bfcl.model_handler.local_inference.granite:GraniteHandler",
+    "MadeAgents/Hammer2.1-7b": "bfcl.model_handler.local_inference.hammer:HammerHandler",
+    "MadeAgents/Hammer2.1-3b": "bfcl.model_handler.local_inference.hammer:HammerHandler",
+    "MadeAgents/Hammer2.1-1.5b": "bfcl.model_handler.local_inference.hammer:HammerHandler",
+    "MadeAgents/Hammer2.1-0.5b": "bfcl.model_handler.local_inference.hammer:HammerHandler",
+    "THUDM/glm-4-9b-chat": "bfcl.model_handler.local_inference.glm:GLMHandler",
+    "Qwen/Qwen2-1.5B-Instruct": "bfcl.model_handler.local_inference.qwen:QwenHandler",
+    "Qwen/Qwen2-7B-Instruct": "bfcl.model_handler.local_inference.qwen:QwenHandler",
+    "Qwen/Qwen2.5-0.5B-Instruct": "bfcl.model_handler.local_inference.qwen:QwenHandler",
+    "Qwen/Qwen2.5-1.5B-Instruct": "bfcl.model_handler.local_inference.qwen:QwenHandler",
+    "Qwen/Qwen2.5-3B-Instruct": "bfcl.model_handler.local_inference.qwen:QwenHandler",
+    "Qwen/Qwen2.5-7B-Instruct": "bfcl.model_handler.local_inference.qwen:QwenHandler",
+    "Qwen/Qwen2.5-14B-Instruct": "bfcl.model_handler.local_inference.qwen:QwenHandler",
+    "Qwen/Qwen2.5-32B-Instruct": "bfcl.model_handler.local_inference.qwen:QwenHandler",
+    "Qwen/Qwen2.5-72B-Instruct": "bfcl.model_handler.local_inference.qwen:QwenHandler",
+    "Team-ACE/ToolACE-8B": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "openbmb/MiniCPM3-4B": "bfcl.model_handler.local_inference.minicpm:MiniCPMHandler",
+    "openbmb/MiniCPM3-4B-FC": "bfcl.model_handler.local_inference.minicpm_fc:MiniCPMFCHandler",
+    "watt-ai/watt-tool-8B": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "watt-ai/watt-tool-70B": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "deepseek-ai/DeepSeek-V2.5": "bfcl.model_handler.local_inference.deepseek_coder:DeepseekCoderHandler",
+    "deepseek-ai/DeepSeek-Coder-V2-Instruct-0724": "bfcl.model_handler.local_inference.deepseek_coder:DeepseekCoderHandler",
+    "deepseek-ai/DeepSeek-Coder-V2-Lite-Instruct": "bfcl.model_handler.local_inference.deepseek_coder:DeepseekCoderHandler",
+    "deepseek-ai/DeepSeek-V2-Chat-0628": "bfcl.model_handler.local_inference.deepseek:DeepseekHandler",
+    "deepseek-ai/DeepSeek-V2-Lite-Chat": "bfcl.model_handler.local_inference.deepseek:DeepseekHandler",
+    "ZJared/Haha-7B": "bfcl.model_handler.local_inference.qwen:QwenHandler",
+    "speakleash/Bielik-11B-v2.3-Instruct": "bfcl.model_handler.local_inference.bielik:BielikHandler",
+    "NovaSky-AI/Sky-T1-32B-Preview": "bfcl.model_handler.local_inference.qwen:QwenHandler",
+    "Qwen/QwQ-32B-Preview": "bfcl.model_handler.local_inference.qwen:QwenHandler",
+    "tiiuae/Falcon3-10B-Instruct-FC": "bfcl.model_handler.local_inference.falcon_fc:Falcon3FCHandler",
+    "tiiuae/Falcon3-7B-Instruct-FC": "bfcl.model_handler.local_inference.falcon_fc:Falcon3FCHandler",
+    "tiiuae/Falcon3-3B-Instruct-FC": "bfcl.model_handler.local_inference.falcon_fc:Falcon3FCHandler",
+    "tiiuae/Falcon3-1B-Instruct-FC": "bfcl.model_handler.local_inference.falcon_fc:Falcon3FCHandler",
+    "uiuc-convai/CoALM-8B": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "uiuc-convai/CoALM-70B": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "uiuc-convai/CoALM-405B": "bfcl.model_handler.local_inference.llama:LlamaHandler",
+    "BitAgent/BitAgent-8B": "bfcl.model_handler.local_inference.llama:LlamaHandler",
 }
 
 # Deprecated/outdated models, no longer on the leaderboard
 outdated_model_handler_map = {
-    # "gorilla-openfunctions-v0": GorillaHandler,
-    # "o1-preview-2024-09-12": OpenAIHandler,
-    # "o1-mini-2024-09-12": OpenAIHandler,
-    # "gpt-4o-2024-08-06": OpenAIHandler,
-    # "gpt-4o-2024-08-06-FC": OpenAIHandler,
-    # "gpt-4o-2024-05-13": OpenAIHandler,
-    # "gpt-4o-2024-05-13-FC": OpenAIHandler,
-    # "gpt-4-1106-preview-FC": OpenAIHandler,
-    # "gpt-4-1106-preview": OpenAIHandler,
-    # "gpt-4-0125-preview-FC": OpenAIHandler,
-    # "gpt-4-0125-preview": OpenAIHandler,
-    # "gpt-4-0613-FC": OpenAIHandler,
-    # "gpt-4-0613": OpenAIHandler,
-    # "claude-2.1": ClaudeHandler,
-    # "claude-instant-1.2": ClaudeHandler,
-    # "claude-3-sonnet-20240229": ClaudeHandler,
-    # "claude-3-sonnet-20240229-FC": ClaudeHandler,
-    # "claude-3-5-sonnet-20240620": ClaudeHandler,
-    # "claude-3-5-sonnet-20240620-FC": ClaudeHandler,
-    # "claude-3-haiku-20240307": ClaudeHandler,
-    # "claude-3-haiku-20240307-FC": ClaudeHandler,
-    # "gemini-1.0-pro-001": GeminiHandler,
-    # "gemini-1.0-pro-001-FC": GeminiHandler,
-    # "meetkai/functionary-small-v3.1-FC": FunctionaryHandler,
-    # "mistral-tiny-2312": MistralHandler,
-    # "glaiveai/glaive-function-calling-v1": GlaiveHandler,
-    # "google/gemma-7b-it": GemmaHandler,
-    # "deepseek-ai/deepseek-coder-6.7b-instruct": DeepseekHandler,
+    # "gorilla-openfunctions-v0": "bfcl.model_handler.api_inference.gorilla:GorillaHandler",
+    # "o1-preview-2024-09-12": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    # "o1-mini-2024-09-12": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    # "gpt-4o-2024-08-06": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    # "gpt-4o-2024-08-06-FC": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    # "gpt-4o-2024-05-13": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    # "gpt-4o-2024-05-13-FC": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    # "gpt-4-1106-preview-FC": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    # "gpt-4-1106-preview": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    # "gpt-4-0125-preview-FC": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    # "gpt-4-0125-preview": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    # "gpt-4-0613-FC": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    # "gpt-4-0613": "bfcl.model_handler.api_inference.openai:OpenAIHandler",
+    # "claude-2.1": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    # "claude-instant-1.2": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    # "claude-3-sonnet-20240229": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    # "claude-3-sonnet-20240229-FC": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    # "claude-3-5-sonnet-20240620": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    # "claude-3-5-sonnet-20240620-FC": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    # "claude-3-haiku-20240307": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    # "claude-3-haiku-20240307-FC": "bfcl.model_handler.api_inference.claude:ClaudeHandler",
+    # "gemini-1.0-pro-001": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    # "gemini-1.0-pro-001-FC": "bfcl.model_handler.api_inference.gemini:GeminiHandler",
+    # "meetkai/functionary-small-v3.1-FC": "bfcl.model_handler.api_inference.functionary:FunctionaryHandler",
+    # "mistral-tiny-2312": "bfcl.model_handler.api_inference.mistral:MistralHandler",
+    # "glaiveai/glaive-function-calling-v1": "bfcl.model_handler.local_inference.glaive:GlaiveHandler",
+    # "google/gemma-7b-it": "bfcl.model_handler.local_inference.gemma:GemmaHandler",
+    # "deepseek-ai/deepseek-coder-6.7b-instruct": "bfcl.model_handler.local_inference.deepseek:DeepseekHandler",
 }
 
-HANDLER_MAP = {**api_inference_handler_map, **local_inference_handler_map}
+HANDLER_MAP = LazyHandlerMap(
+    {**api_inference_handler_map, **local_inference_handler_map}
+)
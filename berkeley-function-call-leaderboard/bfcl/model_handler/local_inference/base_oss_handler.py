@@ -2,19 +2,27 @@ import subprocess
 import threading
 import time
 import os
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 from bfcl.constant import RESULT_PATH
 from bfcl.model_handler.base_handler import BaseHandler
 from bfcl.model_handler.model_style import ModelStyle
-from bfcl.model_handler.local_inference.constant import VLLM_PORT
+from bfcl.model_handler.local_inference.constant import (
+    MAX_OUTPUT_TOKENS,
+    PROMPT_FORMAT_CACHE_FIELD,
+    PROMPT_TOKEN_COUNT_CACHE_FIELD,
+    PROMPT_TOKEN_COUNT_MAX_DRIFT_PER_STEP,
+    VLLM_PORT,
+)
 from bfcl.model_handler.utils import (
+    compute_prefix_sharing_ratio,
     default_decode_ast_prompting,
     default_decode_execute_prompting,
     func_doc_language_specific_pre_processing,
     system_prompt_pre_processing_chat_model,
 )
+from bfcl.utils import copy_test_entry_for_inference
 from openai import OpenAI
 from overrides import EnforceOverrides, final, override
 from tqdm import tqdm
@@ -63,7 +71,6 @@ class OSSHandler(BaseHandler, EnforceOverrides):
         skip_server_setup: bool,
         include_input_log: bool,
         exclude_state_log: bool,
-        update_mode: bool,
         result_dir=RESULT_PATH,
     ):
         """
@@ -186,6 +193,9 @@ class OSSHandler(BaseHandler, EnforceOverrides):
                 # Signal threads to stop reading output
                 stop_event.set()
 
+            # Send the requests that share a prompt prefix back to back, so that the server can reuse its prefix cache
+            test_entries = self._schedule_for_prefix_caching(test_entries)
+
             # Once the server is ready, make the completion requests
             futures = []
             with ThreadPoolExecutor(max_workers=100) as executor:
@@ -203,10 +213,10 @@ class OSSHandler(BaseHandler, EnforceOverrides):
                         )
                         futures.append(future)
 
-                    for future in futures:
-                        # This will wait for the task to complete, so that we are always writing in order
+                    # Write the results as they complete; the result files are sorted once the generation is done
+                    for future in as_completed(futures):
                         result = future.result()
-                        self.write(result, result_dir, update_mode=update_mode)
+                        self.write(result, result_dir)
                         pbar.update()
 
         except Exception as e:
@@ -230,6 +240,48 @@ class OSSHandler(BaseHandler, EnforceOverrides):
                 stdout_thread.join()
                 stderr_thread.join()
 
+    @final
+    def _schedule_for_prefix_caching(self, test_entries: list[dict]) -> list[dict]:
+        """
+        Order the test entries so that the requests sharing a prompt prefix (eg, the system prompt with the same function docs, which is shared by the multi-turn entries involving the same classes and by the live entries with the same function doc) are sent back to back.
+        This raises the hit rate of the server's prefix cache (vLLM's automatic prefix caching, SGLang's RadixAttention), which is otherwise mostly missed because the entries are in `sort_key` order.
+        Sorting the formatted prompts lexicographically visits them in the depth-first order of their prefix tree, so each prompt shares the longest possible prefix with the one sent right before it.
+        Only the prompt of the first query is considered; the prompts of the later steps of an entry extend it.
+        """
+        formatted_prompts = {
+            test_entry["id"]: self._format_first_prompt(test_entry)
+            for test_entry in test_entries
+        }
+        scheduled_test_entries = sorted(
+            test_entries, key=lambda test_entry: formatted_prompts[test_entry["id"]]
+        )
+
+        original_sharing_ratio = compute_prefix_sharing_ratio(
+            [formatted_prompts[test_entry["id"]] for test_entry in test_entries]
+        )
+        scheduled_sharing_ratio = compute_prefix_sharing_ratio(
+            [formatted_prompts[test_entry["id"]] for test_entry in scheduled_test_entries]
+        )
+        print(
+            f"Prompt prefix shared with the previous request: {scheduled_sharing_ratio:.1%} after scheduling ({original_sharing_ratio:.1%} before)."
+        )
+
+        return scheduled_test_entries
+
+    @final
+    def _format_first_prompt(self, test_entry: dict) -> str:
+        # Same pre-processing as for the first query of the inference loops in `BaseHandler`, done on a copy to leave the test entry untouched
+        try:
+            entry_copy = copy_test_entry_for_inference(test_entry)
+            inference_data = self._pre_query_processing_prompting(entry_copy)
+            inference_data = self.add_first_turn_message_prompting(
+                inference_data, entry_copy["question"][0]
+            )
+            return self._format_prompt(inference_data["message"], inference_data["function"])
+        except Exception:
+            # The same error will surface (and be recorded) during the inference of this entry; it just doesn't get scheduled
+            return ""
+
     @final
     def _multi_threaded_inference(
         self, test_case, include_input_log: bool, exclude_state_log: bool
@@ -273,22 +325,87 @@ class OSSHandler(BaseHandler, EnforceOverrides):
         """
         Manually apply the chat template to construct the formatted prompt.
         This way, we can have full control over the final formatted prompt and is generally recommended for advanced use cases.
+        Handlers whose chat template is a header, then each message formatted on its own, then the generation prompt, implement `_format_prompt_header`, `_format_message` and `_format_generation_prompt` instead of this method; their prompts are then formatted incrementally over the steps of a conversation (see `_format_prompt_incrementally`).
         """
-        raise NotImplementedError(
-            "OSS Models should implement their own prompt formatting."
+        if type(self)._format_message is OSSHandler._format_message:
+            raise NotImplementedError(
+                "OSS Models should implement their own prompt formatting."
+            )
+        return (
+            self._format_prompt_header(function)
+            + "".join(self._format_message(message) for message in messages)
+            + self._format_generation_prompt()
         )
 
+    def _format_prompt_header(self, function):
+        """
+        The part of the formatted prompt before the first message, such as the BOS token or the function docs.
+        """
+        return ""
+
+    def _format_message(self, message):
+        """
+        The formatted prompt part of a single message, which must not depend on the other messages.
+        """
+        raise NotImplementedError
+
+    def _format_generation_prompt(self):
+        """
+        The part of the formatted prompt after the last message, which prompts the model to answer.
+        """
+        raise NotImplementedError
+
+    @final
+    def _format_prompt_incrementally(self, inference_data: dict, messages, function) -> str:
+        """
+        Format the prompt of a step of the conversation, the same as `_format_prompt`.
+        The messages are only ever appended to over the steps of a conversation, so for the handlers that format each message on its own, the messages formatted in the previous steps are kept in `inference_data` and only the new ones are formatted; this keeps the per-entry formatting cost linear in the conversation length instead of quadratic.
+        The other handlers format the whole conversation again.
+        """
+        if type(self)._format_prompt is not OSSHandler._format_prompt:
+            return self._format_prompt(messages, function)
+
+        format_cache = inference_data.get(PROMPT_FORMAT_CACHE_FIELD)
+        # Anything but appended messages (eg, another function list) formats the whole prompt again
+        if (
+            format_cache is None
+            or format_cache["function"] is not function
+            or format_cache["function_count"] != len(function)
+            or format_cache["message_count"] > len(messages)
+            or (
+                format_cache["message_count"] > 0
+                and format_cache["last_message"] is not messages[format_cache["message_count"] - 1]
+            )
+        ):
+            format_cache = {
+                "function": function,
+                "function_count": len(function),
+                "message_count": 0,
+                "last_message": None,
+                "formatted_messages": self._format_prompt_header(function),
+            }
+        for message in messages[format_cache["message_count"] :]:
+            format_cache["formatted_messages"] += self._format_message(message)
+        if len(messages) > format_cache["message_count"]:
+            format_cache["message_count"] = len(messages)
+            format_cache["last_message"] = messages[-1]
+
+        inference_data[PROMPT_FORMAT_CACHE_FIELD] = format_cache
+        return format_cache["formatted_messages"] + self._format_generation_prompt()
+
     @override
     def _query_prompting(self, inference_data: dict):
         # We use the OpenAI Completions API
         function: list[dict] = inference_data["function"]
         message: list[dict] = inference_data["message"]
 
-        formatted_prompt: str = self._format_prompt(message, function)
+        formatted_prompt: str = self._format_prompt_incrementally(
+            inference_data, message, function
+        )
         inference_data["inference_input_log"] = {"formatted_prompt": formatted_prompt}
 
         # Tokenize the formatted prompt to get token count
-        input_token_count = len(self.tokenizer.tokenize(formatted_prompt))
+        input_token_count = self._count_prompt_tokens(inference_data, formatted_prompt)
 
         # Determine the number of tokens to request. Cap it at 4096 if the model has a larger limit.
         if self.max_context_length < input_token_count + 2:
@@ -296,7 +413,7 @@ class OSSHandler(BaseHandler, EnforceOverrides):
             leftover_tokens_count = 1000
         else:
             leftover_tokens_count = min(
-                4096,
+                MAX_OUTPUT_TOKENS,
                 self.max_context_length - input_token_count - 2,
             )
 
@@ -326,6 +443,38 @@ class OSSHandler(BaseHandler, EnforceOverrides):
 
         return api_response, end_time - start_time
 
+    @final
+    def _count_prompt_tokens(self, inference_data: dict, formatted_prompt: str) -> int:
+        """
+        Count the tokens in the formatted prompt, incrementally over the steps of a conversation.
+        In multi-turn inference, the prompt of each step is usually the prompt of the previous step with the new messages appended, so only the appended part is tokenized; this keeps the per-entry tokenization cost linear in the conversation length instead of quadratic.
+        Tokenizing the appended part on its own can differ from tokenizing the whole prompt by a few tokens, as tokens may merge across the split. The count only matters when the prompt is within `MAX_OUTPUT_TOKENS` of the context length (it then decides the `max_tokens` requested, and whether the prompt overflows), so the whole prompt is tokenized again whenever the possible error could reach that range; the result is then the same as tokenizing the whole prompt at every step.
+        If the prompt is not an extension of the previous one (eg, the chat template rewrites earlier turns), the whole prompt is tokenized again.
+        """
+        cached_prompt, cached_token_count, cached_max_drift = inference_data.get(
+            PROMPT_TOKEN_COUNT_CACHE_FIELD, ("", 0, 0)
+        )
+        if cached_prompt and formatted_prompt.startswith(cached_prompt):
+            token_count = cached_token_count + len(
+                self.tokenizer.tokenize(formatted_prompt[len(cached_prompt) :])
+            )
+            max_drift = cached_max_drift + PROMPT_TOKEN_COUNT_MAX_DRIFT_PER_STEP
+            if token_count + max_drift + 2 + MAX_OUTPUT_TOKENS > self.max_context_length:
+                full_token_count = len(self.tokenizer.tokenize(formatted_prompt))
+                # Check the incremental count against the full one; far from the limit, the incremental count is only as good as the assumed error bound
+                if abs(full_token_count - token_count) > max_drift:
+                    print(
+                        f"❗️ The incremental prompt token count ({token_count}) is off by more than {max_drift} tokens from the full count ({full_token_count}) for {self.model_name}."
+                    )
+                token_count = full_token_count
+                max_drift = 0
+        else:
+            token_count = len(self.tokenizer.tokenize(formatted_prompt))
+            max_drift = 0
+
+        inference_data[PROMPT_TOKEN_COUNT_CACHE_FIELD] = (formatted_prompt, token_count, max_drift)
+        return token_count
+
     @override
     def _pre_query_processing_prompting(self, test_entry: dict) -> dict:
         functions: list = test_entry["function"]
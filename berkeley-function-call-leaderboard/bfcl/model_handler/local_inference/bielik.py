@@ -9,17 +9,17 @@ class BielikHandler(OSSHandler):
         super().__init__(model_name, temperature)
 
     @override
-    def _format_prompt(self, messages, function):
+    def _format_prompt_header(self, function):
         """
         "bos_token": "<s>",
         "chat_template": "{{bos_token}}{% for message in messages %}{{'<|im_start|>' + message['role'] + '\n' + message['content'] + '<|im_end|>' + '\n'}}{% endfor %}{% if add_generation_prompt %}{{ '<|im_start|>assistant\n' }}{% endif %}",
         """
+        return "<s>"
 
-        formatted_prompt = "<s>"
-
-        for message in messages:
-            formatted_prompt += f"<|im_start|>{message['role']}\n{message['content']}<|im_end|>\n"
+    @override
+    def _format_message(self, message):
+        return f"<|im_start|>{message['role']}\n{message['content']}<|im_end|>\n"
 
-        formatted_prompt += f"<|im_start|>assistant\n"
-        
-        return formatted_prompt
+    @override
+    def _format_generation_prompt(self):
+        return f"<|im_start|>assistant\n"
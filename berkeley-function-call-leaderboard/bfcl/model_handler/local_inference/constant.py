@@ -1 +1,9 @@
-VLLM_PORT = 1053
\ No newline at end of file
+VLLM_PORT = 1053
+# Key in `inference_data` under which `OSSHandler` keeps the last formatted prompt of the conversation and its token count, so that the next step only needs to tokenize the newly appended part
+PROMPT_TOKEN_COUNT_CACHE_FIELD = "prompt_token_count_cache"
+# Key in `inference_data` under which `OSSHandler` keeps the messages of the conversation formatted so far, so that the next step only needs to format the newly appended messages
+PROMPT_FORMAT_CACHE_FIELD = "prompt_format_cache"
+# The `max_tokens` requested from the completions endpoint is capped at this many tokens
+MAX_OUTPUT_TOKENS = 4096
+# Tokenizing the appended part of a prompt on its own can give a few more (or fewer) tokens than tokenizing the whole prompt, as tokens may merge across the split; this is the error assumed for each appended part
+PROMPT_TOKEN_COUNT_MAX_DRIFT_PER_STEP = 16
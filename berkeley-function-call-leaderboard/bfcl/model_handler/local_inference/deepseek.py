@@ -28,7 +28,7 @@ class DeepseekHandler(OSSHandler):
         return super().decode_execute(result)
 
     @override
-    def _format_prompt(self, messages, function):
+    def _format_prompt_header(self, function):
         """
         "bos_token": {
             "__type": "AddedToken",
@@ -48,19 +48,21 @@ class DeepseekHandler(OSSHandler):
         },
         "chat_template": "{% if not add_generation_prompt is defined %}{% set add_generation_prompt = false %}{% endif %}{{ bos_token }}{% for message in messages %}{% if message['role'] == 'user' %}{{ 'User: ' + message['content'] + '\n\n' }}{% elif message['role'] == 'assistant' %}{{ 'Assistant: ' + message['content'] + eos_token }}{% elif message['role'] == 'system' %}{{ message['content'] + '\n\n' }}{% endif %}{% endfor %}{% if add_generation_prompt %}{{ 'Assistant:' }}{% endif %}"
         """
-        formatted_prompt = "<｜begin▁of▁sentence｜>"
+        return "<｜begin▁of▁sentence｜>"
 
-        for message in messages:
-            if message["role"] == "user":
-                formatted_prompt += f"User: {message['content']}\n\n"
-            elif message["role"] == "assistant":
-                formatted_prompt += f"Assistant: {message['content']}<｜end▁of▁sentence｜>"
-            elif message["role"] == "system":
-                formatted_prompt += f"{message['content']}\n\n"
-
-        formatted_prompt += "Assistant:"
+    @override
+    def _format_message(self, message):
+        if message["role"] == "user":
+            return f"User: {message['content']}\n\n"
+        elif message["role"] == "assistant":
+            return f"Assistant: {message['content']}<｜end▁of▁sentence｜>"
+        elif message["role"] == "system":
+            return f"{message['content']}\n\n"
+        return ""
 
-        return formatted_prompt
+    @override
+    def _format_generation_prompt(self):
+        return "Assistant:"
 
     @override
     def _add_execution_results_prompting(
@@ -13,19 +13,20 @@ class GemmaHandler(OSSHandler):
         super().__init__(model_name, temperature)
 
     @override
-    def _format_prompt(self, messages, function):
+    def _format_prompt_header(self, function):
         """
         "bos_token": "<bos>",
         "chat_template": "{{ bos_token }}{% if messages[0]['role'] == 'system' %}{{ raise_exception('System role not supported') }}{% endif %}{% for message in messages %}{% if (message['role'] == 'user') != (loop.index0 % 2 == 0) %}{{ raise_exception('Conversation roles must alternate user/assistant/user/assistant/...') }}{% endif %}{% if (message['role'] == 'assistant') %}{% set role = 'model' %}{% else %}{% set role = message['role'] %}{% endif %}{{ '<start_of_turn>' + role + '\n' + message['content'] | trim + '<end_of_turn>\n' }}{% endfor %}{% if add_generation_prompt %}{{'<start_of_turn>model\n'}}{% endif %}",
         """
-        formatted_prompt = "<bos>"
+        return "<bos>"
 
-        for message in messages:
-            formatted_prompt += f"<start_of_turn>{message['role']}\n{message['content'].strip()}<end_of_turn>\n"
-
-        formatted_prompt += f"<start_of_turn>model\n"
+    @override
+    def _format_message(self, message):
+        return f"<start_of_turn>{message['role']}\n{message['content'].strip()}<end_of_turn>\n"
 
-        return formatted_prompt
+    @override
+    def _format_generation_prompt(self):
+        return f"<start_of_turn>model\n"
 
     @override
     def _pre_query_processing_prompting(self, test_entry: dict) -> dict:
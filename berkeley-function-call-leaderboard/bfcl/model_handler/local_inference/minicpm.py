@@ -7,17 +7,12 @@ class MiniCPMHandler(OSSHandler):
         super().__init__(model_name, temperature)
 
     @override
-    def _format_prompt(self, messages, function):
+    def _format_message(self, message):
         """
         "chat_template": "{% for message in messages %}{{'<|im_start|>' + message['role'] + '\n' + message['content'] + '<|im_end|>' + '\n'}}{% endfor %}{% if add_generation_prompt %}{{ '<|im_start|>assistant\n' }}{% endif %}"
         """
-        formatted_prompt = ""
+        return f"<|im_start|>{message['role']}\n{message['content']}<|im_end|>\n"
 
-        for message in messages:
-            formatted_prompt += (
-                f"<|im_start|>{message['role']}\n{message['content']}<|im_end|>\n"
-            )
-
-        formatted_prompt += f"<|im_start|>assistant\n"
-
-        return formatted_prompt
+    @override
+    def _format_generation_prompt(self):
+        return f"<|im_start|>assistant\n"
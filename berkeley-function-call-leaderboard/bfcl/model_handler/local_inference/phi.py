@@ -13,7 +13,7 @@ class PhiHandler(OSSHandler):
         super().__init__(model_name, temperature)
 
     @override
-    def _format_prompt(self, messages, function):
+    def _format_prompt_header(self, function):
         if "Phi-3-small" in self.model_name:
             # Phi-3-small
             """
@@ -21,21 +21,22 @@ class PhiHandler(OSSHandler):
             "chat_template": "{{ bos_token }}{% for message in messages %}{{'<|' + message['role'] + '|>' + '\n' + message['content'] + '<|end|>\n' }}{% endfor %}{% if add_generation_prompt %}{{ '<|assistant|>\n' }}{% else %}{{ eos_token }}{% endif %}",
             "eos_token": "<|endoftext|>",
             """
-            formatted_prompt = "<|endoftext|>"
+            return "<|endoftext|>"
         else:
             # Phi-3.5-mini, Phi-3-medium, Phi-3-mini
             """
             "bos_token": "<s>",
             "chat_template": "{% for message in messages %}{% if message['role'] == 'system' and message['content'] %}{{'<|system|>\n' + message['content'] + '<|end|>\n'}}{% elif message['role'] == 'user' %}{{'<|user|>\n' + message['content'] + '<|end|>\n'}}{% elif message['role'] == 'assistant' %}{{'<|assistant|>\n' + message['content'] + '<|end|>\n'}}{% endif %}{% endfor %}{% if add_generation_prompt %}{{ '<|assistant|>\n' }}{% else %}{{ eos_token }}{% endif %}",
             """
-            formatted_prompt = ""
+            return ""
 
-        for message in messages:
-            formatted_prompt += f"<|{message['role']}|>\n{message['content']}<|end|>\n"
-
-        formatted_prompt += f"<|assistant|>\n"
+    @override
+    def _format_message(self, message):
+        return f"<|{message['role']}|>\n{message['content']}<|end|>\n"
 
-        return formatted_prompt
+    @override
+    def _format_generation_prompt(self):
+        return f"<|assistant|>\n"
 
     @override
     def _pre_query_processing_prompting(self, test_entry: dict) -> dict:
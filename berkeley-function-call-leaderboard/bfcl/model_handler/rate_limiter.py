@@ -0,0 +1,242 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+# Lower bound for the adaptive request rate, so that a burst of throttling errors never stalls a provider completely
+MIN_REQUESTS_PER_SECOND = 0.05
+# Factor applied to the request rate when the provider throttles us (the multiplicative decrease of AIMD)
+RATE_DECREASE_FACTOR = 0.5
+# Backoff used when the provider throttles us without telling us how long to wait
+MIN_THROTTLE_BACKOFF = 1
+MAX_THROTTLE_BACKOFF = 60
+# Window used to estimate the current request rate when no rate has been configured yet
+RATE_ESTIMATION_WINDOW = 10
+
+THROTTLE_STATUS_CODES = {429, 503}
+THROTTLE_ERROR_NAMES = {"RateLimitError", "ResourceExhausted", "ThrottlingException"}
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter with AIMD (additive increase, multiplicative decrease) adaptation.
+
+    One limiter is shared by every handler and worker that queries the same provider and model (see `get_rate_limiter`).
+    It limits both the request rate and the token throughput:
+        - Requests are paced to `requests_per_second`. When unset, requests are not paced until the provider throttles us, at which point the rate is set to half of the observed rate.
+        - Tokens are debited after each response (the token count is only known then), and new requests wait while the token budget for the current minute is exhausted.
+    Every throttling error halves the request rate, and every successful request raises it again by roughly one request per second per second, up to the configured maximum.
+    A `Retry-After` header pauses all requests to the provider until the indicated time.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ) -> None:
+        self.max_requests_per_second = requests_per_second
+        self.requests_per_second = requests_per_second
+        self.tokens_per_minute = tokens_per_minute
+
+        self._lock = threading.Lock()
+        self._next_request_time = 0.0
+        self._blocked_until = 0.0
+        self._token_budget = tokens_per_minute
+        self._token_budget_updated_at = time.monotonic()
+        self._consecutive_throttles = 0
+        self._last_decrease_time = 0.0
+        self._recent_request_times = deque()
+
+        self.total_requests = 0
+        self.total_throttles = 0
+
+    def acquire(self) -> None:
+        """
+        Block until the next request may be sent.
+        """
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        """
+        The asyncio counterpart of `acquire`.
+        """
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._consecutive_throttles = 0
+            if self.requests_per_second is None:
+                return
+            # Additive increase; each success adds 1/rate, so the rate grows by about one request per second every second
+            self.requests_per_second += 1 / max(self.requests_per_second, 1)
+            if self.max_requests_per_second is not None:
+                self.requests_per_second = min(
+                    self.requests_per_second, self.max_requests_per_second
+                )
+
+    def on_throttle(self, error: Optional[Exception] = None, reserve: bool = True) -> float:
+        """
+        Record a throttling error from the provider and return the number of seconds the caller should wait before retrying.
+        With `reserve`, the retry slot is reserved in the limiter, so the caller should retry right after the wait without calling `acquire` again.
+        Callers whose retry goes through `acquire` again must pass `reserve=False`, or the retry would take two slots.
+        """
+        retry_after = get_retry_after(error) if error is not None else None
+
+        with self._lock:
+            now = time.monotonic()
+            self.total_throttles += 1
+
+            # Multiplicative decrease, at most once per second so that a burst of concurrent errors doesn't collapse the rate
+            if now - self._last_decrease_time >= 1:
+                current_rate = self.requests_per_second
+                if current_rate is None:
+                    current_rate = self._observed_requests_per_second(now)
+                self.requests_per_second = max(
+                    MIN_REQUESTS_PER_SECOND, current_rate * RATE_DECREASE_FACTOR
+                )
+                self._last_decrease_time = now
+
+            if retry_after is not None:
+                # The provider told us exactly how long to wait; this applies to every request to this provider
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+                backoff = retry_after
+            else:
+                backoff = min(
+                    MAX_THROTTLE_BACKOFF,
+                    MIN_THROTTLE_BACKOFF * 2**self._consecutive_throttles,
+                )
+            self._consecutive_throttles += 1
+
+        if not reserve:
+            return backoff
+        return max(backoff, self._reserve())
+
+    def record_usage(self, token_count) -> None:
+        """
+        Debit the tokens used by a finished request from the token budget.
+        """
+        if self.tokens_per_minute is None or not isinstance(token_count, (int, float)):
+            return
+        with self._lock:
+            self._refill_token_budget(time.monotonic())
+            self._token_budget -= token_count
+
+    def stats(self) -> dict:
+        return {
+            "requests_per_second": self.requests_per_second,
+            "tokens_per_minute": self.tokens_per_minute,
+            "total_requests": self.total_requests,
+            "total_throttles": self.total_throttles,
+        }
+
+    def _reserve(self) -> float:
+        """
+        Reserve the next request slot and return how many seconds from now it starts.
+        """
+        with self._lock:
+            now = time.monotonic()
+            start_time = max(now, self._blocked_until)
+
+            if self.requests_per_second is not None:
+                start_time = max(start_time, self._next_request_time)
+                self._next_request_time = start_time + 1 / self.requests_per_second
+
+            if self.tokens_per_minute is not None:
+                self._refill_token_budget(now)
+                if self._token_budget < 0:
+                    # Wait until the budget has been refilled back to zero
+                    start_time = max(
+                        start_time,
+                        now - self._token_budget / (self.tokens_per_minute / 60),
+                    )
+
+            self.total_requests += 1
+            self._recent_request_times.append(start_time)
+            while (
+                self._recent_request_times
+                and self._recent_request_times[0] < now - RATE_ESTIMATION_WINDOW
+            ):
+                self._recent_request_times.popleft()
+
+            return start_time - now
+
+    def _refill_token_budget(self, now: float) -> None:
+        elapsed = now - self._token_budget_updated_at
+        self._token_budget = min(
+            self.tokens_per_minute,
+            self._token_budget + elapsed * self.tokens_per_minute / 60,
+        )
+        self._token_budget_updated_at = now
+
+    def _observed_requests_per_second(self, now: float) -> float:
+        recent_requests = [t for t in self._recent_request_times if t <= now]
+        if len(recent_requests) < 2:
+            return MIN_REQUESTS_PER_SECOND / RATE_DECREASE_FACTOR
+        return len(recent_requests) / max(now - recent_requests[0], 1)
+
+
+_RATE_LIMITERS: dict[tuple[str, str], RateLimiter] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model_name: str) -> RateLimiter:
+    """
+    Return the process-wide rate limiter for the given provider and model, creating it on first use.
+    The optional `BFCL_REQUESTS_PER_SECOND` and `BFCL_TOKENS_PER_MINUTE` environment variables set the initial (and maximum) limits.
+    """
+    key = (provider, model_name)
+    with _RATE_LIMITERS_LOCK:
+        if key not in _RATE_LIMITERS:
+            requests_per_second = os.getenv("BFCL_REQUESTS_PER_SECOND")
+            tokens_per_minute = os.getenv("BFCL_TOKENS_PER_MINUTE")
+            _RATE_LIMITERS[key] = RateLimiter(
+                requests_per_second=float(requests_per_second) if requests_per_second else None,
+                tokens_per_minute=float(tokens_per_minute) if tokens_per_minute else None,
+            )
+        return _RATE_LIMITERS[key]
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """
+    Whether the exception raised by a provider SDK means that we are being rate limited.
+    Each SDK has its own exception type, so this checks the common traits instead.
+    """
+    if getattr(error, "status_code", None) in THROTTLE_STATUS_CODES:
+        return True
+    if type(error).__name__ in THROTTLE_ERROR_NAMES:
+        return True
+    error_message = str(error).lower()
+    return "rate limit" in error_message or "throttlingexception" in error_message
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    """
+    Extract the `Retry-After` (or `retry-after-ms`) header, in seconds, from the HTTP response attached to a provider SDK exception.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    try:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            return max(0.0, float(retry_after_ms) / 1000)
+
+        retry_after = headers.get("retry-after")
+        if retry_after is None:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            # HTTP-date format
+            retry_at = parsedate_to_datetime(retry_after)
+            return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError, AttributeError):
+        return None
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import Optional
+
+from bfcl.model_handler.local_inference.constant import (
+    PROMPT_FORMAT_CACHE_FIELD,
+    PROMPT_TOKEN_COUNT_CACHE_FIELD,
+)
+from bfcl.utils import make_json_serializable
+
+# The chat history is serialized into the cache key, so these provider-side hints must be dropped; they change between runs without changing the model response
+# `cache_control` is Anthropic's prompt caching flag, which the Claude handler moves around the chat history on every query
+IGNORED_KEY_FIELDS = {"cache_control"}
+# Written by the `_query_FC`/`_query_prompting` methods themselves, so it is not part of the request
+INFERENCE_INPUT_LOG_FIELD = "inference_input_log"
+# Bookkeeping kept in the inference data by some handlers, which is not part of the request either
+NON_REQUEST_FIELDS = {
+    INFERENCE_INPUT_LOG_FIELD,
+    PROMPT_FORMAT_CACHE_FIELD,
+    PROMPT_TOKEN_COUNT_CACHE_FIELD,
+}
+# Once the cache is full, evict the least recently used entries until it is back to this fraction of the maximum size
+EVICTION_TARGET_RATIO = 0.9
+
+
+class ResponseCache:
+    """
+    On-disk, content-addressed cache of the raw model responses.
+
+    Each entry is keyed by a hash of the model name, temperature, query mode, and the full inference data of the request (the chat history, the compiled tools, the system prompt, etc.), and stored as a pickle file named after that hash.
+    A rerun of the same model on the same prompts (eg, after a crash, or with different `--result-dir`) then gets the responses from disk instead of querying the provider again, as long as the responses are deterministic enough for the chat histories to match step by step.
+    When the total size of the cache exceeds `max_size_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir: Path, max_size_bytes: int) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+
+        self._lock = threading.Lock()
+        self._size_bytes = sum(
+            file_path.stat().st_size for file_path in self.cache_dir.glob("*/*.pkl")
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.store_failures = 0
+        self.evictions = 0
+
+        # The maximum size may have been lowered since the last run
+        if self._size_bytes > self.max_size_bytes:
+            with self._lock:
+                self._evict()
+
+    def compute_key(
+        self, model_name: str, temperature: float, query_mode: str, inference_data: dict
+    ) -> str:
+        request = {
+            key: value
+            for key, value in inference_data.items()
+            if key not in NON_REQUEST_FIELDS
+        }
+        key_content = {
+            "model_name": model_name,
+            "temperature": temperature,
+            "query_mode": query_mode,
+            # SDK objects in the chat history (eg, the assistant messages) are serialized by their repr
+            "request": _drop_ignored_fields(make_json_serializable(request)),
+        }
+        return hashlib.sha256(
+            json.dumps(key_content, sort_keys=True).encode()
+        ).hexdigest()
+
+    def get(self, key: str, inference_data: dict) -> Optional[tuple]:
+        """
+        Return the cached `(api_response, query_latency)` for the key, or None on a cache miss.
+        The inference input log recorded with the response is restored into `inference_data`, as the query method would have done.
+        """
+        file_path = self._get_file_path(key)
+        try:
+            with open(file_path, "rb") as f:
+                cached_entry = pickle.load(f)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Corrupted entry, or written by an incompatible SDK version
+            self._remove(file_path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Refresh the modification time, which is used as the last access time for eviction
+        try:
+            os.utime(file_path)
+        except FileNotFoundError:
+            pass
+
+        if cached_entry["inference_input_log"] is not None:
+            inference_data[INFERENCE_INPUT_LOG_FIELD] = cached_entry["inference_input_log"]
+
+        with self._lock:
+            self.hits += 1
+        return cached_entry["api_response"], cached_entry["query_latency"]
+
+    def put(self, key: str, inference_data: dict, api_response, query_latency) -> None:
+        cached_entry = {
+            "api_response": api_response,
+            "query_latency": query_latency,
+            "inference_input_log": inference_data.get(INFERENCE_INPUT_LOG_FIELD),
+        }
+        try:
+            serialized_entry = pickle.dumps(cached_entry)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # Some SDK response objects can't be pickled; those responses are just not cached
+            with self._lock:
+                self.store_failures += 1
+            return
+
+        file_path = self._get_file_path(key)
+        # Write to a temporary file first, so that concurrent readers never see a partially written entry
+        temp_file_path = file_path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            file_path.parent.mkdir(exist_ok=True)
+            with open(temp_file_path, "wb") as f:
+                f.write(serialized_entry)
+            # The same request may have been stored already (eg, by another process sharing the cache directory)
+            try:
+                replaced_size = file_path.stat().st_size
+            except FileNotFoundError:
+                replaced_size = 0
+            os.replace(temp_file_path, file_path)
+        except OSError as e:
+            # The cache is only an optimization; the generation goes on without it (eg, on a full or read-only disk)
+            print(f"Failed to write the response cache entry {key}: {e}")
+            try:
+                temp_file_path.unlink(missing_ok=True)
+            except OSError:
+                pass
+            with self._lock:
+                self.store_failures += 1
+            return
+
+        with self._lock:
+            self.stores += 1
+            self._size_bytes += len(serialized_entry) - replaced_size
+            if self._size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total_lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total_lookups if total_lookups else 0.0,
+                "stores": self.stores,
+                "store_failures": self.store_failures,
+                "evictions": self.evictions,
+                "size_bytes": self._size_bytes,
+                "max_size_bytes": self.max_size_bytes,
+            }
+
+    def print_stats(self) -> None:
+        stats = self.stats()
+        print(
+            f"Response cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"(hit rate {stats['hit_rate']:.1%}), {stats['stores']} stored, "
+            f"{stats['store_failures']} not stored, {stats['evictions']} evicted, "
+            f"{stats['size_bytes'] / 1024 / 1024:.1f}/{stats['max_size_bytes'] / 1024 / 1024:.0f} MB used."
+        )
+
+    def _get_file_path(self, key: str) -> Path:
+        # Shard by the first two hex digits so that no single directory grows too large
+        return self.cache_dir / key[:2] / f"{key}.pkl"
+
+    def _evict(self) -> None:
+        # Must be called with the lock held
+        entries = []
+        for file_path in self.cache_dir.glob("*/*.pkl"):
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_path))
+        entries.sort()
+
+        # Re-sync with the disk, in case another process is sharing the same cache directory
+        self._size_bytes = sum(size for _, size, _ in entries)
+        target_size_bytes = self.max_size_bytes * EVICTION_TARGET_RATIO
+        for _, size, file_path in entries:
+            if self._size_bytes <= target_size_bytes:
+                break
+            try:
+                file_path.unlink()
+            except FileNotFoundError:
+                pass
+            self._size_bytes -= size
+            self.evictions += 1
+
+    def _remove(self, file_path: Path) -> None:
+        try:
+            size = file_path.stat().st_size
+            file_path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._size_bytes -= size
+
+
+def _drop_ignored_fields(value):
+    if isinstance(value, dict):
+        return {
+            k: _drop_ignored_fields(v)
+            for k, v in value.items()
+            if k not in IGNORED_KEY_FIELDS
+        }
+    elif isinstance(value, list):
+        return [_drop_ignored_fields(item) for item in value]
+    return value
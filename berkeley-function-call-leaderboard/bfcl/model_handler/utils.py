@@ -1,6 +1,7 @@
 import ast
 import builtins
 import copy
+import inspect
 import json
 import operator
 import re
@@ -11,6 +12,7 @@ from bfcl.model_handler.constant import DEFAULT_SYSTEM_PROMPT, GORILLA_TO_OPENAP
 from bfcl.model_handler.model_style import ModelStyle
 from bfcl.model_handler.parser.java_parser import parse_java_function_call
 from bfcl.model_handler.parser.js_parser import parse_javascript_function_call
+from bfcl.model_handler.rate_limiter import is_throttle_error
 from tenacity import (
     retry,
     retry_if_exception_message,
@@ -369,6 +371,8 @@ def func_doc_language_specific_pre_processing(function, test_category):
         return function
 
     assert type(function) == list
+    # The function docs may be shared with other test entries (eg, the multi-turn func docs), so work on a copy
+    function = copy.deepcopy(function)
     for item in function:
         # Add language specific hints to the function description
         func_description = item["description"]
@@ -735,6 +739,33 @@ def decoded_output_to_execution_list(decoded_output):
     return execution_list
 
 
+def common_prefix_length(a: str, b: str) -> int:
+    # Binary search on the prefix length; each slice comparison runs in C, which is much faster than a character by character loop on long prompts
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if a[:mid] == b[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def compute_prefix_sharing_ratio(prompts: list[str]) -> float:
+    """
+    Compute the fraction of the prompt characters that are shared with the prompt right before it.
+    When the prompts are sent in this order, this is (approximately) the fraction of the prompt that a server-side prefix cache can reuse.
+    """
+    total_length = sum(len(prompt) for prompt in prompts)
+    if total_length == 0:
+        return 0.0
+    shared_length = sum(
+        common_prefix_length(previous_prompt, prompt)
+        for previous_prompt, prompt in zip(prompts, prompts[1:])
+    )
+    return shared_length / total_length
+
+
 def retry_with_backoff(
     error_type: Optional[Union[Type[Exception], List[Type[Exception]]]] = None,
     error_message_pattern: Optional[str] = None,
@@ -748,6 +779,7 @@ def retry_with_backoff(
     Note:
         At least one of `error_type` or `error_message_pattern` must be provided.
         If both `error_type` and `error_message_pattern` are provided, the retry will occur if either condition is met.
+        When the decorated function is a handler method and the error is a throttling error, the wait time is decided by the handler's shared rate limiter instead (which honours the `Retry-After` header).
 
     Args:
         error_type ([Union[Type[Exception], List[Type[Exception]]]], optional): The exception type to retry on. Supports one exception, or a list of exceptions.
@@ -781,8 +813,22 @@ def retry_with_backoff(
         # Combine all conditions using logical OR
         retry_policy = reduce(operator.or_, conditions)
 
-        @retry(
-            wait=wait_random_exponential(min=min_wait, max=max_wait),
+        fallback_wait = wait_random_exponential(min=min_wait, max=max_wait)
+
+        def wait_for_rate_limiter(retry_state):
+            exception = retry_state.outcome.exception()
+            rate_limiter = (
+                getattr(retry_state.args[0], "rate_limiter", None)
+                if retry_state.args
+                else None
+            )
+            if rate_limiter is not None and is_throttle_error(exception):
+                # tenacity retries the raw `_query_*` call, which does not go through `acquire`, so the retry slot is reserved here
+                return rate_limiter.on_throttle(exception, reserve=True)
+            return fallback_wait(retry_state)
+
+        retry_decorator = retry(
+            wait=wait_for_rate_limiter,
             retry=retry_policy,
             before_sleep=lambda retry_state: print(
                 f"Attempt {retry_state.attempt_number} failed. "
@@ -791,8 +837,19 @@ def retry_with_backoff(
             ),
             **kwargs,
         )
-        def wrapped(*args, **inner_kwargs):
-            return func(*args, **inner_kwargs)
+
+        # tenacity only awaits (and thus retries) the call if the wrapped function is itself a coroutine function
+        if inspect.iscoroutinefunction(func):
+
+            @retry_decorator
+            async def wrapped(*args, **inner_kwargs):
+                return await func(*args, **inner_kwargs)
+
+        else:
+
+            @retry_decorator
+            def wrapped(*args, **inner_kwargs):
+                return func(*args, **inner_kwargs)
 
         return wrapped
 
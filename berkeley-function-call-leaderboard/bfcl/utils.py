@@ -1,11 +1,21 @@
+import copy
 import json
 import os
 import re
 from pathlib import Path
-from typing import Union
+from typing import Iterable, Iterator, Union
 
 from bfcl.constant import TEST_COLLECTION_MAPPING, TEST_FILE_MAPPING, VERSION_PREFIX
 
+try:
+    # Optional; decodes the dataset, result and score files several times faster than the standard library
+    import orjson
+except ImportError:
+    orjson = None
+
+# Types that `json.dumps` always serializes as they are
+JSON_SCALAR_TYPES = (str, int, float, type(None))
+
 
 def extract_test_category(input_string: Union[str, Path]) -> str:
     input_string = str(input_string)
@@ -68,19 +78,34 @@ def is_sql(test_category):
     return "sql" in test_category
 
 
-def load_file(file_path, sort_by_id=False):
-    result = []
+def iter_file(file_path) -> Iterator[dict]:
+    """
+    Iterate over the entries of a JSON Lines file, decoding one line at a time; only the current line and the entries kept by the caller are held in memory.
+    """
     with open(file_path) as f:
-        file = f.readlines()
-        for line in file:
-            result.append(json.loads(line))
+        for line in f:
+            yield decode_json_line(line)
+
+
+def decode_json_line(line: str):
+    if orjson is not None:
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than the standard library (eg, it rejects `NaN` and lone surrogates); let the standard library decode, or raise the usual error
+            pass
+    return json.loads(line)
+
+
+def load_file(file_path, sort_by_id=False):
+    result = list(iter_file(file_path))
 
     if sort_by_id:
         result.sort(key=sort_key)
     return result
 
 
-def write_list_of_dicts_to_file(filename, data, subdir=None):
+def write_list_of_dicts_to_file(filename, data: Iterable[dict], subdir=None):
     if subdir:
         # Ensure the subdirectory exists
         os.makedirs(subdir, exist_ok=True)
@@ -88,26 +113,43 @@ def write_list_of_dicts_to_file(filename, data, subdir=None):
         # Construct the full path to the file
         filename = os.path.join(subdir, filename)
 
-    # Write the list of dictionaries to the file in JSON format
+    # Write the dictionaries to the file in JSON format, one per line; `data` can be any iterable, and is consumed one entry at a time
+    # The standard library encoder is used even when orjson is available, as orjson formats the output differently (no spaces after separators, non-ASCII characters not escaped), and the files should not depend on which packages are installed
     with open(filename, "w") as f:
         for i, entry in enumerate(data):
-            # Go through each key-value pair in the dictionary to make sure the values are JSON serializable
-            entry = make_json_serializable(entry)
-            json_str = json.dumps(entry)
-            f.write(json_str)
-            if i < len(data) - 1:
+            if i > 0:
                 f.write("\n")
+            # Go through each key-value pair in the dictionary to make sure the values are JSON serializable
+            f.write(json.dumps(make_json_serializable(entry)))
+
+
+def copy_test_entry_for_inference(test_entry: dict) -> dict:
+    """
+    Make a copy of the test entry that a model handler can freely modify during inference, without duplicating the whole entry like `deepcopy` would.
+
+    Handlers only modify two fields of the test entry:
+        - `question`: the chat messages are edited in place (eg, adding the system prompt), so this field is deep copied. The messages are small.
+        - `function`: the list of function docs is extended (eg, with the holdout functions in the miss_func category), so the list is copied. The function docs themselves are never modified in place (handlers transform them through `func_doc_language_specific_pre_processing` or `convert_to_tool`, which work on a copy), so they are shared with the original entry.
+    All the other fields are read-only and shared with the original entry.
+    """
+    entry_copy = dict(test_entry)
+    entry_copy["question"] = copy.deepcopy(test_entry["question"])
+    entry_copy["function"] = list(test_entry["function"])
+    return entry_copy
 
 
 def make_json_serializable(value):
-    if isinstance(value, dict):
+    if isinstance(value, JSON_SCALAR_TYPES):
+        # Checked first, as almost all the values are strings and numbers; this includes `bool`, a subclass of `int`
+        return value
+    elif isinstance(value, dict):
         # If the value is a dictionary, we need to go through each key-value pair recursively
         return {k: make_json_serializable(v) for k, v in value.items()}
     elif isinstance(value, list):
         # If the value is a list, we need to process each element recursively
         return [make_json_serializable(item) for item in value]
     else:
-        # Try to serialize the value directly, and if it fails, convert it to a string
+        # Try to serialize the value directly (eg, a tuple), and if it fails, convert it to a string
         try:
             json.dumps(value)
             return value
@@ -6,7 +6,7 @@ from bfcl.constant import POSSIBLE_ANSWER_PATH, PROMPT_PATH, UTILS_PATH
 from bfcl.eval_checker.eval_runner_helper import load_file, write_list_of_dicts_to_file
 from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
     STATELESS_CLASSES,
-    execute_multi_turn_func_call,
+    ExecutionSession,
 )
 
 _, test_filename_total = parse_test_category_argument(["multi_turn"])
@@ -25,14 +25,13 @@ for file_path in test_filename_total:
         test_entry_id: str = test_entry["id"]
         test_category: str = test_entry_id.rsplit("_", 1)[0]
 
-        _, involved_instances = execute_multi_turn_func_call(
-            [],
+        # A fresh session per entry, so that the instances of the previous entries are released
+        execution_session = ExecutionSession()
+        involved_instances = execution_session.create(
+            test_entry_id,
             initial_config,
             involved_classes,
-            "ground_truth_conversation",  # the model_name is not important here, could use any string
-            test_entry_id,
             long_context=("long_context" in test_category or "composite" in test_category),
-            is_evaL_run=False,
         )
 
         state_log = []
@@ -60,16 +59,14 @@ for file_path in test_filename_total:
                 {"begin_of_turn_query": single_turn_query}
             ]
 
-            execution_results, involved_instances = execute_multi_turn_func_call(
+            execution_results, involved_instances = execution_session.step(
+                test_entry_id,
                 single_turn_ground_truth,
                 initial_config,
                 involved_classes,
-                "ground_truth_conversation",  # the model_name is not important here, could use any string
-                test_entry_id,
                 long_context=(
                     "long_context" in test_category or "composite" in test_category
                 ),
-                is_evaL_run=False,
             )
 
             for ground_truth, execution_result in zip(